@@ -37,9 +37,9 @@ _bootstrap_paths()
 from wafw00f.main import WAFW00F
 
 from classes import PayloadResult
-from config.settings import DEFAULT_NUM_PAYLOADS
+from config.settings import DEFAULT_NUM_PAYLOADS, DEFAULT_ATTACK_CONCURRENCY, DEFAULT_ATTACK_RATE_LIMIT
 from defense.defense_pipeline import DefensePipeline
-from services import payload_harmness_validator as harmfulness
+from services import attack_runner
 from services.generator import generate_payloads_phase1, generate_payloads_phase3
 from services_external import dvwa
 from validator_syntax_rule.base import WAFType
@@ -84,6 +84,7 @@ Examples:
   python src/cli/main.py generate-payload --waf-name ModSecurity --attack-type xss_reflected --num-payloads 5 --output payloads.json
   python src/cli/main.py generate --domain http://localhost --type sql_injection --num 3
   python src/cli/main.py test-attack --domain http://localhost --payloads-file payloads.json --output tested.json
+  python src/cli/main.py test-attack --domain http://localhost --payloads-file payloads.json --concurrency 16 --rate-limit 20
   python src/cli/main.py defend --waf-name ModSecurity --attack-type xss_reflected --payloads-file tested.json --existing-rules-file rules.txt --output defend.json
   python src/cli/main.py workflow --domain http://localhost --attack-type xss_reflected --num-payloads 5 --output result.json
 
@@ -189,6 +190,7 @@ def _payload_result_from_dict(item: dict[str, Any]) -> PayloadResult:
         status_code=item.get("status_code"),
         is_bypassed=item.get("is_bypassed"),
         is_harmful=item.get("is_harmful"),
+        is_exploited=item.get("is_exploited"),
     )
 
 
@@ -246,6 +248,8 @@ def _print_payload_summary(payloads: Iterable[PayloadResult]) -> None:
         status_parts = []
         if payload.is_bypassed is not None:
             status_parts.append("BYPASSED" if payload.is_bypassed else "BLOCKED")
+        if payload.is_exploited is not None:
+            status_parts.append("EXPLOITED" if payload.is_exploited else "NO EFFECT")
         if payload.is_harmful is not None:
             status_parts.append("HARMFUL" if payload.is_harmful else "SAFE")
         if payload.status_code is not None:
@@ -317,6 +321,9 @@ def test_attack(
     domain: str,
     payloads: list[PayloadResult],
     check_harmful: bool = True,
+    concurrency: int = DEFAULT_ATTACK_CONCURRENCY,
+    rate_limit: float = DEFAULT_ATTACK_RATE_LIMIT,
+    verify: bool = False,
 ) -> dict[str, Any]:
     if not domain:
         raise ValueError("Missing domain")
@@ -325,35 +332,16 @@ def test_attack(
     print(f"\n[*] Logging in to DVWA at {domain}...")
     session_id = dvwa.loginDVWA(base_url=domain)
 
-    for index, item in enumerate(payloads, start=1):
-        payload = item.payload
-        attack_type = item.attack_type
-
-        if check_harmful and payload and attack_type:
-            if "xss" in attack_type.lower():
-                harmfulness_result = harmfulness.evaluate_xss_payload(payload)
-                if harmfulness_result:
-                    item.is_harmful = not harmfulness_result.is_safe
-            elif "sql" in attack_type.lower():
-                harmfulness_result = harmfulness.evaluate_sql_payload(payload)
-                if harmfulness_result:
-                    item.is_harmful = len(harmfulness_result.harm_queries) > 0
-
-        attack_func = dvwa.DVWA_ATTACK_FUNC.get(attack_type)
-        print(f"[DVWA-Check] {index}/{len(payloads)} : {item.payload}")
-
-        if attack_func and payload:
-            result = dvwa.attack(attack_type, payload, session_id, base_url=domain)
-            item.is_bypassed = None if result.blocked is None else not result.blocked
-            item.status_code = result.status_code
-            print(
-                f"    {('BYPASSED' if item.is_bypassed else 'BLOCKED' if item.is_bypassed is not None else 'UNKNOWN')}"
-                f" code({item.status_code})"
-            )
-        else:
-            item.is_bypassed = None
-            item.status_code = None
-            print("    SKIPPED (missing attack_func or payload)")
+    # Harmfulness checks and DVWA requests run concurrently; order is preserved
+    attack_runner.test_payloads(
+        domain,
+        payloads,
+        session_id=session_id,
+        check_harmful=check_harmful,
+        concurrency=concurrency,
+        rate_limit=rate_limit,
+        verify=verify,
+    )
 
     _print_payload_summary(payloads)
     return {
@@ -496,6 +484,9 @@ def _build_parser() -> argparse.ArgumentParser:
     test_parser.add_argument("--payload", action="append", dest="payload_values", help="Manual payload value. Can be repeated.")
     test_parser.add_argument("--attack-type", "--type", "-t", choices=dvwa.VALID_ATTACK_TYPES, help="Required with --payload.")
     test_parser.add_argument("--skip-harmful-check", action="store_true", help="Disable harmfulness validation before testing.")
+    test_parser.add_argument("--concurrency", "-c", type=int, default=DEFAULT_ATTACK_CONCURRENCY, help="Max in-flight DVWA requests.")
+    test_parser.add_argument("--rate-limit", type=float, default=DEFAULT_ATTACK_RATE_LIMIT, help="Max requests per second to the target (0 = unlimited).")
+    test_parser.add_argument("--verify", action="store_true", help="Also check exploit evidence from the same DVWA response.")
     test_parser.add_argument("--output", "-o", help="Write the JSON response to a file.")
     test_parser.add_argument("--json", action="store_true", help="Print JSON response to stdout.")
 
@@ -571,6 +562,9 @@ def main() -> int:
                 domain=args.domain,
                 payloads=payloads,
                 check_harmful=not args.skip_harmful_check,
+                concurrency=args.concurrency,
+                rate_limit=args.rate_limit,
+                verify=args.verify,
             )
 
         elif args.command == "defend":
@@ -764,6 +764,10 @@ class ClusterInfo:
     attack_type: str
     representative_payload: str
     size: int
+    # Near-duplicates each payload stands for (None when dedup is off)
+    payload_counts: Optional[list[int]] = None
+    # Diverse subset shown in the LLM prompt, medoid first; payloads keeps full membership
+    sample_payloads: Optional[list[str]] = None
     
     def to_dict(self):
         return {
@@ -772,6 +776,8 @@ class ClusterInfo:
             "attack_type": self.attack_type,
             "representative_payload": self.representative_payload,
             "size": int(self.size),
+            "payload_counts": self.payload_counts,
+            "sample_payloads": self.sample_payloads,
         }
 
 
@@ -808,6 +814,7 @@ class PipelineResult:
     final_rules: list[GeneratedRule] = field(default_factory=list)
     # Metadata
     total_payloads: int = 0
+    unique_payloads: int = 0
     num_clusters: int = 0
     rules_generated: int = 0
     rules_valid: int = 0
@@ -827,6 +834,7 @@ class PipelineResult:
             "final_rules": [r.to_dict() for r in self.final_rules],
             "stats": {
                 "total_payloads": self.total_payloads,
+                "unique_payloads": self.unique_payloads,
                 "num_clusters": self.num_clusters,
                 "rules_generated": self.rules_generated,
                 "rules_valid": self.rules_valid,
@@ -855,6 +863,12 @@ class DefensePipeline:
         enable_clustering: bool = True,
         max_retries: int = 3,
         llm_provider: str = "openai",
+        online_clustering: Optional[bool] = None,
+        enable_dedup: Optional[bool] = None,
+        prompt_payloads_per_cluster: Optional[int] = None,
+        parallel_generation: Optional[bool] = None,
+        generation_workers: Optional[int] = None,
+        clusters_per_request: Optional[int] = None,
     ):
         """
         Initialize the defense pipeline.
@@ -865,8 +879,24 @@ class DefensePipeline:
             enable_rag: Enable RAG context enhancement
             enable_refinement: Enable rule refinement agent
             enable_clustering: Enable payload clustering
-            max_retries: Max retries for LLM generation on syntax errors
+            max_retries: Max LLM fix attempts per rule that fails syntax validation
             llm_provider: LLM provider for rule generation ("openai" or "claude")
+            online_clustering: Keep clustering state per (WAF, attack type) across
+                requests instead of re-clustering from scratch
+                (or set ONLINE_CLUSTERING_ENABLED env var, default false)
+            enable_dedup: Collapse near-duplicate payloads before clustering so
+                only representatives (with counts) reach the LLM
+                (or set NEAR_DEDUP_ENABLED env var, default true)
+            prompt_payloads_per_cluster: Payloads per cluster shown to the LLM,
+                medoid plus the most diverse members; 0 shows all
+                (or set DEFENSE_PROMPT_PAYLOADS_PER_CLUSTER env var, default 20)
+            parallel_generation: Generate rules per group of clusters, each with its
+                own RAG context, concurrently instead of in one LLM call
+                (or set DEFENSE_PARALLEL_GENERATION env var, default false)
+            generation_workers: Max concurrent LLM calls in parallel generation
+                (or set DEFENSE_GENERATION_WORKERS env var, default 4)
+            clusters_per_request: Clusters per LLM call in parallel generation
+                (or set DEFENSE_CLUSTERS_PER_REQUEST env var, default 1)
         """
         self.openai_api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         self.enable_rag = enable_rag
@@ -874,6 +904,20 @@ class DefensePipeline:
         self.enable_clustering = enable_clustering
         self.max_retries = max_retries
         self.llm_provider = llm_provider
+        if online_clustering is None:
+            online_clustering = os.getenv("ONLINE_CLUSTERING_ENABLED", "false").lower() == "true"
+        self.online_clustering = online_clustering
+        if enable_dedup is None:
+            enable_dedup = os.getenv("NEAR_DEDUP_ENABLED", "true").lower() == "true"
+        self.enable_dedup = enable_dedup
+        if prompt_payloads_per_cluster is None:
+            prompt_payloads_per_cluster = int(os.getenv("DEFENSE_PROMPT_PAYLOADS_PER_CLUSTER", "20"))
+        self.prompt_payloads_per_cluster = prompt_payloads_per_cluster
+        if parallel_generation is None:
+            parallel_generation = os.getenv("DEFENSE_PARALLEL_GENERATION", "false").lower() == "true"
+        self.parallel_generation = parallel_generation
+        self.generation_workers = max(1, generation_workers or int(os.getenv("DEFENSE_GENERATION_WORKERS", "4")))
+        self.clusters_per_request = max(1, clusters_per_request or int(os.getenv("DEFENSE_CLUSTERS_PER_REQUEST", "1")))
 
         # Initialize components
         self.syntax_validator = SyntaxValidator()
@@ -935,9 +979,13 @@ class DefensePipeline:
             for p in bypassed_payloads:
                 print(f"\t\t{p}")
             
-            # Stage 1: Clustering
+            # Stage 1: Clustering (on near-duplicate representatives)
             print("[1/4] Clustering payloads...")
-            clusters = self._cluster_payloads(bypassed_payloads)
+            payload_counts = self._collapse_near_duplicates(bypassed_payloads)
+            bypassed_payloads = list(payload_counts)
+            result.unique_payloads = len(bypassed_payloads)
+            print(f"Collapsed {result.total_payloads} payloads into {result.unique_payloads} representatives")
+            clusters = self._cluster_payloads(bypassed_payloads, waf_type, attack_type, payload_counts)
             result.cluster_info = clusters
             result.num_clusters = len(clusters)
             print(f"Created {len(clusters)} clusters")
@@ -1192,62 +1240,108 @@ class DefensePipeline:
 
         return default
 
-    def _cluster_payloads(self, payloads: list[str]) -> list[ClusterInfo]:
-        """Cluster similar payloads together."""
+    def _collapse_near_duplicates(self, payloads: list[str]) -> dict[str, int]:
+        """
+        Map each near-duplicate representative to the number of payloads it stands for.
+
+        Falls back to exact-duplicate counting when dedup is off or fails.
+        """
+        if self.enable_dedup and len(payloads) > 1:
+            try:
+                from gui.backend.services.near_dedup import collapse_near_duplicates
+
+                return {g.representative: g.count for g in collapse_near_duplicates(payloads)}
+            except Exception as e:
+                print(f"      Near-duplicate collapsing failed: {e}, using exact duplicates")
+        counts = {}
+        for p in payloads:
+            counts[p] = counts.get(p, 0) + 1
+        return counts
+
+    def _cluster_payloads(
+        self,
+        payloads: list[str],
+        waf_type: Optional[WAFType] = None,
+        attack_type: Optional[str] = None,
+        payload_counts: Optional[dict[str, int]] = None,
+    ) -> list[ClusterInfo]:
+        """
+        Cluster similar payloads together.
+
+        With online clustering, payloads are assigned to the clusters kept for
+        (waf_type, attack_type), so cluster ids stay stable across requests.
+        payload_counts (near-duplicates per payload) weight the medoid and
+        add up to the cluster size.
+        """
         if not self.enable_clustering or len(payloads) < 3:
             # Return single cluster with all payloads
-            attack_type = self._detect_attack_type(payloads)
-            return [ClusterInfo(
-                cluster_id=0,
-                payloads=payloads,
-                attack_type=attack_type,
-                representative_payload=payloads[0],
-                size=len(payloads),
-            )]
+            return [self._build_cluster_info(0, payloads, None, payload_counts)]
 
         try:
-            from gui.backend.services.clustering import clustering
+            if self.online_clustering and waf_type is not None:
+                from gui.backend.services.online_clustering import get_online_clusterer
 
-            labels = clustering(payloads, reduce_dim_to=50, method="HAC", cluster_kwargs={"distance_threshold": 1.5})
+                clusterer = get_online_clusterer(waf_type.value, attack_type)
+                labels = clusterer.assign(payloads)
+                vectors = clusterer.transform(payloads)
+            else:
+                from gui.backend.services.clustering import clustering
+
+                labels, vectors = clustering(payloads, reduce_dim_to=50, method="AUTO", cluster_kwargs={"distance_threshold": 1.5}, return_vectors=True)
 
             # Group by cluster
             from collections import defaultdict
             clusters_dict = defaultdict(list)
-            for payload, label in zip(payloads, labels):
-                clusters_dict[label].append(payload)
+            for index, label in enumerate(labels):
+                clusters_dict[label].append(index)
 
             clusters = []
-            for label, cluster_payloads in clusters_dict.items():
+            for label, indices in clusters_dict.items():
                 if label == -1:  # Noise
                     continue
-                attack_type = self._detect_attack_type(cluster_payloads)
-                clusters.append(ClusterInfo(
-                    cluster_id=label,
-                    payloads=cluster_payloads,
-                    attack_type=attack_type,
-                    representative_payload=cluster_payloads[0],
-                    size=len(cluster_payloads),
+                clusters.append(self._build_cluster_info(
+                    label, [payloads[i] for i in indices], vectors[indices], payload_counts,
                 ))
 
-            return clusters if clusters else [ClusterInfo(
-                cluster_id=0,
-                payloads=payloads,
-                attack_type=self._detect_attack_type(payloads),
-                representative_payload=payloads[0],
-                size=len(payloads),
-            )]
+            return clusters if clusters else [self._build_cluster_info(0, payloads, vectors, payload_counts)]
 
         except Exception as e:
             import traceback
             traceback.print_exc()
             print(f"      Clustering failed: {e}, using single cluster")
-            return [ClusterInfo(
-                cluster_id=0,
-                payloads=payloads,
-                attack_type=self._detect_attack_type(payloads),
-                representative_payload=payloads[0],
-                size=len(payloads),
-            )]
+            return [self._build_cluster_info(0, payloads, None, payload_counts)]
+
+    def _build_cluster_info(
+        self,
+        cluster_id: int,
+        payloads: list[str],
+        vectors: Optional[Any] = None,
+        payload_counts: Optional[dict[str, int]] = None,
+    ) -> ClusterInfo:
+        """
+        ClusterInfo with its medoid as representative and a diverse prompt sample.
+
+        Without vectors (clustering skipped or failed) the first payloads are used.
+        """
+        counts = [payload_counts.get(p, 1) for p in payloads] if payload_counts else None
+        budget = self.prompt_payloads_per_cluster or len(payloads)
+        medoid, sample = 0, list(range(min(budget, len(payloads))))
+        if vectors is not None:
+            try:
+                from gui.backend.services.clustering import select_representatives
+
+                medoid, sample = select_representatives(vectors, budget, weights=counts)
+            except Exception as e:
+                print(f"      Representative selection failed: {e}, using first payloads")
+        return ClusterInfo(
+            cluster_id=cluster_id,
+            payloads=payloads,
+            attack_type=self._detect_attack_type(payloads),
+            representative_payload=payloads[medoid],
+            size=sum(counts) if counts else len(payloads),
+            payload_counts=counts,
+            sample_payloads=[payloads[i] for i in sample],
+        )
 
     def _generate_rules_with_llm(
         self,
@@ -1257,7 +1351,61 @@ class DefensePipeline:
         waf_type: WAFType,
         attack_type: str,
     ) -> list[GeneratedRule]:
-        """Generate rules using LLM with RAG enhancement."""
+        """
+        Generate rules using LLM with RAG enhancement.
+
+        In parallel generation, clusters are split into groups of
+        clusters_per_request; each group gets its own prompt and RAG context and
+        the calls run on up to generation_workers threads. Rules are merged in
+        group order with exact duplicates dropped, so the slowest group bounds
+        the latency instead of the total payload volume.
+        """
+        if not self.parallel_generation or len(clusters) <= self.clusters_per_request:
+            return self._generate_rules_for_clusters(payloads, clusters, waf_name, waf_type, attack_type)
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        groups = [clusters[i:i + self.clusters_per_request] for i in range(0, len(clusters), self.clusters_per_request)]
+        print(f"Generating rules for {len(groups)} cluster groups with {min(self.generation_workers, len(groups))} workers")
+
+        def generate_group(index: int, group: list[ClusterInfo]) -> list[GeneratedRule]:
+            group_payloads = [p for c in group for p in c.payloads]
+            # Per-cluster attack type when detected, so RAG retrieves matching docs
+            group_attack_types = {c.attack_type for c in group}
+            group_attack_type = group_attack_types.pop() if len(group_attack_types) == 1 else None
+            if self._is_unknown_attack_type(group_attack_type):
+                group_attack_type = attack_type
+            return self._generate_rules_for_clusters(
+                group_payloads, group, waf_name, waf_type, group_attack_type,
+                # Disjoint rule ID ranges so merged rules do not collide
+                id_range_start=900001 + index * 1000,
+            )
+
+        with ThreadPoolExecutor(max_workers=self.generation_workers) as executor:
+            futures = [executor.submit(generate_group, index, group) for index, group in enumerate(groups)]
+            group_rules = [future.result() for future in futures]
+
+        rules = []
+        seen = set()
+        for group in group_rules:
+            for rule in group:
+                key = " ".join(rule.rule.split())
+                if key and key in seen:
+                    continue
+                seen.add(key)
+                rules.append(rule)
+        return rules
+
+    def _generate_rules_for_clusters(
+        self,
+        payloads: list[str],
+        clusters: list[ClusterInfo],
+        waf_name: str,
+        waf_type: WAFType,
+        attack_type: str,
+        id_range_start: Optional[int] = None,
+    ) -> list[GeneratedRule]:
+        """One LLM call generating rules for the given clusters."""
         try:
             from gui.backend.services_external.llm import chatgpt_completion, claude_completion
             from gui.backend.config.prompts import BLUE_TEAM_SYSTEM_PROMPT, get_blue_team_user_prompt
@@ -1279,6 +1427,7 @@ class DefensePipeline:
             base_prompt = get_blue_team_user_prompt(
                 waf_name=waf_name,
                 payload_clusters=[c.__dict__ for c in clusters],
+                max_payloads_per_cluster=self.prompt_payloads_per_cluster,
             )
             
             # print(f"[BASE DEFEND PROMPT]\n\t{base_prompt.replace('\n', '\n\t')}")
@@ -1315,6 +1464,8 @@ class DefensePipeline:
             # Add WAF type instruction
             waf_format_instruction = self._get_waf_format_instruction(waf_type)
             enhanced_prompt += f"\n\n{waf_format_instruction}"
+            if id_range_start is not None and waf_type in (WAFType.MODSECURITY, WAFType.NAXSI):
+                enhanced_prompt += f"\n- Use rule IDs from {id_range_start} to {id_range_start + 999} only"
 
             # Call LLM
             messages = [
@@ -1409,48 +1560,86 @@ class DefensePipeline:
         payloads: list[str],
         attack_type: str,
     ) -> list[GeneratedRule]:
-        """Retry generating rules that failed validation."""
-        fixed_rules = []
+        """
+        Fix rules that failed validation.
+
+        Fix requests for all invalid rules run concurrently (up to
+        generation_workers at a time). Each response is validated as it
+        arrives; a rule that is still invalid is re-queued with the new error
+        until it has used max_retries attempts. Fixed rules keep the order of
+        invalid_rules.
+        """
+        from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
         try:
             from gui.backend.services_external.llm import chatgpt_completion, claude_completion
+        except Exception as e:
+            print(f"      Retry failed: {e}")
+            return []
 
-            llm_completion = claude_completion if self.llm_provider == "claude" else chatgpt_completion
+        llm_completion = claude_completion if self.llm_provider == "claude" else chatgpt_completion
 
-            for rule in invalid_rules[:self.max_retries]:  # Limit retries
-                fix_prompt = f"""The following WAF rule has a syntax error:
+        def request_fix(rule: GeneratedRule, rule_text: str, error: Optional[str]) -> str:
+            fix_prompt = f"""The following WAF rule has a syntax error:
 Rule Instructions: {rule.instructions}
-Rule: {rule.rule}
-Validation Error: {rule.validation_error}
+Rule: {rule_text}
+Validation Error: {error}
 Please fix the syntax error and return a valid {waf_type.value} rule.
 Return ONLY the fixed rule, no explanations."""
 
-                result = llm_completion(
-                    messages=[{"role": "user", "content": fix_prompt}]
-                )
-
-                fixed_content = (
-                    result.get("choices", [{}])[0]
-                        .get("message", {})
-                        .get("content", "")
-                )
-                if fixed_content:
-                    fixed_rule = GeneratedRule(
-                        rule=fixed_content.strip(),
-                        instructions=rule.instructions,
-                        waf_type=waf_type,
-                    )
-
-                    # Validate fixed rule
-                    validation = self.syntax_validator.validate(fixed_rule.rule, waf_type)
-                    if validation.is_valid:
-                        fixed_rule.is_valid = True
-                        fixed_rules.append(fixed_rule)
-
-        except Exception as e:
-            print(f"      Retry failed: {e}")
-
-        return fixed_rules
+            # Uncached: a retry resends the same prompt and must get a new answer
+            result = llm_completion(
+                messages=[{"role": "user", "content": fix_prompt}],
+                use_cache=False,
+            )
+            return (
+                result.get("choices", [{}])[0]
+                    .get("message", {})
+                    .get("content", "")
+            ) or ""
+
+        fixed_rules: dict[int, GeneratedRule] = {}
+        attempts = [0] * len(invalid_rules)
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self.generation_workers) as executor:
+            def submit(index: int, rule_text: str, error: Optional[str]):
+                attempts[index] += 1
+                future = executor.submit(request_fix, invalid_rules[index], rule_text, error)
+                pending[future] = (index, rule_text, error)
+
+            if self.max_retries > 0:
+                for index, rule in enumerate(invalid_rules):
+                    submit(index, rule.rule, rule.validation_error)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, rule_text, error = pending.pop(future)
+                    try:
+                        fixed_content = future.result().strip()
+                    except Exception as e:
+                        print(f"      Retry failed: {e}")
+                        fixed_content = ""
+
+                    if fixed_content:
+                        validation = self.syntax_validator.validate(fixed_content, waf_type)
+                        if validation.is_valid:
+                            fixed_rules[index] = GeneratedRule(
+                                rule=fixed_content,
+                                instructions=invalid_rules[index].instructions,
+                                waf_type=waf_type,
+                                is_valid=True,
+                                validation_warnings=validation.warnings,
+                            )
+                            continue
+                        # Feed the latest attempt and its error into the next one
+                        rule_text, error = fixed_content, validation.error_message
+
+                    if attempts[index] < self.max_retries:
+                        submit(index, rule_text, error)
+
+        print(f"Fixed {len(fixed_rules)}/{len(invalid_rules)} rules in {sum(attempts)} attempts")
+        return [fixed_rules[index] for index in sorted(fixed_rules)]
 
     def _get_waf_format_instruction(self, waf_type: WAFType) -> str:
         """Get format instruction for specific WAF type."""
@@ -156,6 +156,8 @@ Return JSON:
                     "schema": response_schema,
                 },
             },
+            # Refinement reacts to the latest test results; never replay an old answer
+            use_cache=False,
         )
 
         content = response.get("choices", [{}])[0].get("message", {}).get("content", "")
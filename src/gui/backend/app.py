@@ -54,8 +54,13 @@ from wafw00f.main import WAFW00F
 from services.generator import PayloadResult, generate_payloads_phase1, generate_payloads_phase3
 from services_external import dvwa
 from services.generator import PayloadResult
-import services.payload_harmness_validator as harmfulness
-from config.settings import DEFAULT_NUM_DEFENSE_RULES
+from services import attack_runner
+from config.settings import (
+    DEFAULT_NUM_DEFENSE_RULES,
+    DEFAULT_ATTACK_CONCURRENCY,
+    DEFAULT_ATTACK_RATE_LIMIT,
+    MAX_ATTACK_CONCURRENCY,
+)
 
 # Full defense pipeline: clustering -> RAG -> LLM -> syntax validator -> rule refinement
 from defense.defense_pipeline import DefensePipeline
@@ -178,6 +183,9 @@ def api_attack_dvwa():
         data = dict(request.get_json())
         domain = dict.get(data, "domain", None)
         check_harmful = dict.get(data, "check_harmful", True)
+        concurrency = dict.get(data, "concurrency", DEFAULT_ATTACK_CONCURRENCY)
+        rate_limit = dict.get(data, "rate_limit", DEFAULT_ATTACK_RATE_LIMIT)
+        verify = dict.get(data, "verify", False)
         payloads = dict.get(data, "payloads", [])
         payloads = [PayloadResult(
             payload=p.get("payload"),
@@ -186,44 +194,37 @@ def api_attack_dvwa():
             status_code=p.get("status_code"),
             is_bypassed=p.get("is_bypassed"),
             is_harmful=p.get("is_harmful"),
+            is_exploited=p.get("is_exploited"),
         ) for p in payloads]
         
         if not domain:
             return jsonify({"error": "Missing 'domain' field"}), 400
 
+        try:
+            concurrency = min(max(1, int(concurrency)), MAX_ATTACK_CONCURRENCY)
+        except (TypeError, ValueError):
+            return jsonify({"error": "'concurrency' must be an integer"}), 400
+        try:
+            rate_limit = max(0.0, float(rate_limit))
+        except (TypeError, ValueError):
+            return jsonify({"error": "'rate_limit' must be a number (requests per second, 0 = unlimited)"}), 400
+
         # Login to DVWA at target domain for retesting
         if not domain.startswith("http://") and not domain.startswith("https://"):
             domain = "http://" + domain
         print(f"[DVWA-Signin] {domain}...")
         session_id = dvwa.loginDVWA(base_url=domain)
-        
-        for i, item in enumerate(payloads):
-            payload = item.payload
-            attack_type = item.attack_type
-            print(f"[DVWA-Check] {i+1}/{len(payloads)} : {item.payload}")
-            
-            # Check harmfulness
-            if check_harmful and payload and attack_type:
-                if "xss" in attack_type.lower():
-                    harmfulness_result = harmfulness.evaluate_xss_payload(payload)
-                    if harmfulness_result:
-                        item.is_harmful = not harmfulness_result.is_safe
-                elif "sql" in attack_type.lower():
-                    harmfulness_result = harmfulness.evaluate_sql_payload(payload)
-                    if harmfulness_result:
-                        item.is_harmful = len(harmfulness_result.harm_queries) > 0
-            
-            # Test on DVWA
-            attack_func = dvwa.DVWA_ATTACK_FUNC.get(attack_type)
-            if attack_func and payload:
-                result = dvwa.attack(attack_type, payload, session_id, base_url=domain)
-                item.is_bypassed = not result.blocked
-                item.status_code = result.status_code
-                print(f"\t{('BYPASSED' if item.is_bypassed else 'BLOCKED')} code({item.status_code})")
-            else:
-                item.is_bypassed = None
-                item.status_code = None
-                print(f"\tSKIPPED (missing attack_func or payload)")
+
+        # Harmfulness checks and DVWA requests run concurrently; order is preserved
+        attack_runner.test_payloads(
+            domain,
+            payloads,
+            session_id=session_id,
+            check_harmful=check_harmful,
+            concurrency=concurrency,
+            rate_limit=rate_limit,
+            verify=verify,
+        )
             
         return jsonify({"payloads": payloads}), 200
     except Exception as e:
@@ -289,6 +290,7 @@ def api_defend():
             status_code=p.get("status_code"),
             is_bypassed=p.get("is_bypassed"),
             is_harmful=p.get("is_harmful"),
+            is_exploited=p.get("is_exploited"),
         ) for p in payloads]
         existing_rules = _parse_existing_rules(existing_rules_raw)
         if existing_rules:
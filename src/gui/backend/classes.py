@@ -7,4 +7,5 @@ class PayloadResult:
     attack_type: str
     status_code: int|None = None
     is_bypassed: bool|None = None
-    is_harmful: bool|None = None
\ No newline at end of file
+    is_harmful: bool|None = None
+    is_exploited: bool|None = None
\ No newline at end of file
@@ -102,12 +102,20 @@ def _get_blue_team_waf_constraints(waf_name: str) -> str:
 - Do not mix syntax across different WAF engines.
 - Before outputting, self-check that the rule format matches the target WAF only."""
 
-def get_blue_team_user_prompt(waf_name, payload_clusters:list[dict]):
+def get_blue_team_user_prompt(waf_name, payload_clusters:list[dict], max_payloads_per_cluster:int=None):
    payload_cluster_string = ""
    for c in payload_clusters:
-      payload_cluster_string += f"\tCluster {c['cluster_id']} ({c['size']} payloads):\n"
-      for p in c['payloads']:
-         payload_cluster_string += f"\t\t{p}\n"
+      # Clusters carry a diverse sample (medoid first); show at most max_payloads_per_cluster of it
+      shown = c.get('sample_payloads') or c['payloads']
+      if max_payloads_per_cluster:
+         shown = shown[:max_payloads_per_cluster]
+      sampled = f", {len(shown)} diverse samples shown" if len(shown) < len(c['payloads']) else ""
+      payload_cluster_string += f"\tCluster {c['cluster_id']} ({c['size']} payloads{sampled}):\n"
+      # Near-duplicates are collapsed upstream; show how many variants each payload stands for
+      counts = dict(zip(c['payloads'], c.get('payload_counts') or []))
+      for p in shown:
+         count = counts.get(p, 1)
+         payload_cluster_string += f"\t\t{p}" + (f"  (x{count} near-duplicate variants)" if count > 1 else "") + "\n"
 
    waf_constraints = _get_blue_team_waf_constraints(waf_name)
    
@@ -21,6 +21,71 @@ DVWA_BASE_URL = os.getenv("DVWA_BASE_URL", "http://localhost:8000/dvwa")
 DVWA_USERNAME = "admin"
 DVWA_PASSWORD = "password"
 DVWA_SECURITY_LEVEL = "low"
+# Max keep-alive connections kept open per DVWA target
+DVWA_POOL_SIZE = int(os.getenv("DVWA_POOL_SIZE", "20"))
+# Decide WAF blocks from status/headers first, read bodies only when needed
+DVWA_STREAM_BLOCK_DETECTION = os.getenv("DVWA_STREAM_BLOCK_DETECTION", "true").lower() == "true"
+# Seconds a blind SQLi baseline response is reused per (target, security level, session)
+SQLI_BLIND_BASELINE_TTL = float(os.getenv("SQLI_BLIND_BASELINE_TTL", "300"))
+# Time-based blind SQLi verification (services/sqli_timing.py)
+SQLI_TIMING_WORKERS = int(os.getenv("SQLI_TIMING_WORKERS", "4"))
+SQLI_TIMING_SAMPLES = int(os.getenv("SQLI_TIMING_SAMPLES", "8"))
+# Delayed if elapsed > median + K * MAD of the baseline latency, and at least MIN_DELAY above the median
+SQLI_TIMING_K = float(os.getenv("SQLI_TIMING_K", "6"))
+SQLI_TIMING_MIN_DELAY = float(os.getenv("SQLI_TIMING_MIN_DELAY", "2"))
+
+# XSS harmfulness check: offline analyzer by default, remote browser validator on request
+XSS_REMOTE_VALIDATOR = os.getenv("XSS_REMOTE_VALIDATOR", "false").lower() == "true"
+XSS_REMOTE_VALIDATOR_URL = os.getenv("XSS_REMOTE_VALIDATOR_URL", "http://api.akng.io.vn:89/validate_payload")
+XSS_REMOTE_VALIDATOR_TIMEOUT = float(os.getenv("XSS_REMOTE_VALIDATOR_TIMEOUT", "10"))
+
+# Persistent caches (services/cache_store.py)
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"))
+CACHE_MEMORY_ITEMS = int(os.getenv("CACHE_MEMORY_ITEMS", "10000"))
+# Reuse harmfulness results across runs (keyed by payload and validator version)
+HARM_CACHE_ENABLED = os.getenv("HARM_CACHE_ENABLED", "true").lower() == "true"
+# Reuse LLM completions for identical requests (provider, model, messages, response_format)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+# "sqlite" (survives restarts) or "memory" (this process only)
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "sqlite")
+# Seconds before a cached completion expires, 0 = never
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ITEMS = int(os.getenv("LLM_CACHE_MAX_ITEMS", "10000"))
+
+# Defense pipeline clustering state per (WAF, attack type) (services/online_clustering.py)
+# Re-cluster from scratch once new payloads reach this share of the fitted corpus
+ONLINE_CLUSTERING_REFIT_RATIO = float(os.getenv("ONLINE_CLUSTERING_REFIT_RATIO", "0.5"))
+ONLINE_CLUSTERING_MAX_CORPUS = int(os.getenv("ONLINE_CLUSTERING_MAX_CORPUS", "5000"))
+
+# Payload features for clustering (services/feature_extractor.py): "tfidf" or "hashing"
+FEATURE_EXTRACTOR_METHOD = os.getenv("FEATURE_EXTRACTOR_METHOD", "tfidf")
+# Hash space of the "hashing" method; bounds vectorizer and SVD memory
+FEATURE_HASHING_N_FEATURES = int(os.getenv("FEATURE_HASHING_N_FEATURES", str(2 ** 16)))
+
+# Shared HTTP client for LLM and LLMShield APIs (services_external/http_client.py)
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "180"))
+# Retries on connection errors, timeouts, 429 and 5xx, with exponential backoff + jitter
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "1"))
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+# Consecutive failed calls that open a host's circuit, and seconds before a trial request
+HTTP_BREAKER_THRESHOLD = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))
+HTTP_BREAKER_RESET = float(os.getenv("HTTP_BREAKER_RESET", "30"))
+
+# LLMShield payload generation: payloads per batched request, and concurrent
+# requests (batches, or single requests when the server cannot batch).
+# Batching needs a server with the generate_payload_batch action; 1 = off
+LLMSHIELD_BATCH_SIZE = int(os.getenv("LLMSHIELD_BATCH_SIZE", "1"))
+LLMSHIELD_CONCURRENCY = int(os.getenv("LLMSHIELD_CONCURRENCY", "4"))
+
+# Concurrent attack testing (/api/test_attack, CLI test-attack)
+DEFAULT_ATTACK_CONCURRENCY = int(os.getenv("ATTACK_CONCURRENCY", "8"))
+# Upper bound of the concurrency a request may ask for
+MAX_ATTACK_CONCURRENCY = int(os.getenv("MAX_ATTACK_CONCURRENCY", "64"))
+# Max requests per second per target, 0 = unlimited
+DEFAULT_ATTACK_RATE_LIMIT = float(os.getenv("ATTACK_RATE_LIMIT", "0"))
 
 # Default payload generation settings
 DEFAULT_NUM_PAYLOADS = 5
@@ -0,0 +1,213 @@
+"""
+Concurrent payload testing engine.
+
+Runs the harmfulness check and the DVWA attack for a batch of payloads with
+bounded concurrency and an optional per-target rate limit. Harmfulness
+evaluation runs on its own worker pool so it overlaps with network I/O
+instead of holding a network slot. Results are written back into the input
+PayloadResult objects, so the returned list always keeps the input order.
+
+Used by /api/test_attack and the `test-attack` CLI command.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from classes import PayloadResult
+from services_external import dvwa
+import services.payload_harmness_validator as harmfulness
+from config.settings import DEFAULT_ATTACK_CONCURRENCY, DEFAULT_ATTACK_RATE_LIMIT
+
+# Harmfulness checks are short; a couple of workers keep them ahead of the network
+HARM_WORKERS = 2
+
+
+class RateLimiter:
+    """
+    Thread-safe request pacer: at most `rate` acquisitions per second.
+
+    A rate of 0 (or less) disables limiting.
+    """
+
+    def __init__(self, rate: float = 0):
+        self.rate = rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate or self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+_rate_limiters: dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(target: str, rate: float) -> RateLimiter:
+    """Get the shared limiter of a target so concurrent batches share its budget."""
+    key = target.rstrip("/")
+    with _rate_limiters_lock:
+        limiter = _rate_limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(rate)
+            _rate_limiters[key] = limiter
+        else:
+            limiter.rate = rate
+        return limiter
+
+
+def check_harmfulness(item: PayloadResult) -> Optional[bool]:
+    """
+    Evaluate whether a payload is harmful for its attack type.
+
+    Returns:
+        True/False, or None when the attack type is unsupported or the
+        validator gave no answer
+    """
+    payload = item.payload
+    attack_type = item.attack_type
+    if not payload or not attack_type:
+        return None
+    if "xss" in attack_type.lower():
+        harmfulness_result = harmfulness.evaluate_xss_payload(payload)
+        if harmfulness_result:
+            return not harmfulness_result.is_safe
+    elif "sql" in attack_type.lower():
+        harmfulness_result = harmfulness.evaluate_sql_payload(payload)
+        if harmfulness_result:
+            return len(harmfulness_result.harm_queries) > 0
+    return None
+
+
+def _attack_one(item: PayloadResult, session_id: str, domain: str, limiter: RateLimiter, verify: bool = False):
+    if not dvwa.DVWA_ATTACK_FUNC.get(item.attack_type) or not item.payload:
+        item.is_bypassed = None
+        item.status_code = None
+        return None
+    limiter.acquire()
+    result = dvwa.attack(item.attack_type, item.payload, session_id, base_url=domain, verify=verify)
+    item.is_bypassed = None if result.blocked is None else not result.blocked
+    item.status_code = result.status_code
+    if verify:
+        item.is_exploited = result.exploited
+    return result
+
+
+def _harm_one(item: PayloadResult):
+    is_harmful = check_harmfulness(item)
+    if is_harmful is not None:
+        item.is_harmful = is_harmful
+
+
+def _format_status(item: PayloadResult) -> str:
+    if item.status_code is None and item.is_bypassed is None:
+        return "SKIPPED (missing attack_func or payload)"
+    verdict = "BYPASSED" if item.is_bypassed else "BLOCKED" if item.is_bypassed is not None else "UNKNOWN"
+    if item.is_exploited:
+        verdict += " EXPLOITED"
+    return f"{verdict} code({item.status_code})"
+
+
+def test_payloads(
+    domain: str,
+    payloads: list[PayloadResult],
+    session_id: Optional[str] = None,
+    check_harmful: bool = True,
+    concurrency: Optional[int] = None,
+    rate_limit: Optional[float] = None,
+    on_result: Optional[Callable[[int, PayloadResult], None]] = None,
+    verify: bool = False,
+) -> list[PayloadResult]:
+    """
+    Test payloads against a DVWA target concurrently.
+
+    Args:
+        domain: DVWA base URL (with scheme)
+        payloads: Payloads to test; updated in place
+        session_id: PHPSESSID (logs in when omitted)
+        check_harmful: Also run the harmfulness validator
+        concurrency: Max in-flight DVWA requests (default DEFAULT_ATTACK_CONCURRENCY)
+        rate_limit: Max requests per second to the target (default DEFAULT_ATTACK_RATE_LIMIT)
+        on_result: Callback(index, item) called as each payload finishes
+        verify: Also set is_exploited, judged from the same DVWA response
+
+    Returns:
+        The same payload list, in input order, with status_code/is_bypassed/is_harmful set
+    """
+    if not payloads:
+        return payloads
+
+    concurrency = max(1, int(concurrency or DEFAULT_ATTACK_CONCURRENCY))
+    rate_limit = DEFAULT_ATTACK_RATE_LIMIT if rate_limit is None else rate_limit
+    if session_id is None:
+        print(f"[DVWA-Signin] {domain}...")
+        session_id = dvwa.loginDVWA(base_url=domain)
+
+    limiter = get_rate_limiter(domain, rate_limit)
+    # The cache counters are process-wide; this run reports its own difference
+    harm_stats_before = harmfulness.harm_cache_stats() if check_harmful else {}
+    total = len(payloads)
+    done = [0]
+    done_lock = threading.Lock()
+
+    def report(index: int, item: PayloadResult):
+        with done_lock:
+            done[0] += 1
+            print(f"[DVWA-Check] {done[0]}/{total} #{index + 1} : {item.payload}\n\t{_format_status(item)}")
+        if on_result:
+            on_result(index, item)
+
+    # Each payload has one or two tasks (attack, harmfulness); whichever
+    # finishes last reports it, so neither pool waits on the other
+    pending = [2 if check_harmful else 1 for _ in payloads]
+
+    def finish(index: int):
+        with done_lock:
+            pending[index] -= 1
+            if pending[index] > 0:
+                return
+        report(index, payloads[index])
+
+    def run_attack(index: int, item: PayloadResult):
+        try:
+            _attack_one(item, session_id, domain, limiter, verify)
+        except Exception as e:
+            print(f"Error testing payload #{index + 1}: {str(e)}")
+            item.is_bypassed = None
+            item.status_code = 0
+        finish(index)
+
+    def run_harm(index: int, item: PayloadResult):
+        try:
+            _harm_one(item)
+        except Exception as e:
+            print(f"Error checking harmfulness of payload #{index + 1}: {str(e)}")
+        finish(index)
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="dvwa-attack") as attack_pool, \
+            ThreadPoolExecutor(max_workers=HARM_WORKERS, thread_name_prefix="harm-check") as harm_pool:
+        futures = []
+        for index, item in enumerate(payloads):
+            futures.append(attack_pool.submit(run_attack, index, item))
+            if check_harmful:
+                futures.append(harm_pool.submit(run_harm, index, item))
+        for future in futures:
+            future.result()
+
+    if "misses" in harm_stats_before:
+        stats = harmfulness.harm_cache_stats()
+        hits = (stats["memory_hits"] + stats["disk_hits"]
+                - harm_stats_before["memory_hits"] - harm_stats_before["disk_hits"])
+        misses = stats["misses"] - harm_stats_before["misses"]
+        if hits + misses:
+            print(f"[Harm-Cache] {hits} hits, {misses} misses ({hits / (hits + misses):.0%} hit rate)")
+    return payloads
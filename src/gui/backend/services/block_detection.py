@@ -0,0 +1,300 @@
+"""
+WAF block detection for DVWA responses.
+
+Block signatures (status codes, header patterns, body markers) are kept in one
+registry keyed by WAFType and compiled into a single BlockMatcher, so each
+response is scanned once for every vendor at the same time.
+
+Decides whether a response was blocked by the WAF while reading as little of
+it as possible:
+    1. Status line: a block status code (403) decides immediately.
+    2. Headers: WAF-specific headers (e.g. Cloudflare's cf-mitigated) decide next.
+    3. Body: only when still undecided, the body is read in chunks and the
+       scan stops at the first block marker.
+
+Works best with responses fetched with stream=True; already-loaded
+responses are scanned the same way from memory.
+
+Usage:
+    response = client.get(url, stream=True)
+    signature, body = match_block(response)
+    if signature is not None:
+        ...
+    text = decode_body(response, body)  # the body read while checking
+
+    # Only look for one vendor's block page
+    is_blocked(response, get_block_matcher([WAFType.NAXSI]))
+"""
+
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
+import requests
+
+try:
+    from validator_syntax_rule.base import WAFType
+except ImportError:
+    # Backend-only sys.path: add src/ so validator_syntax_rule is importable
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+    from validator_syntax_rule.base import WAFType
+
+
+@dataclass(frozen=True)
+class BlockSignature:
+    """
+    How a WAF answers a request it rejects.
+
+    Attributes:
+        status_codes: Status codes of a block response
+        header_patterns: Header name -> regex of its value on a block response
+        body_markers: Literal substrings of the block page
+    """
+    status_codes: frozenset = frozenset()
+    header_patterns: dict = field(default_factory=dict)
+    body_markers: tuple = ()
+
+
+# Registry of block signatures per WAF vendor
+BLOCK_SIGNATURES: dict[WAFType, BlockSignature] = {
+    WAFType.MODSECURITY: BlockSignature(
+        status_codes=frozenset({403}),
+        body_markers=("ModSecurity", "Mod_Security"),
+    ),
+    WAFType.NAXSI: BlockSignature(
+        status_codes=frozenset({403}),
+        body_markers=("NAXSI",),
+    ),
+    WAFType.CLOUDFLARE: BlockSignature(
+        status_codes=frozenset({403}),
+        header_patterns={"cf-mitigated": r"challenge|block"},
+        body_markers=("Sorry, you have been blocked", "Cloudflare Ray ID"),
+    ),
+    WAFType.AWS_WAF: BlockSignature(
+        status_codes=frozenset({403}),
+        header_patterns={"x-amzn-waf-action": r"block|captcha|challenge"},
+    ),
+}
+
+# Vendor-neutral block page wording, used whatever the WAF is
+GENERIC_SIGNATURE = BlockSignature(
+    status_codes=frozenset({403}),
+    body_markers=("Access Denied", "Request Blocked", "Forbidden", "WAF"),
+)
+
+CHUNK_SIZE = 8192
+
+# Once decided, bodies with at most this many bytes left are still read so
+# the keep-alive connection goes back to the pool; larger ones are dropped
+DRAIN_LIMIT = 64 * 1024
+
+
+class BlockMatcher:
+    """
+    Block signatures compiled into one status set, one regex per header and
+    one combined body regex.
+
+    Every alternative of the combined regexes is a named group per signature,
+    so a match also tells which WAF answered (match.lastgroup).
+    """
+
+    def __init__(self, signatures: dict[str, BlockSignature]):
+        self.status_codes = {}
+        header_alternatives = {}
+        body_alternatives = []
+        max_marker = 1
+
+        for name, signature in signatures.items():
+            for code in signature.status_codes:
+                # A status shared by several vendors does not identify one
+                self.status_codes[code] = name if self.status_codes.get(code, name) == name else "generic"
+            for header, pattern in signature.header_patterns.items():
+                header_alternatives.setdefault(header.lower(), []).append(f"(?P<{name}>{pattern})")
+            markers = [m.encode() for m in signature.body_markers if m]
+            if markers:
+                body_alternatives.append(
+                    b"(?P<" + name.encode() + b">" + b"|".join(re.escape(m) for m in markers) + b")"
+                )
+                max_marker = max(max_marker, *(len(m) for m in markers))
+
+        self.header_patterns = {
+            header: re.compile("|".join(alternatives), re.IGNORECASE)
+            for header, alternatives in header_alternatives.items()
+        }
+        self.body_pattern = re.compile(b"|".join(body_alternatives)) if body_alternatives else None
+        # Tail kept between chunks so markers split across chunks still match
+        self.overlap = max_marker - 1
+
+    def match_status_and_headers(self, status_code: int, headers) -> Optional[str]:
+        """
+        Decide from the status line and headers alone.
+
+        Returns:
+            Name of the matched signature, or None when the body is needed to decide
+        """
+        name = self.status_codes.get(status_code)
+        if name:
+            return name
+        for header, pattern in self.header_patterns.items():
+            value = headers.get(header)
+            if value:
+                match = pattern.search(value)
+                if match:
+                    return match.lastgroup
+        return None
+
+    def scanner(self) -> "BodyScanner":
+        return BodyScanner(self)
+
+
+class BodyScanner:
+    """Incremental search of a BlockMatcher's body markers over a chunked body."""
+
+    def __init__(self, matcher: BlockMatcher):
+        self.pattern = matcher.body_pattern
+        self.overlap = matcher.overlap
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> Optional[str]:
+        """Scan the next chunk. Returns the matched signature name, or None."""
+        if self.pattern is None:
+            return None
+        window = self._tail + chunk
+        match = self.pattern.search(window)
+        if match:
+            return match.lastgroup
+        self._tail = window[-self.overlap:] if self.overlap else b""
+        return None
+
+
+_matchers: dict[tuple, BlockMatcher] = {}
+
+
+def get_block_matcher(waf_types: Optional[Iterable[WAFType]] = None, generic: bool = True) -> BlockMatcher:
+    """
+    Get the compiled matcher for a set of WAF vendors (cached).
+
+    Args:
+        waf_types: Vendors to match (default: every registered vendor)
+        generic: Also match vendor-neutral block wording
+
+    Returns:
+        BlockMatcher
+    """
+    waf_types = tuple(BLOCK_SIGNATURES) if waf_types is None else tuple(waf_types)
+    key = (waf_types, generic)
+    matcher = _matchers.get(key)
+    if matcher is None:
+        signatures = {waf_type.value: BLOCK_SIGNATURES[waf_type] for waf_type in waf_types}
+        if generic:
+            signatures["generic"] = GENERIC_SIGNATURE
+        matcher = BlockMatcher(signatures)
+        _matchers[key] = matcher
+    return matcher
+
+
+def get_dvwa_matcher() -> BlockMatcher:
+    """
+    Matcher for responses from DVWA behind a WAF.
+
+    Every vendor, no generic wording: "Forbidden" and the like also appear
+    on ordinary DVWA pages.
+    """
+    return get_block_matcher(generic=False)
+
+
+def _release(response: requests.Response, stream: Iterator[bytes], read: int) -> bytes:
+    """
+    Finish a response whose body is only partly read.
+
+    The rest is drained so the keep-alive connection goes back to the pool,
+    unless more than DRAIN_LIMIT bytes are left. Without a Content-Length
+    (chunked bodies) that is only known while reading, so up to DRAIN_LIMIT
+    bytes are read before the connection is dropped.
+
+    Returns:
+        The part of the rest of the body that was read
+    """
+    # Content-Length counts encoded bytes; the estimate only needs to be
+    # rough to choose between draining and closing
+    length = response.headers.get("Content-Length")
+    if length and length.isdigit() and int(length) - read > DRAIN_LIMIT:
+        response.close()
+        return b""
+    chunks = []
+    drained = 0
+    for chunk in stream:
+        chunks.append(chunk)
+        drained += len(chunk)
+        if drained > DRAIN_LIMIT:
+            response.close()
+            break
+    return b"".join(chunks)
+
+
+def match_block(response: requests.Response, matcher: Optional[BlockMatcher] = None) -> tuple[Optional[str], bytes]:
+    """
+    Find the block signature a response matches.
+
+    Args:
+        response: requests.Response, ideally fetched with stream=True
+        matcher: Compiled signatures (default: every vendor + generic)
+
+    Returns:
+        (signature, body): name of the matched signature ("modsecurity",
+        "naxsi", ..., "generic") or None if the request passed, and the body
+        bytes read. The body is complete unless a block was decided early on
+        a large body.
+
+    A streamed body can only be read once, so callers that need it use the
+    returned bytes (see decode_body) instead of response.text.
+    """
+    matcher = matcher or get_block_matcher()
+    verdict = matcher.match_status_and_headers(response.status_code, response.headers)
+    scanner = matcher.scanner()
+
+    if response._content_consumed or response.raw is None:
+        # Body already in memory
+        body = response.content
+        if verdict is None:
+            verdict = scanner.feed(body)
+        return verdict, body
+
+    stream = response.iter_content(CHUNK_SIZE)
+    if verdict is not None:
+        return verdict, _release(response, stream, 0)
+
+    chunks = []
+    read = 0
+    for chunk in stream:
+        chunks.append(chunk)
+        read += len(chunk)
+        verdict = scanner.feed(chunk)
+        if verdict is not None:
+            break
+    if verdict is not None:
+        chunks.append(_release(response, stream, read))
+    return verdict, b"".join(chunks)
+
+
+def decode_body(response: requests.Response, body: bytes) -> str:
+    """Text of a body returned by match_block, decoded like response.text."""
+    try:
+        return body.decode(response.encoding or "utf-8", errors="replace")
+    except LookupError:
+        return body.decode("utf-8", errors="replace")
+
+
+def is_blocked(response: requests.Response, matcher: Optional[BlockMatcher] = None) -> bool:
+    """
+    Check if a request was blocked by a WAF.
+
+    Reads the body of a streamed response; use match_block when it is
+    needed afterwards.
+
+    Returns:
+        bool: True if blocked, False if bypassed
+    """
+    return match_block(response, matcher)[0] is not None
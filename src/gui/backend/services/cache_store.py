@@ -0,0 +1,275 @@
+"""
+Two-tier persistent key-value cache.
+
+An in-memory LRU sits in front of a local SQLite file, so hot entries cost a
+dict lookup and everything evaluated in earlier runs survives restarts.
+Values must be JSON-serializable. Keys are content hashes built with
+make_key, so callers never store raw payloads as keys.
+
+Entries can expire after `ttl` seconds, and the SQLite tier can be capped
+at `max_items` (oldest entries are evicted first). Both default to off.
+
+Usage:
+    cache = get_cache("harm")
+    key = make_key("sql", payload, True, VALIDATOR_VERSION)
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value)
+    cache.stats()  # {"memory_hits": ..., "disk_hits": ..., "misses": ..., ...}
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+# Flexible imports for different execution contexts
+CACHE_DIR = None
+CACHE_MEMORY_ITEMS = None
+
+try:
+    from config.settings import CACHE_DIR, CACHE_MEMORY_ITEMS
+except ImportError:
+    pass
+
+# Default values if imports failed
+if CACHE_DIR is None:
+    CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"))
+if CACHE_MEMORY_ITEMS is None:
+    CACHE_MEMORY_ITEMS = int(os.getenv("CACHE_MEMORY_ITEMS", "10000"))
+
+# The SQLite tier checks TTL and max_items every this many writes
+EVICT_EVERY = 100
+
+
+def make_key(*parts) -> str:
+    """Content hash of the key parts (order matters)."""
+    return hashlib.sha256("\x1f".join(str(part) for part in parts).encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU; entries older than ttl seconds (0 = never) expire."""
+
+    def __init__(self, maxsize: int = CACHE_MEMORY_ITEMS, ttl: float = 0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, stored_at = entry
+            if self.ttl and time.time() - stored_at > self.ttl:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, stored_at: Optional[float] = None):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.time() if stored_at is None else stored_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteStore:
+    """
+    One SQLite table of key -> JSON text, shared by every thread of the process.
+
+    Rows older than ttl seconds are ignored and purged; beyond max_items rows
+    the oldest are evicted (both checked every EVICT_EVERY writes, 0 = off).
+    """
+
+    def __init__(self, path: str, table: str, ttl: float = 0, max_items: int = 0):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table}")
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.table = table
+        self.ttl = ttl
+        self.max_items = max_items
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        # WAL lets several processes (CLI run + backend) read while one writes
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL DEFAULT 0)"
+        )
+        # Tables created before expiry support have no created_at column
+        columns = [row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")]
+        if "created_at" not in columns:
+            self._conn.execute(f"ALTER TABLE {table} ADD COLUMN created_at REAL NOT NULL DEFAULT 0")
+        self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_created_at ON {table} (created_at)")
+        self._conn.commit()
+        with self._lock:
+            self._evict()
+
+    def get(self, key: str) -> Optional[tuple[str, float]]:
+        """(JSON text, creation time) of a live entry, or None."""
+        with self._lock:
+            row = self._conn.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None or (self.ttl and time.time() - row[1] > self.ttl):
+            return None
+        return row
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, created_at) VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self._writes += 1
+            if self._writes % EVICT_EVERY == 0:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self) -> int:
+        """Drop expired rows and the oldest rows beyond max_items (caller holds the lock)."""
+        removed = 0
+        if self.ttl:
+            removed += self._conn.execute(
+                f"DELETE FROM {self.table} WHERE created_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+        if self.max_items:
+            removed += self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_items,),
+            ).rowcount
+        self._conn.commit()
+        return removed
+
+    def evict(self) -> int:
+        """Apply ttl and max_items now; returns the number of rows removed."""
+        with self._lock:
+            return self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.table}")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    LRU in front of a SQLiteStore, with hit/miss counters.
+
+    Values returned from memory are the stored objects: treat them as read-only.
+    """
+
+    def __init__(self, namespace: str, path: str = None, memory_items: int = None, ttl: float = 0, max_items: int = 0):
+        """
+        Initialize cache.
+
+        Args:
+            namespace: Table name; caches of different kinds share one file
+            path: SQLite file (default CACHE_DIR/cache.sqlite3); "" keeps the cache in memory only
+            memory_items: LRU capacity (default CACHE_MEMORY_ITEMS)
+            ttl: Seconds before an entry expires (0 = never)
+            max_items: Max entries kept on disk, oldest evicted first (0 = unbounded)
+        """
+        self.namespace = namespace
+        self.memory = LRUCache(CACHE_MEMORY_ITEMS if memory_items is None else memory_items, ttl)
+        path = os.path.join(CACHE_DIR, "cache.sqlite3") if path is None else path
+        self.disk = SQLiteStore(path, namespace, ttl, max_items) if path else None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+        if self.disk is not None:
+            try:
+                raw = self.disk.get(key)
+            except sqlite3.Error as e:
+                print(f"[Cache] {self.namespace}: read failed: {e}")
+                raw = None
+            if raw is not None:
+                value = json.loads(raw[0])
+                # Keep the disk timestamp so the entry expires at the same time in memory
+                self.memory.set(key, value, stored_at=raw[1])
+                self._count("disk_hits")
+                return value
+        self._count("misses")
+        return None
+
+    def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, json.dumps(value))
+            except sqlite3.Error as e:
+                print(f"[Cache] {self.namespace}: write failed: {e}")
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.memory_hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "namespace": self.namespace,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "memory_items": len(self.memory),
+            }
+
+
+_caches: dict[str, TieredCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(namespace: str, path: str = None, memory_items: int = None, ttl: float = 0, max_items: int = 0) -> TieredCache:
+    """Get the process-wide cache of a namespace, creating it on first use (later arguments are ignored)."""
+    with _caches_lock:
+        cache = _caches.get(namespace)
+        if cache is None:
+            cache = TieredCache(namespace, path, memory_items, ttl, max_items)
+            _caches[namespace] = cache
+        return cache
@@ -7,36 +7,20 @@ import os
 import json
 from collections import defaultdict
 import hdbscan
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.decomposition import TruncatedSVD
 from sklearn.metrics import silhouette_score, davies_bouldin_score, calinski_harabasz_score
+import numpy as np
 
+from .feature_extractor import PayloadFeatureExtractor
 
+# Above this many payloads "AUTO" switches from exact HAC (dense, O(n^2)
+# memory) to k-means micro-clusters + HAC
+HAC_MAX_SAMPLES = 5000
+MIN_MICRO_CLUSTERS = 50
+MAX_MICRO_CLUSTERS = 2000
+# Above this many members a cluster's medoid is approximated by the member
+# closest to its centroid (the exact one needs the m x m distance matrix)
+MEDOID_EXACT_MAX = 2000
 
-def _build_tfidf_vectors(payloads):
-    """
-    Build character-level TF-IDF vectors
-    """
-    vectorizer = TfidfVectorizer(
-        analyzer="char",
-        ngram_range=(5, 10),      # sweet spot for payloads
-        min_df=0.2,
-        max_df=0.8,
-        sublinear_tf=True,
-        norm="l2"
-    )
-    X = vectorizer.fit_transform(payloads)
-    return X
-
-def _reduce_dimension(X, n_components=50):
-    """
-    Reduce sparse TF-IDF vectors for faster clustering
-    """
-    if X.shape[1] <= n_components:
-        return X
-
-    svd = TruncatedSVD(n_components=n_components, random_state=42)
-    return svd.fit_transform(X)
 
 DISTANCE_METRICS = {
     "hdbscan": {
@@ -112,19 +96,172 @@ def _cluster_payloads_HAC(X, distance_threshold=1.5):
     labels = hac.fit_predict(X)
     return labels
     
-def clustering(payloads, reduce_dim_to=100, method="HDBSCAN", cluster_kwargs={}):
+def _micro_cluster_count(n_samples):
+    """
+    Number of k-means micro-clusters for HAC_MINIBATCH: ~50 payloads each,
+    capped so the HAC step stays small
+    """
+    return int(min(n_samples, MAX_MICRO_CLUSTERS, max(MIN_MICRO_CLUSTERS, n_samples // 50)))
+
+def _cluster_payloads_HAC_MINIBATCH(X, distance_threshold=1.5, n_micro_clusters=None):
+    """
+    Scalable HAC: MiniBatchKMeans pre-groups the payloads into micro-clusters,
+    then Ward HAC merges the micro-cluster centers. Works on sparse input
+    directly; only the (n_micro_clusters x n_features) centers are dense.
+    """
+    from sklearn.cluster import MiniBatchKMeans
+    n_samples = X.shape[0]
+    n_micro_clusters = min(n_samples, n_micro_clusters or _micro_cluster_count(n_samples))
+    if n_micro_clusters < 2:
+        return np.zeros(n_samples, dtype=int)
+
+    kmeans = MiniBatchKMeans(
+        n_clusters=n_micro_clusters,
+        batch_size=4096,
+        n_init=1,           # micro-clusters over-segment anyway; restarts only cost time
+        random_state=42,
+    )
+    micro_labels = kmeans.fit_predict(X)
+    # Drop empty micro-clusters, then merge centers weighted by their sizes
+    used, micro_labels = np.unique(micro_labels, return_inverse=True)
+    sizes = np.bincount(micro_labels)
+    center_labels = _weighted_ward_labels(kmeans.cluster_centers_[used], sizes, distance_threshold)
+    return center_labels[micro_labels]
+
+def _weighted_ward_labels(centers, sizes, distance_threshold):
+    """
+    Ward HAC over weighted points (micro-cluster centers and their sizes),
+    cut at distance_threshold like AgglomerativeClustering(linkage="ward").
+
+    Nearest-neighbor chain with Lance-Williams updates on squared Ward
+    distances: O(m^2) memory and time for m centers. With unit weights the
+    labels equal AgglomerativeClustering's.
+    """
+    m = len(centers)
+    if m < 2:
+        return np.zeros(m, dtype=int)
+    centers = np.asarray(centers, dtype=float)
+    sizes = np.asarray(sizes, dtype=float).copy()
+    norms = (centers ** 2).sum(axis=1)
+    squared = np.maximum(norms[:, None] + norms[None, :] - 2 * centers @ centers.T, 0)
+    # Squared merge height of two clusters: 2 * na * nb / (na + nb) * |ca - cb|^2
+    D = 2 * np.outer(sizes, sizes) / (sizes[:, None] + sizes[None, :]) * squared
+    np.fill_diagonal(D, np.inf)
+
+    active = np.ones(m, dtype=bool)
+    parent = np.arange(m)
+    limit = distance_threshold ** 2
+    chain = []
+    remaining = m
+    while remaining > 1:
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        a = chain[-1]
+        b = int(np.argmin(D[a]))
+        if len(chain) > 1 and D[a, chain[-2]] <= D[a, b]:
+            b = chain[-2]
+        if len(chain) > 1 and b == chain[-2]:
+            # a and b are reciprocal nearest neighbors: merge b into a
+            chain.pop()
+            chain.pop()
+            height = D[a, b]
+            na, nb = sizes[a], sizes[b]
+            row = ((na + sizes) * D[a] + (nb + sizes) * D[b] - sizes * height) / (na + nb + sizes)
+            row[~active] = np.inf
+            row[a] = np.inf
+            D[a] = row
+            D[:, a] = row
+            D[b] = np.inf
+            D[:, b] = np.inf
+            active[b] = False
+            sizes[a] = na + nb
+            remaining -= 1
+            # Ward heights are monotone, so merges below the cut form exactly its clusters
+            if height <= limit:
+                parent[b] = a
+        else:
+            chain.append(b)
+
+    roots = np.empty(m, dtype=int)
+    for i in range(m):
+        root = i
+        while parent[root] != root:
+            root = parent[root]
+        roots[i] = root
+    return np.unique(roots, return_inverse=True)[1]
+
+def _cluster_payloads_AUTO(X, distance_threshold=1.5):
+    """
+    Exact HAC for small inputs, HAC_MINIBATCH once dense O(n^2) HAC gets too costly
+    """
+    if X.shape[0] <= HAC_MAX_SAMPLES:
+        return _cluster_payloads_HAC(X, distance_threshold=distance_threshold)
+    return _cluster_payloads_HAC_MINIBATCH(X, distance_threshold=distance_threshold)
+
+def clustering(payloads, reduce_dim_to=100, method="HDBSCAN", cluster_kwargs={}, return_vectors=False, extractor=None):
     """
     Main clustering function
+
+    Methods: "HDBSCAN", "HAC" (exact, dense, O(n^2)), "HAC_MINIBATCH"
+    (k-means micro-clusters + HAC, for large inputs) and "AUTO" (HAC up to
+    HAC_MAX_SAMPLES payloads, HAC_MINIBATCH above)
+
+    With return_vectors=True, returns (labels, reduced vectors) so callers can
+    pick representatives in the same space (see select_representatives)
+
+    extractor: PayloadFeatureExtractor to reuse; a fitted one only transforms
+    the payloads, an unfitted one is fitted on them. Default: a fresh one with
+    reduce_dim_to components
     """
-    data = _build_tfidf_vectors(payloads)
-    data_reduced = _reduce_dimension(data, n_components=reduce_dim_to)
+    if extractor is None:
+        extractor = PayloadFeatureExtractor(reduce_dim_to=reduce_dim_to)
+    data_reduced = extractor.transform(payloads) if extractor.fitted else extractor.fit_transform(payloads)
 
     if method == "HDBSCAN":
-        return _cluster_payloads_HDBSCAN(data_reduced, **cluster_kwargs)
+        labels = _cluster_payloads_HDBSCAN(data_reduced, **cluster_kwargs)
     elif method == "HAC":
-        return _cluster_payloads_HAC(data_reduced, **cluster_kwargs)
+        labels = _cluster_payloads_HAC(data_reduced, **cluster_kwargs)
+    elif method == "HAC_MINIBATCH":
+        labels = _cluster_payloads_HAC_MINIBATCH(data_reduced, **cluster_kwargs)
+    elif method == "AUTO":
+        labels = _cluster_payloads_AUTO(data_reduced, **cluster_kwargs)
     else:
         raise ValueError(f"Unsupported clustering method: {method}")
+    return (labels, data_reduced) if return_vectors else labels
+
+def select_representatives(X, k, weights=None):
+    """
+    Medoid and a diverse sample of one cluster's vectors
+
+    The medoid minimizes the (weighted) sum of euclidean distances to the
+    other members. The sample starts at the medoid and repeatedly adds the
+    member farthest from everything picked so far (farthest-point sampling),
+    so near-identical payloads are only picked once the distinct ones ran out.
+
+    Returns (medoid index, up to k sample indices with the medoid first)
+    """
+    if hasattr(X, "toarray"):
+        X = X.toarray()
+    X = np.asarray(X, dtype=float)
+    n = len(X)
+    weights = np.ones(n) if weights is None else np.asarray(weights, dtype=float)
+    if n > MEDOID_EXACT_MAX:
+        centroid = np.average(X, axis=0, weights=weights)
+        medoid = int(np.argmin(((X - centroid) ** 2).sum(axis=1)))
+    else:
+        norms = (X ** 2).sum(axis=1)
+        distances = np.sqrt(np.maximum(norms[:, None] + norms[None, :] - 2 * X @ X.T, 0))
+        medoid = int(np.argmin(distances @ weights))
+
+    sample = [medoid]
+    min_distance = np.linalg.norm(X - X[medoid], axis=1)
+    min_distance[medoid] = -np.inf
+    while len(sample) < min(k, n):
+        picked = int(np.argmax(min_distance))
+        sample.append(picked)
+        min_distance = np.minimum(min_distance, np.linalg.norm(X - X[picked], axis=1))
+        min_distance[picked] = -np.inf
+    return medoid, sample
 
 def evaluate_clusters(X, labels):
     """
@@ -205,5 +342,5 @@ def example_usage():
     RAW_PAYLOADS = list(set(RAW_PAYLOADS)) # type: list[str]
     print(f"Loaded {len(RAW_PAYLOADS)} unique payloads.")
     
-    cluster_labels = clustering(RAW_PAYLOADS, reduce_dim_to=100, method="HAC", cluster_kwargs={"distance_threshold":1.5})
+    cluster_labels = clustering(RAW_PAYLOADS, reduce_dim_to=100, method="AUTO", cluster_kwargs={"distance_threshold":1.5})
     save_output(RAW_PAYLOADS, cluster_labels, output_path=output_folder)
\ No newline at end of file
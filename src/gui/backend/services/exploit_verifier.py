@@ -15,27 +15,38 @@ the attack was successful.
 import os
 import re
 import time
+import threading
 import html
 import requests
 from enum import Enum
 from dataclasses import dataclass, field
+from functools import lru_cache
 from typing import Optional
 from urllib.parse import unquote, quote
 
+from services_external.dvwa_client import DVWAClient, DVWASessionHandle, get_client
+from services import block_detection
+
 # Flexible imports for different execution contexts
 DVWA_BASE_URL = None
 DVWA_SECURITY_LEVEL = None
+DVWA_STREAM_BLOCK_DETECTION = None
+SQLI_BLIND_BASELINE_TTL = None
 
 try:
     from ..config.settings import (
         DVWA_BASE_URL,
-        DVWA_SECURITY_LEVEL
+        DVWA_SECURITY_LEVEL,
+        DVWA_STREAM_BLOCK_DETECTION,
+        SQLI_BLIND_BASELINE_TTL
     )
 except ImportError:
     try:
         from config.settings import (
             DVWA_BASE_URL,
-            DVWA_SECURITY_LEVEL
+            DVWA_SECURITY_LEVEL,
+            DVWA_STREAM_BLOCK_DETECTION,
+            SQLI_BLIND_BASELINE_TTL
         )
     except ImportError:
         pass
@@ -45,6 +56,10 @@ if DVWA_BASE_URL is None:
     DVWA_BASE_URL = os.getenv("DVWA_BASE_URL", "http://localhost")
 if DVWA_SECURITY_LEVEL is None:
     DVWA_SECURITY_LEVEL = os.getenv("DVWA_SECURITY_LEVEL", "low")
+if DVWA_STREAM_BLOCK_DETECTION is None:
+    DVWA_STREAM_BLOCK_DETECTION = os.getenv("DVWA_STREAM_BLOCK_DETECTION", "true").lower() == "true"
+if SQLI_BLIND_BASELINE_TTL is None:
+    SQLI_BLIND_BASELINE_TTL = float(os.getenv("SQLI_BLIND_BASELINE_TTL", "300"))
 
 
 class ExploitStatus(Enum):
@@ -90,13 +105,100 @@ class ExploitResult:
             "attack_type": self.attack_type,
             "is_blocked": self.is_blocked,
             "is_exploited": self.is_exploited,
-            "bypassed_waf": self.is_bypassed_waf,
+            "bypassed_waf": self.bypassed_waf,
             "evidence": self.evidence,
             "evidence_type": self.evidence_type,
             "verification_details": self.verification_details,
         }
 
 
+@dataclass
+class SqliBlindBaseline:
+    """Answer of the blind SQLi page to a valid ID, used as reference."""
+    status_code: int
+    blocked: bool
+    response_type: str  # "exists", "missing" or "unknown"
+    content_length: int
+    fetched_at: float
+
+
+class BaselineCache:
+    """
+    Thread-safe TTL cache of blind SQLi baselines.
+
+    Keyed by (base_url, security_level, session_id, baseline_payload), so a
+    new session or security level never reuses an old baseline.
+    """
+
+    def __init__(self, ttl: float = SQLI_BLIND_BASELINE_TTL):
+        self.ttl = ttl
+        self._entries: dict[tuple, SqliBlindBaseline] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[SqliBlindBaseline]:
+        with self._lock:
+            baseline = self._entries.get(key)
+            if baseline is None:
+                return None
+            if time.monotonic() - baseline.fetched_at > self.ttl:
+                del self._entries[key]
+                return None
+            return baseline
+
+    def put(self, key: tuple, baseline: SqliBlindBaseline):
+        with self._lock:
+            self._entries[key] = baseline
+
+    def invalidate(self, base_url: str = None, session_id: str = None) -> int:
+        """
+        Drop cached baselines, all of them or those of a target and/or session.
+
+        Returns:
+            Number of dropped entries
+        """
+        base_url = base_url.rstrip("/") if base_url else None
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if (base_url is None or key[0] == base_url)
+                and (session_id is None or key[2] == session_id)
+            ]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+
+_baseline_cache = BaselineCache()
+
+
+def invalidate_sqli_blind_baselines(base_url: str = None, session_id: str = None) -> int:
+    """Invalidate cached blind SQLi baselines (all, or of a target and/or session)."""
+    return _baseline_cache.invalidate(base_url, session_id)
+
+
+def _combine_patterns(patterns: list[str], prefix: str, flags: int = 0) -> re.Pattern:
+    """Compile patterns into one alternation with a named group per pattern ({prefix}_{index})."""
+    return re.compile(
+        "|".join(f"(?P<{prefix}_{index}>{pattern})" for index, pattern in enumerate(patterns)),
+        flags,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _payload_xss_patterns(payload: str) -> tuple:
+    """
+    XSS_DANGEROUS_RES that occur in a payload (cached: the same payload is
+    checked against many responses).
+    """
+    # Every dangerous pattern needs one of these characters
+    if not any(char in payload for char in "<:=("):
+        return ()
+    return tuple(
+        pattern for pattern in ExploitVerifier._XSS_DANGEROUS_RES
+        if pattern.search(payload)
+    )
+
+
 class ExploitVerifier:
     """
     Verifies if payloads actually exploit DVWA vulnerabilities.
@@ -139,6 +241,9 @@ class ExploitVerifier:
         ],
     }
 
+    # Fixed delay (seconds) that marks a time-based blind SQLi response
+    TIME_BASED_THRESHOLD = 5
+
     # XSS indicators - check if payload is reflected without encoding
     XSS_DANGEROUS_PATTERNS = [
         r"<script[^>]*>",
@@ -154,7 +259,18 @@ class ExploitVerifier:
         r"url\s*\(\s*['\"]?javascript:",
     ]
 
-    def __init__(self, session_id: str, base_url: str = None, security_level: str = None):
+    # Compiled once at class load
+    _SQLI_INDICATORS_RE = _combine_patterns(SQLI_INDICATORS, "sqli", re.IGNORECASE | re.DOTALL)
+    _SQLI_INDICATOR_RES = [re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in SQLI_INDICATORS]
+    _XSS_DANGEROUS_RES = [re.compile(pattern, re.IGNORECASE) for pattern in XSS_DANGEROUS_PATTERNS]
+
+    def __init__(
+        self,
+        session_id: str,
+        base_url: str = None,
+        security_level: str = None,
+        client: Optional[DVWAClient | DVWASessionHandle] = None,
+    ):
         """
         Initialize verifier.
 
@@ -162,28 +278,31 @@ class ExploitVerifier:
             session_id: PHPSESSID from DVWA login
             base_url: DVWA base URL (default from settings)
             security_level: DVWA security level (default from settings)
+            client: Pooled DVWA client (default: shared client of base_url)
         """
         self.session_id = session_id
-        self.base_url = base_url or DVWA_BASE_URL
+        self.base_url = (base_url or DVWA_BASE_URL).rstrip("/")
         self.security_level = security_level or DVWA_SECURITY_LEVEL
         self.cookies = {
             "PHPSESSID": session_id,
             "security": self.security_level
         }
+        # Pooled client; every request carries this verifier's session cookies
+        self.client = (client or get_client(self.base_url)).bind(session_id, self.security_level)
+
+    def _check_blocked(self, response: requests.Response) -> tuple[bool, str]:
+        """
+        Check if request was blocked by WAF.
 
-    def _check_blocked(self, response: requests.Response) -> bool:
-        """Check if request was blocked by WAF."""
-        if response.status_code == 403:
-            return True
-        blocked_indicators = [
-            "ModSecurity",
-            "Access Denied",
-            "Request Blocked",
-            "Forbidden",
-            "NAXSI",
-            "WAF",
-        ]
-        return any(ind in response.text for ind in blocked_indicators)
+        Uses the same matcher as dvwa._check_blocked
+        (block_detection.get_dvwa_matcher), so both judge a response alike.
+
+        Returns:
+            (blocked, text): text is the body read by the check, since a
+            streamed body cannot be read a second time
+        """
+        signature, body = block_detection.match_block(response, block_detection.get_dvwa_matcher())
+        return signature is not None, block_detection.decode_body(response, body)
 
     def _normalize_payload(self, payload: str) -> str:
         """Normalize payload for comparison."""
@@ -199,42 +318,23 @@ class ExploitVerifier:
         Returns:
             (is_exploited, evidence)
         """
-        # Normalize for comparison
+        # Check 1: Exact payload reflection (dangerous)
         payload_lower = self._normalize_payload(payload)
         response_lower = response_text.lower()
-
-        # Check 1: Exact payload reflection (dangerous)
-        if payload_lower in response_lower:
-            # Find the reflected location
-            idx = response_lower.find(payload_lower)
+        idx = response_lower.find(payload_lower)
+        if idx != -1:
             evidence = response_text[max(0, idx-20):idx+len(payload)+20]
             return True, f"Exact reflection: ...{evidence}..."
 
-        # Check 2: Check for dangerous patterns from payload
-        for pattern in self.XSS_DANGEROUS_PATTERNS:
-            if re.search(pattern, payload, re.IGNORECASE):
-                # Payload has dangerous pattern, check if it's in response
-                if re.search(pattern, response_text, re.IGNORECASE):
-                    match = re.search(pattern, response_text, re.IGNORECASE)
-                    return True, f"Dangerous pattern reflected: {match.group()}"
-
-        # Check 3: Script tag reflection
-        script_patterns = [
-            r"<script[^>]*>[^<]*</script>",
-            r"<script[^>]*>",
-        ]
-        for pattern in script_patterns:
-            if re.search(pattern, payload, re.IGNORECASE):
-                if re.search(pattern, response_text, re.IGNORECASE):
-                    match = re.search(pattern, response_text, re.IGNORECASE)
-                    return True, f"Script tag reflected: {match.group()}"
-
-        # Check 4: Event handler reflection
-        event_pattern = r'on\w+\s*=\s*["\']?[^"\'>\s]+'
-        payload_events = re.findall(event_pattern, payload, re.IGNORECASE)
-        for event in payload_events:
-            if event.lower() in response_lower:
-                return True, f"Event handler reflected: {event}"
+        # Check 2: Dangerous patterns of the payload, searched in the response.
+        # This also covers reflected <script> tags and event handlers (both
+        # are in XSS_DANGEROUS_PATTERNS). Patterns are searched one by one:
+        # each keeps its fast literal-prefix scan, which one alternation of
+        # them would lose.
+        for pattern in _payload_xss_patterns(payload):
+            match = pattern.search(response_text)
+            if match:
+                return True, f"Dangerous pattern reflected: {match.group()}"
 
         return False, ""
 
@@ -242,65 +342,428 @@ class ExploitVerifier:
         """
         Check if SQL injection leaked data.
 
+        All indicators are searched in one pass. On a hit, the evidence is
+        the match of the first indicator in SQLI_INDICATORS order, as when
+        each indicator was searched in turn.
+
         Returns:
             (is_exploited, evidence)
         """
-        for pattern in self.SQLI_INDICATORS:
-            match = re.search(pattern, response_text, re.IGNORECASE | re.DOTALL)
-            if match:
-                return True, f"Data leak detected: {match.group()[:100]}..."
+        match = self._SQLI_INDICATORS_RE.search(response_text)
+        if match:
+            # The combined match is the leftmost one; an indicator listed
+            # before it may still match further on
+            index = int(match.lastgroup.rsplit("_", 1)[1])
+            for pattern in self._SQLI_INDICATOR_RES[:index]:
+                earlier = pattern.search(response_text)
+                if earlier:
+                    match = earlier
+                    break
+            return True, f"Data leak detected: {match.group()[:100]}..."
 
         return False, ""
 
-    def verify_xss_reflected(self, payload: str) -> ExploitResult:
+    def _sqli_blind_response_type(self, response_text: str) -> str:
+        """Classify a blind SQLi page as "exists", "missing" or "unknown"."""
+        if any(ind in response_text for ind in self.SQLI_BLIND_INDICATORS["true_response"]):
+            return "exists"
+        if any(ind in response_text for ind in self.SQLI_BLIND_INDICATORS["false_response"]):
+            return "missing"
+        return "unknown"
+
+    def _baseline_key(self, baseline_payload: str) -> tuple:
+        session_id = self.client.session_id or self.session_id
+        return (self.base_url, self.security_level, session_id, baseline_payload)
+
+    def get_sqli_blind_baseline(self, baseline_payload: str = "1", refresh: bool = False) -> SqliBlindBaseline:
         """
-        Verify XSS Reflected exploit.
+        Get the baseline (valid ID) response of the blind SQLi page.
+
+        Cached per (base_url, security level, session) for
+        SQLI_BLIND_BASELINE_TTL seconds; blocked baselines are not cached.
+
+        Args:
+            baseline_payload: Valid ID used as reference
+            refresh: Ignore the cache and fetch a new baseline
+        """
+        key = self._baseline_key(baseline_payload)
+        if not refresh:
+            baseline = _baseline_cache.get(key)
+            if baseline is not None:
+                return baseline
+
+        url = f"{self.base_url}/vulnerabilities/sqli_blind/"
+        params = {"id": baseline_payload, "Submit": "Submit"}
+        response = self.client.get(url, params=params, timeout=10, stream=DVWA_STREAM_BLOCK_DETECTION)
+        blocked, text = self._check_blocked(response)
+        baseline = SqliBlindBaseline(
+            status_code=response.status_code,
+            blocked=blocked,
+            response_type="unknown" if blocked else self._sqli_blind_response_type(text),
+            content_length=len(text.encode()),
+            fetched_at=time.monotonic(),
+        )
+        if not blocked:
+            # Key again: the request may have renewed an expired session
+            _baseline_cache.put(self._baseline_key(baseline_payload), baseline)
+        return baseline
+
+    # =========================================================================
+    # Response evaluation
+    # Each evaluate_* judges an already-sent request, so callers that send the
+    # payload themselves (dvwa.attack(..., verify=True)) need no second request.
+    # =========================================================================
+
+    def evaluate_xss_reflected(self, payload: str, response: requests.Response) -> ExploitResult:
+        """
+        Evaluate the response of an XSS Reflected request.
 
         The payload is exploited if:
         1. Request is not blocked (200)
         2. Payload or dangerous patterns are reflected in response without encoding
         """
         url = f"{self.base_url}/vulnerabilities/xss_r/"
-        params = {"name": payload}
 
-        try:
-            response = requests.get(url, params=params, cookies=self.cookies, timeout=10)
+        # Check if blocked
+        blocked, text = self._check_blocked(response)
+        if blocked:
+            return ExploitResult(
+                status=ExploitStatus.BLOCKED,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type="xss_reflected",
+                response_snippet=text[:500],
+            )
+
+        # Check if XSS is reflected
+        is_exploited, evidence = self._check_xss_reflected(payload, text)
 
-            # Check if blocked
-            if self._check_blocked(response):
+        if is_exploited:
+            return ExploitResult(
+                status=ExploitStatus.EXPLOITED,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type="xss_reflected",
+                evidence=evidence,
+                evidence_type="reflected_xss",
+                verification_details={"url": url},
+            )
+        else:
+            # Payload was sanitized or encoded
+            return ExploitResult(
+                status=ExploitStatus.PASSED_NO_EFFECT,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type="xss_reflected",
+                verification_details={
+                    "reason": "Payload was sanitized/encoded by application",
+                    "url": url,
+                },
+            )
+
+    def evaluate_xss_dom(self, payload: str, response: requests.Response) -> ExploitResult:
+        """
+        Evaluate the response of an XSS DOM request.
+
+        Note: DOM XSS is client-side, so we can only check if payload
+        reaches the page. True verification requires browser execution.
+        """
+        blocked, text = self._check_blocked(response)
+        if blocked:
+            return ExploitResult(
+                status=ExploitStatus.BLOCKED,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type="xss_dom",
+            )
+
+        # Check for dangerous patterns
+        is_dangerous, evidence = self._check_xss_reflected(payload, text)
+
+        # For DOM XSS, check if payload is in response (will be processed by JS)
+        # The actual exploit happens client-side. The exact-reflection check
+        # above already answers this.
+        payload_in_response = evidence.startswith("Exact reflection")
+
+        if is_dangerous or payload_in_response:
+            return ExploitResult(
+                status=ExploitStatus.EXPLOITED,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type="xss_dom",
+                evidence=evidence or "Payload in DOM context",
+                evidence_type="dom_xss",
+                verification_details={
+                    "note": "DOM XSS requires browser execution for full verification",
+                    "payload_in_response": payload_in_response,
+                },
+            )
+        else:
+            return ExploitResult(
+                status=ExploitStatus.PASSED_NO_EFFECT,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type="xss_dom",
+            )
+
+    def evaluate_xss_stored(self, payload: str, post_response: requests.Response) -> ExploitResult:
+        """
+        Evaluate the response of an XSS Stored POST.
+
+        Stored XSS is the one type that needs a follow-up request: the
+        guestbook page is read back to check if the payload was stored and
+        rendered.
+        """
+        url = f"{self.base_url}/vulnerabilities/xss_s/"
+
+        blocked, _ = self._check_blocked(post_response)
+        if blocked:
+            return ExploitResult(
+                status=ExploitStatus.BLOCKED,
+                status_code=post_response.status_code,
+                payload=payload,
+                attack_type="xss_stored",
+            )
+
+        # GET the page to verify storage
+        get_response = self.client.get(url, timeout=10)
+
+        # Check if payload is stored and reflected
+        is_exploited, evidence = self._check_xss_reflected(payload, get_response.text)
+
+        if is_exploited:
+            return ExploitResult(
+                status=ExploitStatus.EXPLOITED,
+                status_code=post_response.status_code,
+                payload=payload,
+                attack_type="xss_stored",
+                evidence=evidence,
+                evidence_type="stored_xss",
+                verification_details={"stored_and_rendered": True},
+            )
+        else:
+            return ExploitResult(
+                status=ExploitStatus.PASSED_NO_EFFECT,
+                status_code=post_response.status_code,
+                payload=payload,
+                attack_type="xss_stored",
+                verification_details={"reason": "Payload was sanitized before storage"},
+            )
+
+    def evaluate_sqli(self, payload: str, response: requests.Response) -> ExploitResult:
+        """
+        Evaluate the response of a SQL Injection request.
+
+        The payload is exploited if:
+        1. Request is not blocked
+        2. Response contains leaked data (user records, errors, etc.)
+        """
+        blocked, text = self._check_blocked(response)
+        if blocked:
+            return ExploitResult(
+                status=ExploitStatus.BLOCKED,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type="sqli",
+            )
+
+        # Check for data leak
+        is_exploited, evidence = self._check_sqli_data_leak(text)
+
+        if is_exploited:
+            return ExploitResult(
+                status=ExploitStatus.EXPLOITED,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type="sqli",
+                evidence=evidence,
+                evidence_type="data_leak",
+            )
+
+        # Check if there's any user data (normal response for valid ID)
+        has_normal_data = "First name:" in text and "Surname:" in text
+
+        if has_normal_data:
+            # Count how many records - more than 1 indicates SQLi
+            record_count = text.count("First name:")
+            if record_count > 1:
                 return ExploitResult(
-                    status=ExploitStatus.BLOCKED,
+                    status=ExploitStatus.EXPLOITED,
                     status_code=response.status_code,
                     payload=payload,
-                    attack_type="xss_reflected",
-                    response_snippet=response.text[:500],
+                    attack_type="sqli",
+                    evidence=f"Multiple records returned: {record_count}",
+                    evidence_type="data_leak",
                 )
 
-            # Check if XSS is reflected
-            is_exploited, evidence = self._check_xss_reflected(payload, response.text)
+        return ExploitResult(
+            status=ExploitStatus.PASSED_NO_EFFECT,
+            status_code=response.status_code,
+            payload=payload,
+            attack_type="sqli",
+            verification_details={"reason": "No data leak detected"},
+        )
+
+    def evaluate_sqli_blind(
+        self,
+        payload: str,
+        response: requests.Response,
+        elapsed_time: Optional[float] = None,
+        baseline: Optional[SqliBlindBaseline] = None,
+        time_threshold: Optional[float] = None,
+    ) -> ExploitResult:
+        """
+        Evaluate the response of a Blind SQL Injection request.
+
+        Detects time-based (slow response) and boolean-based (exists/missing
+        answer to a payload with AND/OR) injection.
+
+        Args:
+            payload: SQL injection payload
+            response: Response of the payload request
+            elapsed_time: Request duration in seconds (default response.elapsed)
+            baseline: Reference answer to a valid ID, reported in the details
+            time_threshold: Seconds above which the response counts as delayed
+                (default TIME_BASED_THRESHOLD; services.sqli_timing learns one per target)
+        """
+        if elapsed_time is None:
+            elapsed_time = response.elapsed.total_seconds()
+        if time_threshold is None:
+            time_threshold = self.TIME_BASED_THRESHOLD
+
+        blocked, text = self._check_blocked(response)
+        if blocked:
+            return ExploitResult(
+                status=ExploitStatus.BLOCKED,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type="sqli_blind",
+            )
+
+        # Check for time-based SQLi (if response took > threshold, 5 seconds by default)
+        if elapsed_time > time_threshold:
+            return ExploitResult(
+                status=ExploitStatus.EXPLOITED,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type="sqli_blind",
+                evidence=f"Time-based: Response took {elapsed_time:.2f}s",
+                evidence_type="time_based",
+                verification_details={"time_threshold": time_threshold},
+            )
+
+        # Check for boolean-based SQLi
+        response_type = self._sqli_blind_response_type(text)
+        payload_has_exists = response_type == "exists"
+        payload_has_missing = response_type == "missing"
+        baseline_details = {}
+        if baseline is not None:
+            baseline_details = {
+                "baseline_response_type": baseline.response_type,
+                "differs_from_baseline": response_type != baseline.response_type,
+            }
 
-            if is_exploited:
+        # If payload causes different behavior than expected
+        # E.g., "1' AND '1'='1" should still return "exists"
+        # E.g., "1' AND '1'='2" should return "missing"
+        if "and" in payload.lower() or "or" in payload.lower():
+            if payload_has_exists or payload_has_missing:
                 return ExploitResult(
                     status=ExploitStatus.EXPLOITED,
                     status_code=response.status_code,
                     payload=payload,
-                    attack_type="xss_reflected",
-                    evidence=evidence,
-                    evidence_type="reflected_xss",
-                    verification_details={"url": url},
+                    attack_type="sqli_blind",
+                    evidence=f"Boolean-based: Response indicates {'exists' if payload_has_exists else 'missing'}",
+                    evidence_type="boolean_based",
+                    verification_details=baseline_details,
                 )
-            else:
-                # Payload was sanitized or encoded
+
+        return ExploitResult(
+            status=ExploitStatus.PASSED_NO_EFFECT,
+            status_code=response.status_code,
+            payload=payload,
+            attack_type="sqli_blind",
+            verification_details={
+                "elapsed_time": elapsed_time,
+                "response_type": response_type,
+                **baseline_details,
+            },
+        )
+
+    def evaluate(
+        self,
+        payload: str,
+        attack_type: str,
+        response: requests.Response,
+        elapsed_time: Optional[float] = None,
+    ) -> ExploitResult:
+        """
+        Evaluate the response of an already-sent attack request.
+
+        Args:
+            payload: Attack payload
+            attack_type: Type of attack (same names as verify())
+            response: Response of the request that carried the payload
+            elapsed_time: Request duration, used by blind SQLi (default response.elapsed)
+
+        Returns:
+            ExploitResult with verification status
+        """
+        attack_type = attack_type.lower().replace("-", "_").replace(" ", "_")
+
+        evaluators = {
+            "xss_reflected": self.evaluate_xss_reflected,
+            "xss_r": self.evaluate_xss_reflected,
+            "xss_dom": self.evaluate_xss_dom,
+            "xss_d": self.evaluate_xss_dom,
+            "xss_stored": self.evaluate_xss_stored,
+            "xss_s": self.evaluate_xss_stored,
+            "sqli": self.evaluate_sqli,
+            "sql_injection": self.evaluate_sqli,
+        }
+
+        try:
+            if attack_type in ("sqli_blind", "sql_injection_blind"):
+                # Only an already-cached baseline: no extra request here
+                baseline = _baseline_cache.get(self._baseline_key("1"))
+                return self.evaluate_sqli_blind(payload, response, elapsed_time, baseline)
+            evaluator = evaluators.get(attack_type)
+            if not evaluator:
                 return ExploitResult(
-                    status=ExploitStatus.PASSED_NO_EFFECT,
-                    status_code=response.status_code,
+                    status=ExploitStatus.ERROR,
+                    status_code=0,
                     payload=payload,
-                    attack_type="xss_reflected",
-                    verification_details={
-                        "reason": "Payload was sanitized/encoded by application",
-                        "url": url,
-                    },
+                    attack_type=attack_type,
+                    verification_details={"error": f"Unknown attack type: {attack_type}"},
                 )
+            return evaluator(payload, response)
+        except Exception as e:
+            return ExploitResult(
+                status=ExploitStatus.ERROR,
+                status_code=response.status_code,
+                payload=payload,
+                attack_type=attack_type,
+                verification_details={"error": str(e)},
+            )
+
+    # =========================================================================
+    # Verification (send the payload, then evaluate its response)
+    # =========================================================================
+
+    def verify_xss_reflected(self, payload: str) -> ExploitResult:
+        """
+        Verify XSS Reflected exploit.
+
+        The payload is exploited if:
+        1. Request is not blocked (200)
+        2. Payload or dangerous patterns are reflected in response without encoding
+        """
+        url = f"{self.base_url}/vulnerabilities/xss_r/"
+        params = {"name": payload}
+
+        try:
+            response = self.client.get(url, params=params, timeout=10, stream=DVWA_STREAM_BLOCK_DETECTION)
+            return self.evaluate_xss_reflected(payload, response)
 
         except Exception as e:
             return ExploitResult(
@@ -322,43 +785,8 @@ class ExploitVerifier:
         params = {"default": payload}
 
         try:
-            response = requests.get(url, params=params, cookies=self.cookies, timeout=10)
-
-            if self._check_blocked(response):
-                return ExploitResult(
-                    status=ExploitStatus.BLOCKED,
-                    status_code=response.status_code,
-                    payload=payload,
-                    attack_type="xss_dom",
-                )
-
-            # For DOM XSS, check if payload is in response (will be processed by JS)
-            # The actual exploit happens client-side
-            payload_in_response = self._normalize_payload(payload) in response.text.lower()
-
-            # Check for dangerous patterns
-            is_dangerous, evidence = self._check_xss_reflected(payload, response.text)
-
-            if is_dangerous or payload_in_response:
-                return ExploitResult(
-                    status=ExploitStatus.EXPLOITED,
-                    status_code=response.status_code,
-                    payload=payload,
-                    attack_type="xss_dom",
-                    evidence=evidence or "Payload in DOM context",
-                    evidence_type="dom_xss",
-                    verification_details={
-                        "note": "DOM XSS requires browser execution for full verification",
-                        "payload_in_response": payload_in_response,
-                    },
-                )
-            else:
-                return ExploitResult(
-                    status=ExploitStatus.PASSED_NO_EFFECT,
-                    status_code=response.status_code,
-                    payload=payload,
-                    attack_type="xss_dom",
-                )
+            response = self.client.get(url, params=params, timeout=10, stream=DVWA_STREAM_BLOCK_DETECTION)
+            return self.evaluate_xss_dom(payload, response)
 
         except Exception as e:
             return ExploitResult(
@@ -373,53 +801,25 @@ class ExploitVerifier:
         """
         Verify XSS Stored exploit.
 
-        1. POST the payload to guestbook
+        1. POST the payload to guestbook, shaped exactly like dvwa.attack's
+           request so the verdict matches the request the WAF was tested with
         2. GET the page to check if payload is stored and rendered
         """
-        url = f"{self.base_url}/vulnerabilities/xss_s/"
+        # Imported here: dvwa builds on this module
+        from services_external.dvwa import build_attack_request
 
         try:
             # Step 1: POST the payload
-            data = {
-                "txtName": payload[:10],  # Name field has length limit
-                "mtxMessage": payload,     # Message field for payload
-                "btnSign": "Sign Guestbook"
-            }
-
-            post_response = requests.post(url, data=data, cookies=self.cookies, timeout=10)
-
-            if self._check_blocked(post_response):
-                return ExploitResult(
-                    status=ExploitStatus.BLOCKED,
-                    status_code=post_response.status_code,
-                    payload=payload,
-                    attack_type="xss_stored",
-                )
+            request = build_attack_request("xss_stored", payload)
+            post_response = self.client.post(
+                self.client.url(request.path),
+                data=request.data,
+                timeout=10,
+                stream=DVWA_STREAM_BLOCK_DETECTION,
+            )
 
             # Step 2: GET the page to verify storage
-            get_response = requests.get(url, cookies=self.cookies, timeout=10)
-
-            # Check if payload is stored and reflected
-            is_exploited, evidence = self._check_xss_reflected(payload, get_response.text)
-
-            if is_exploited:
-                return ExploitResult(
-                    status=ExploitStatus.EXPLOITED,
-                    status_code=post_response.status_code,
-                    payload=payload,
-                    attack_type="xss_stored",
-                    evidence=evidence,
-                    evidence_type="stored_xss",
-                    verification_details={"stored_and_rendered": True},
-                )
-            else:
-                return ExploitResult(
-                    status=ExploitStatus.PASSED_NO_EFFECT,
-                    status_code=post_response.status_code,
-                    payload=payload,
-                    attack_type="xss_stored",
-                    verification_details={"reason": "Payload was sanitized before storage"},
-                )
+            return self.evaluate_xss_stored(payload, post_response)
 
         except Exception as e:
             return ExploitResult(
@@ -442,52 +842,8 @@ class ExploitVerifier:
         params = {"id": payload, "Submit": "Submit"}
 
         try:
-            response = requests.get(url, params=params, cookies=self.cookies, timeout=10)
-
-            if self._check_blocked(response):
-                return ExploitResult(
-                    status=ExploitStatus.BLOCKED,
-                    status_code=response.status_code,
-                    payload=payload,
-                    attack_type="sqli",
-                )
-
-            # Check for data leak
-            is_exploited, evidence = self._check_sqli_data_leak(response.text)
-
-            if is_exploited:
-                return ExploitResult(
-                    status=ExploitStatus.EXPLOITED,
-                    status_code=response.status_code,
-                    payload=payload,
-                    attack_type="sqli",
-                    evidence=evidence,
-                    evidence_type="data_leak",
-                )
-            else:
-                # Check if there's any user data (normal response for valid ID)
-                has_normal_data = "First name:" in response.text and "Surname:" in response.text
-
-                if has_normal_data:
-                    # Count how many records - more than 1 indicates SQLi
-                    record_count = response.text.count("First name:")
-                    if record_count > 1:
-                        return ExploitResult(
-                            status=ExploitStatus.EXPLOITED,
-                            status_code=response.status_code,
-                            payload=payload,
-                            attack_type="sqli",
-                            evidence=f"Multiple records returned: {record_count}",
-                            evidence_type="data_leak",
-                        )
-
-                return ExploitResult(
-                    status=ExploitStatus.PASSED_NO_EFFECT,
-                    status_code=response.status_code,
-                    payload=payload,
-                    attack_type="sqli",
-                    verification_details={"reason": "No data leak detected"},
-                )
+            response = self.client.get(url, params=params, timeout=10, stream=DVWA_STREAM_BLOCK_DETECTION)
+            return self.evaluate_sqli(payload, response)
 
         except Exception as e:
             return ExploitResult(
@@ -503,91 +859,82 @@ class ExploitVerifier:
         Verify Blind SQL Injection exploit.
 
         Blind SQLi is verified by comparing responses:
-        1. Send baseline (valid) request
+        1. Get the baseline (valid) response, cached per target and session
         2. Send payload request
         3. Compare responses to detect boolean/time-based differences
         """
-        url = f"{self.base_url}/vulnerabilities/sqli_blind/"
-
         try:
-            # Get baseline response (valid ID)
-            baseline_params = {"id": baseline_payload, "Submit": "Submit"}
-            baseline_response = requests.get(url, params=baseline_params, cookies=self.cookies, timeout=10)
-
-            if self._check_blocked(baseline_response):
-                return ExploitResult(
-                    status=ExploitStatus.ERROR,
-                    status_code=baseline_response.status_code,
-                    payload=payload,
-                    attack_type="sqli_blind",
-                    verification_details={"error": "Baseline request blocked"},
-                )
-
-            baseline_has_exists = any(
-                ind in baseline_response.text
-                for ind in self.SQLI_BLIND_INDICATORS["true_response"]
+            baseline = self.get_sqli_blind_baseline(baseline_payload)
+        except Exception as e:
+            return ExploitResult(
+                status=ExploitStatus.ERROR,
+                status_code=0,
+                payload=payload,
+                attack_type="sqli_blind",
+                verification_details={"error": str(e)},
             )
+        return self._verify_sqli_blind_against(payload, baseline)
 
-            # Test the payload
-            start_time = time.time()
-            payload_params = {"id": payload, "Submit": "Submit"}
-            payload_response = requests.get(url, params=payload_params, cookies=self.cookies, timeout=15)
-            elapsed_time = time.time() - start_time
+    def verify_sqli_blind_batch(self, payloads: list[str], baseline_payload: str = "1") -> list[ExploitResult]:
+        """
+        Verify many Blind SQL Injection payloads against one baseline.
 
-            if self._check_blocked(payload_response):
-                return ExploitResult(
-                    status=ExploitStatus.BLOCKED,
-                    status_code=payload_response.status_code,
-                    payload=payload,
-                    attack_type="sqli_blind",
-                )
+        The baseline is fetched (or taken from the cache) once for the batch.
+        The payloads are then sent by services.sqli_timing through this
+        verifier's session, and judged against the target's learned latency
+        threshold instead of TIME_BASED_THRESHOLD. One session serves one
+        request at a time, so they are sent one after the other.
 
-            # Check for time-based SQLi (if response took > 5 seconds)
-            if elapsed_time > 5:
-                return ExploitResult(
-                    status=ExploitStatus.EXPLOITED,
-                    status_code=payload_response.status_code,
+        Returns:
+            ExploitResult list in input order
+        """
+        # Imported here: sqli_timing builds on this module
+        from services.sqli_timing import verify_time_based
+
+        try:
+            baseline = self.get_sqli_blind_baseline(baseline_payload)
+            if baseline.blocked:
+                return [self._verify_sqli_blind_against(payload, baseline) for payload in payloads]
+            return verify_time_based(
+                payloads,
+                self.base_url,
+                security_level=self.security_level,
+                baseline=baseline,
+                session=self.client,
+            )
+        except Exception as e:
+            return [
+                ExploitResult(
+                    status=ExploitStatus.ERROR,
+                    status_code=0,
                     payload=payload,
                     attack_type="sqli_blind",
-                    evidence=f"Time-based: Response took {elapsed_time:.2f}s",
-                    evidence_type="time_based",
+                    verification_details={"error": str(e)},
                 )
+                for payload in payloads
+            ]
 
-            # Check for boolean-based SQLi
-            payload_has_exists = any(
-                ind in payload_response.text
-                for ind in self.SQLI_BLIND_INDICATORS["true_response"]
-            )
-            payload_has_missing = any(
-                ind in payload_response.text
-                for ind in self.SQLI_BLIND_INDICATORS["false_response"]
-            )
-
-            # If payload causes different behavior than expected
-            # E.g., "1' AND '1'='1" should still return "exists"
-            # E.g., "1' AND '1'='2" should return "missing"
-            if "and" in payload.lower() or "or" in payload.lower():
-                if payload_has_exists or payload_has_missing:
-                    return ExploitResult(
-                        status=ExploitStatus.EXPLOITED,
-                        status_code=payload_response.status_code,
-                        payload=payload,
-                        attack_type="sqli_blind",
-                        evidence=f"Boolean-based: Response indicates {'exists' if payload_has_exists else 'missing'}",
-                        evidence_type="boolean_based",
-                    )
+    def _verify_sqli_blind_against(self, payload: str, baseline: SqliBlindBaseline) -> ExploitResult:
+        url = f"{self.base_url}/vulnerabilities/sqli_blind/"
 
+        if baseline.blocked:
             return ExploitResult(
-                status=ExploitStatus.PASSED_NO_EFFECT,
-                status_code=payload_response.status_code,
+                status=ExploitStatus.ERROR,
+                status_code=baseline.status_code,
                 payload=payload,
                 attack_type="sqli_blind",
-                verification_details={
-                    "elapsed_time": elapsed_time,
-                    "response_type": "exists" if payload_has_exists else ("missing" if payload_has_missing else "unknown"),
-                },
+                verification_details={"error": "Baseline request blocked"},
             )
 
+        try:
+            # Test the payload
+            start_time = time.time()
+            payload_params = {"id": payload, "Submit": "Submit"}
+            payload_response = self.client.get(url, params=payload_params, timeout=15, stream=DVWA_STREAM_BLOCK_DETECTION)
+            elapsed_time = time.time() - start_time
+
+            return self.evaluate_sqli_blind(payload, payload_response, elapsed_time, baseline)
+
         except requests.Timeout:
             # Timeout might indicate time-based SQLi
             return ExploitResult(
@@ -670,7 +1017,8 @@ def verify_exploit(
     payload: str,
     attack_type: str,
     session_id: str,
-    base_url: str = None
+    base_url: str = None,
+    client: Optional[DVWAClient] = None,
 ) -> ExploitResult:
     """
     Verify a single exploit.
@@ -680,23 +1028,25 @@ def verify_exploit(
         attack_type: Type of attack
         session_id: DVWA session ID
         base_url: DVWA base URL (optional)
+        client: Pooled DVWA client (optional)
 
     Returns:
         ExploitResult
     """
-    verifier = ExploitVerifier(session_id, base_url)
+    verifier = ExploitVerifier(session_id, base_url, client=client)
     return verifier.verify(payload, attack_type)
 
 
-def get_verifier(session_id: str, base_url: str = None) -> ExploitVerifier:
+def get_verifier(session_id: str, base_url: str = None, client: Optional[DVWAClient] = None) -> ExploitVerifier:
     """
     Get ExploitVerifier instance.
 
     Args:
         session_id: DVWA session ID
         base_url: DVWA base URL (optional)
+        client: Pooled DVWA client (optional)
 
     Returns:
         ExploitVerifier instance
     """
-    return ExploitVerifier(session_id, base_url)
+    return ExploitVerifier(session_id, base_url, client=client)
@@ -0,0 +1,158 @@
+"""
+Reusable payload feature extractor: character n-gram TF-IDF + TruncatedSVD.
+
+clustering.clustering() used to fit a fresh vectorizer and SVD on every call.
+A PayloadFeatureExtractor is fitted once and then only transforms, and it can
+be pickled to disk and loaded back. Two vectorizers are available:
+    - "tfidf":   char 5-10-gram TfidfVectorizer with min_df/max_df pruning
+                 (the original clustering features)
+    - "hashing": char 5-10-gram HashingVectorizer + TfidfTransformer; no
+                 vocabulary is built, so memory stays bounded by n_features
+                 however long or numerous the payloads are
+
+Usage:
+    extractor = PayloadFeatureExtractor(reduce_dim_to=50).fit(payloads)
+    X = extractor.transform(new_payloads)
+    extractor.save(path)
+    extractor = PayloadFeatureExtractor.load(path)
+"""
+
+import os
+import pickle
+from typing import Optional
+
+import numpy as np
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.pipeline import make_pipeline
+
+# Flexible imports for different execution contexts
+FEATURE_EXTRACTOR_METHOD = None
+FEATURE_HASHING_N_FEATURES = None
+
+try:
+    from ..config.settings import FEATURE_EXTRACTOR_METHOD, FEATURE_HASHING_N_FEATURES
+except ImportError:
+    try:
+        from config.settings import FEATURE_EXTRACTOR_METHOD, FEATURE_HASHING_N_FEATURES
+    except ImportError:
+        pass
+
+# Default values if imports failed
+if FEATURE_EXTRACTOR_METHOD is None:
+    FEATURE_EXTRACTOR_METHOD = os.getenv("FEATURE_EXTRACTOR_METHOD", "tfidf")
+if FEATURE_HASHING_N_FEATURES is None:
+    FEATURE_HASHING_N_FEATURES = int(os.getenv("FEATURE_HASHING_N_FEATURES", str(2 ** 16)))
+
+NGRAM_RANGE = (5, 10)  # sweet spot for payloads
+
+# Bump when the pickled layout changes; older files are rejected by load()
+EXTRACTOR_VERSION = 1
+
+
+def _build_tfidf_vectorizer():
+    """
+    Unfitted character-level TF-IDF vectorizer used for payload clustering
+    """
+    return TfidfVectorizer(
+        analyzer="char",
+        ngram_range=NGRAM_RANGE,
+        min_df=0.2,
+        max_df=0.8,
+        sublinear_tf=True,
+        norm="l2"
+    )
+
+
+def _build_hashing_vectorizer(n_features: int):
+    """
+    Unfitted hashed counterpart of _build_tfidf_vectorizer (no df pruning)
+    """
+    return make_pipeline(
+        HashingVectorizer(
+            analyzer="char",
+            ngram_range=NGRAM_RANGE,
+            n_features=n_features,
+            alternate_sign=False,
+            norm=None,
+        ),
+        TfidfTransformer(sublinear_tf=True, norm="l2"),
+    )
+
+
+class PayloadFeatureExtractor:
+    """Fitted-once TF-IDF (or hashed TF-IDF) + SVD payload vectors."""
+
+    def __init__(self, reduce_dim_to: int = 100, method: Optional[str] = None, n_features: Optional[int] = None):
+        """
+        Initialize extractor.
+
+        Args:
+            reduce_dim_to: SVD components; skipped when there are fewer features
+            method: "tfidf" or "hashing" (default FEATURE_EXTRACTOR_METHOD)
+            n_features: Hash space size for "hashing" (default FEATURE_HASHING_N_FEATURES)
+        """
+        method = (method or FEATURE_EXTRACTOR_METHOD).lower()
+        if method not in ("tfidf", "hashing"):
+            raise ValueError(f"Unsupported feature extractor method: {method}")
+        self.reduce_dim_to = reduce_dim_to
+        self.method = method
+        self.n_features = n_features or FEATURE_HASHING_N_FEATURES
+        self.vectorizer = None
+        self.svd = None
+
+    @property
+    def fitted(self) -> bool:
+        return self.vectorizer is not None
+
+    def _new_vectorizer(self):
+        if self.method == "hashing":
+            return _build_hashing_vectorizer(self.n_features)
+        return _build_tfidf_vectorizer()
+
+    def fit_transform(self, payloads: list[str]) -> np.ndarray:
+        """Fit vectorizer and SVD on payloads; returns their dense reduced vectors."""
+        vectorizer = self._new_vectorizer()
+        X = vectorizer.fit_transform(payloads)
+        svd = None
+        if X.shape[1] > self.reduce_dim_to:
+            svd = TruncatedSVD(n_components=self.reduce_dim_to, random_state=42)
+            reduced = svd.fit_transform(X)
+        else:
+            reduced = X.toarray()
+        # Only replace the fitted state once both steps succeeded
+        self.vectorizer = vectorizer
+        self.svd = svd
+        return reduced
+
+    def fit(self, payloads: list[str]) -> "PayloadFeatureExtractor":
+        self.fit_transform(payloads)
+        return self
+
+    def transform(self, payloads: list[str]) -> np.ndarray:
+        """Dense reduced vectors of payloads with the fitted vectorizer and SVD."""
+        if not self.fitted:
+            raise RuntimeError("PayloadFeatureExtractor is not fitted")
+        X = self.vectorizer.transform(payloads)
+        return self.svd.transform(X) if self.svd is not None else X.toarray()
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def save(self, path: str):
+        """Pickle the extractor to path (written atomically)."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({"version": EXTRACTOR_VERSION, "extractor": self}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "PayloadFeatureExtractor":
+        """Load an extractor saved with save(); raises ValueError on a version mismatch."""
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if not isinstance(state, dict) or state.get("version") != EXTRACTOR_VERSION:
+            raise ValueError(f"Incompatible feature extractor file: {path}")
+        return state["extractor"]
@@ -65,7 +65,8 @@ def _generate_phase1_openai(waf_name, attack_type, num_of_payloads, technique) -
             }
         }
     }
-    result = llm.chatgpt_completion(messages=messages, model=OPENAI_MODEL, response_format=response_format)
+    # Repeated red-team prompts must yield fresh payloads, so bypass the LLM cache
+    result = llm.chatgpt_completion(messages=messages, model=OPENAI_MODEL, response_format=response_format, use_cache=False)
     content = result.get("choices", [])[0].get("message", {}).get("content", "{}")
     items = json.loads(content).get("items", [])
     return [
@@ -111,7 +112,8 @@ def _generate_phase3_openai(waf_name, attack_type, num_of_payloads, probe_histor
             }
         }
     }
-    result = llm.chatgpt_completion(messages=messages, model=OPENAI_MODEL, response_format=response_format)
+    # Repeated red-team prompts must yield fresh payloads, so bypass the LLM cache
+    result = llm.chatgpt_completion(messages=messages, model=OPENAI_MODEL, response_format=response_format, use_cache=False)
     content = result.get("choices", [])[0].get("message", {}).get("content", "{}")
     items = json.loads(content).get("items", [])
     return [
@@ -125,31 +127,127 @@ def _generate_phase3_openai(waf_name, attack_type, num_of_payloads, probe_histor
     ]
 
 
+# Extra rounds for payloads LLMShield failed to generate
+GENERATION_RETRIES = 1
+
+
+def _generate_payload_batch(waf_name, attack_type, items, adapter_name, label) -> List[str]:
+    """
+    llm.llmshield_generate_payloads_batch, retrying failed items up to
+    GENERATION_RETRIES times and logging any remaining shortfall.
+    """
+    payloads = llm.llmshield_generate_payloads_batch(
+        waf_name=waf_name,
+        attack_type=attack_type,
+        items=items,
+        adapter_name=adapter_name,
+    )
+    for _ in range(GENERATION_RETRIES):
+        missing = [i for i, payload in enumerate(payloads) if payload is None]
+        if not missing:
+            break
+        print(f"[{label}] retrying {len(missing)} failed generation(s) | {attack_type}")
+        retried = llm.llmshield_generate_payloads_batch(
+            waf_name=waf_name,
+            attack_type=attack_type,
+            items=[items[i] for i in missing],
+            adapter_name=adapter_name,
+        )
+        for i, payload in zip(missing, retried):
+            payloads[i] = payload
+    failed = sum(payload is None for payload in payloads)
+    if failed:
+        print(f"[{label}] WARNING: {failed}/{len(items)} payload(s) could not be generated for "
+              f"{waf_name} | {attack_type}; returning {len(items) - failed}")
+    return payloads
+
+
 def generate_payloads_phase1(waf_name:str, attack_type, num_of_payloads=1) -> List[PayloadResult]:
+    """
+    Generate num_of_payloads Phase 1 payloads in batched LLMShield requests.
+
+    Each payload gets its own technique combination (distinct while there are
+    unused ones). Results keep the request order; failed generations are
+    retried, and the ones still failing are skipped with a warning, so the
+    result may be shorter than num_of_payloads.
+    """
+    techniques = _sample_phase1_techniques(attack_type, num_of_payloads)
+    payloads = _generate_payload_batch(
+        waf_name,
+        attack_type,
+        [{"techniques": technique} for technique in techniques],
+        "phase1",
+        "RANDOM-PAYLOAD",
+    )
     results = []
-    for i in range(num_of_payloads):
+    for i, (technique, payload) in enumerate(zip(techniques, payloads)):
         print(f"[RANDOM-PAYLOAD] {i}/{num_of_payloads} | {attack_type}")
-        payload_result = generate_payload_phase1(waf_name, attack_type)
-        print("\tTechniques: " + payload_result.technique)
-        print(f"\t{payload_result.payload}")
-        results.append(payload_result)
+        if payload is None:
+            continue
+        print("\tTechniques: " + technique)
+        print(f"\t{payload}")
+        results.append(PayloadResult(
+            payload=payload,
+            technique=technique,
+            attack_type=attack_type,
+        ))
     return results
 
-def generate_payloads_phase3(waf_name, attack_type, num_of_payloads=1, probe_history: List[PayloadResult] = []) -> List[PayloadResult]:
+def generate_payloads_phase3(waf_name, attack_type, num_of_payloads=1, probe_history: List[PayloadResult] = [], probe_histories: List[List[PayloadResult]] = None) -> List[PayloadResult]:
+    """
+    Generate Phase 3 adaptive payloads in batched LLMShield requests.
+
+    probe_histories gives one probe history per payload (and overrides
+    num_of_payloads and probe_history). Results keep the request order;
+    failed generations are retried, and the ones still failing are skipped
+    with a warning, so the result may be shorter than requested.
+    """
+    if probe_histories is None:
+        probe_histories = [probe_history] * num_of_payloads
+    payloads = _generate_payload_batch(
+        waf_name,
+        attack_type,
+        [{"probe_history": [asdict(p) for p in history]} for history in probe_histories],
+        "phase3_rl",
+        "ADAPTIVE-PAYLOAD",
+    )
     results = []
-    for i in range(num_of_payloads):
-        print(f"[ADAPTIVE-PAYLOAD] {i}/{num_of_payloads} | {attack_type} | {len(probe_history)} probe(s)")
-        payload_result = generate_payload_phase3(waf_name, attack_type, probe_history)
-        print(f"\t{payload_result.payload}")
-        results.append(payload_result)
+    for i, (history, payload) in enumerate(zip(probe_histories, payloads)):
+        print(f"[ADAPTIVE-PAYLOAD] {i}/{len(probe_histories)} | {attack_type} | {len(history)} probe(s)")
+        if payload is None:
+            continue
+        print(f"\t{payload}")
+        results.append(PayloadResult(
+            payload=payload,
+            technique="Adaptive Generation",
+            attack_type=attack_type,
+        ))
     return results
 
-def generate_payload_phase1(waf_name, attack_type) -> PayloadResult:
+def _sample_phase1_technique(attack_type) -> str:
     if "xss" in attack_type.lower():
         selected_techniques = random.sample(ATTACK_OBFUSCATE_TECHNIQUES["xss"], random.randint(1, int(len(ATTACK_OBFUSCATE_TECHNIQUES["xss"])/2)))
     elif "sql" in attack_type.lower():
         selected_techniques = random.sample(ATTACK_OBFUSCATE_TECHNIQUES["sqli"], random.randint(1, int(len(ATTACK_OBFUSCATE_TECHNIQUES["sqli"])/2)))
-    technique = "+".join(selected_techniques)
+    return "+".join(selected_techniques)
+
+def _sample_phase1_techniques(attack_type, count) -> List[str]:
+    """count technique combinations, without repeats as long as random draws find new ones."""
+    techniques = []
+    seen = set()
+    for _ in range(count * 20):
+        if len(techniques) == count:
+            break
+        technique = _sample_phase1_technique(attack_type)
+        if technique not in seen:
+            seen.add(technique)
+            techniques.append(technique)
+    while len(techniques) < count:
+        techniques.append(_sample_phase1_technique(attack_type))
+    return techniques
+
+def generate_payload_phase1(waf_name, attack_type) -> PayloadResult:
+    technique = _sample_phase1_technique(attack_type)
     payload = llm.llmshield_generate_payloads(
         waf_name=waf_name,
         attack_type=attack_type,
@@ -0,0 +1,122 @@
+"""
+Near-duplicate payload collapsing (MinHash + LSH).
+
+LLM-generated bypass sets contain many variants of one payload that differ
+only by case or an encoding layer. Before clustering and prompting, each
+payload is normalized (fully decoded with payload_harmness_validator's
+decoder, then lowercased), exact duplicates of the normalized form are
+merged, and the rest are grouped when the estimated Jaccard similarity of
+their character shingles reaches `threshold`.
+
+MinHash signatures are computed with numpy; LSH splits each signature into
+bands so only payloads sharing a band bucket are compared.
+
+Usage:
+    groups = collapse_near_duplicates(payloads)
+    representatives = [group.representative for group in groups]
+"""
+
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .payload_harmness_validator import _fully_decode_payload
+
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+# 16 bands x 8 rows: pairs above ~0.7 Jaccard become candidates
+LSH_BANDS = 16
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; p > 2^32 and
+# a, b < 2^32 keep every intermediate value inside uint64
+_PRIME = np.uint64(4294967311)
+_rng = np.random.default_rng(42)
+_PERM_A = _rng.integers(1, 2 ** 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.integers(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64)
+
+
+@dataclass
+class DedupGroup:
+    """Near-duplicate payloads and the one kept for downstream stages."""
+    representative: str
+    members: list[str] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.members)
+
+
+def normalize_payload(payload: str) -> str:
+    """Fully decoded, lowercased form used for comparisons."""
+    return _fully_decode_payload(payload)[0].lower()
+
+
+def _shingle_hashes(text: str) -> np.ndarray:
+    if len(text) <= SHINGLE_SIZE:
+        shingles = {text}
+    else:
+        shingles = {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8", "surrogatepass")) for s in shingles), dtype=np.uint64)
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """NUM_PERM-long MinHash signature of the character shingles of `text`."""
+    hashes = _shingle_hashes(text)
+    return ((np.outer(_PERM_A, hashes) + _PERM_B[:, None]) % _PRIME).min(axis=1)
+
+
+def collapse_near_duplicates(payloads: list[str], threshold: float = 0.8) -> list[DedupGroup]:
+    """
+    Group near-duplicate payloads.
+
+    Args:
+        payloads: Raw payloads
+        threshold: Min estimated Jaccard similarity of normalized shingles to merge
+
+    Returns:
+        Groups in order of first occurrence; each representative is the
+        group's first raw payload
+    """
+    # Exact duplicates after normalization
+    by_normalized: dict[str, list[str]] = {}
+    for payload in payloads:
+        by_normalized.setdefault(normalize_payload(payload), []).append(payload)
+    normalized = list(by_normalized)
+    if len(normalized) < 2:
+        return [DedupGroup(members[0], members) for members in by_normalized.values()]
+
+    signatures = np.vstack([minhash_signature(text) for text in normalized])
+    rows = NUM_PERM // LSH_BANDS
+
+    parent = list(range(len(normalized)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    checked = set()
+    for band in range(LSH_BANDS):
+        buckets = defaultdict(list)
+        for i, key in enumerate(map(bytes, signatures[:, band * rows:(band + 1) * rows])):
+            buckets[key].append(i)
+        for bucket in buckets.values():
+            for j in bucket[1:]:
+                i = bucket[0]
+                if (i, j) in checked or find(i) == find(j):
+                    continue
+                checked.add((i, j))
+                if np.mean(signatures[i] == signatures[j]) >= threshold:
+                    parent[find(j)] = find(i)
+
+    groups: dict[int, DedupGroup] = {}
+    for i, text in enumerate(normalized):
+        members = by_normalized[text]
+        root = find(i)
+        if root not in groups:
+            groups[root] = DedupGroup(members[0])
+        groups[root].members.extend(members)
+    return list(groups.values())
@@ -0,0 +1,288 @@
+"""
+Incremental payload clustering for the defense pipeline.
+
+clustering.clustering() fits features (TF-IDF + SVD) and HAC on every call
+unless handed a fitted extractor. An OnlineClusterer keeps one fitted model
+per (WAF, attack type) instead:
+    - payloads seen before keep their cluster
+    - new payloads join the nearest centroid when within `radius`, otherwise
+      start a new cluster; centroids are updated as running means
+    - once enough new payloads accumulated (refit_ratio of the fitted corpus),
+      the whole corpus is re-clustered with the same TF-IDF + SVD + HAC setup
+      (clustering's AUTO method, so large corpora use micro-clusters)
+State is pickled under CACHE_DIR/clustering after every refit and every
+`save_every` new payloads, so it survives restarts (assignments made since
+the last save are redone after one).
+
+Usage:
+    clusterer = get_online_clusterer("modsecurity", "xss_reflected")
+    labels = clusterer.assign(payloads)
+"""
+
+import os
+import pickle
+import re
+import threading
+from typing import Optional
+
+import numpy as np
+
+from .clustering import _cluster_payloads_AUTO
+from .feature_extractor import PayloadFeatureExtractor
+
+# Flexible imports for different execution contexts
+CACHE_DIR = None
+ONLINE_CLUSTERING_REFIT_RATIO = None
+ONLINE_CLUSTERING_MAX_CORPUS = None
+
+try:
+    from ..config.settings import CACHE_DIR, ONLINE_CLUSTERING_REFIT_RATIO, ONLINE_CLUSTERING_MAX_CORPUS
+except ImportError:
+    try:
+        from config.settings import CACHE_DIR, ONLINE_CLUSTERING_REFIT_RATIO, ONLINE_CLUSTERING_MAX_CORPUS
+    except ImportError:
+        pass
+
+# Default values if imports failed
+if CACHE_DIR is None:
+    CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"))
+if ONLINE_CLUSTERING_REFIT_RATIO is None:
+    ONLINE_CLUSTERING_REFIT_RATIO = float(os.getenv("ONLINE_CLUSTERING_REFIT_RATIO", "0.5"))
+if ONLINE_CLUSTERING_MAX_CORPUS is None:
+    ONLINE_CLUSTERING_MAX_CORPUS = int(os.getenv("ONLINE_CLUSTERING_MAX_CORPUS", "5000"))
+
+# Bump when the pickled state layout changes; older files are ignored
+STATE_VERSION = 2
+
+# New payloads assigned between two saves (refits always save)
+SAVE_EVERY = 100
+
+
+class OnlineClusterer:
+    """Stateful TF-IDF + SVD + HAC clusterer with nearest-centroid assignment."""
+
+    def __init__(
+        self,
+        key: str,
+        reduce_dim_to: int = 50,
+        distance_threshold: float = 1.5,
+        radius: Optional[float] = None,
+        refit_ratio: float = ONLINE_CLUSTERING_REFIT_RATIO,
+        max_corpus: int = ONLINE_CLUSTERING_MAX_CORPUS,
+        state_path: Optional[str] = None,
+        save_every: int = SAVE_EVERY,
+    ):
+        """
+        Initialize clusterer.
+
+        Args:
+            key: State name, e.g. "modsecurity:xss_reflected"
+            reduce_dim_to: SVD components of the feature extractor
+            distance_threshold: Ward distance threshold of the HAC refit
+            radius: Max distance from a centroid to join its cluster; default
+                distance_threshold / sqrt(2), the distance at which ward
+                linkage still merges a point into a large cluster
+            refit_ratio: Refit once new payloads reach this share of the fitted corpus
+            max_corpus: Payloads kept for refits (oldest dropped first)
+            state_path: Pickle file ("" disables persistence)
+            save_every: New payloads assigned between two saves (refits always save)
+        """
+        self.key = key
+        self.reduce_dim_to = reduce_dim_to
+        self.distance_threshold = distance_threshold
+        self.radius = distance_threshold / np.sqrt(2) if radius is None else radius
+        self.refit_ratio = refit_ratio
+        self.max_corpus = max_corpus
+        if state_path is None:
+            state_path = os.path.join(CACHE_DIR, "clustering", re.sub(r"[^\w.-]+", "_", key) + ".pkl")
+        self.state_path = state_path
+        self.save_every = save_every
+        self._lock = threading.Lock()
+        # Pickling happens outside _lock; _save_lock only orders the writes
+        self._save_lock = threading.Lock()
+        self._generation = 0
+        self._saved_generation = 0
+        self._unsaved = 0
+        self._reset()
+
+    def _reset(self):
+        self.extractor = None
+        self.centroids = None
+        self.counts = None
+        self.labels = {}
+        self.next_label = 0
+        self.fitted_size = 0
+        self.pending = 0
+
+    # -------------------------------------------------------------------------
+    # Model
+    # -------------------------------------------------------------------------
+
+    def _transform(self, payloads: list[str]) -> np.ndarray:
+        return self.extractor.transform(payloads)
+
+    def _refit(self, corpus: list[str]):
+        """Re-cluster a corpus from scratch; the state only changes on success."""
+        extractor = PayloadFeatureExtractor(reduce_dim_to=self.reduce_dim_to)
+        reduced = extractor.fit_transform(corpus)
+
+        if len(corpus) < 2:
+            labels = np.zeros(len(corpus), dtype=int)
+        else:
+            labels = _cluster_payloads_AUTO(reduced, distance_threshold=self.distance_threshold)
+
+        unique = np.unique(labels)
+        self.extractor = extractor
+        self.centroids = np.vstack([reduced[labels == label].mean(axis=0) for label in unique])
+        self.counts = np.array([(labels == label).sum() for label in unique], dtype=float)
+        index = {label: i for i, label in enumerate(unique)}
+        self.labels = {payload: index[label] for payload, label in zip(corpus, labels)}
+        self.next_label = len(unique)
+        self.fitted_size = len(corpus)
+        self.pending = 0
+
+    def _assign_new(self, payloads: list[str]):
+        """Nearest-centroid assignment of unseen payloads, updating centroids."""
+        for payload, x in zip(payloads, self._transform(payloads)):
+            distances = np.linalg.norm(self.centroids - x, axis=1)
+            nearest = int(np.argmin(distances))
+            if distances[nearest] <= self.radius:
+                self.counts[nearest] += 1
+                self.centroids[nearest] += (x - self.centroids[nearest]) / self.counts[nearest]
+                self.labels[payload] = nearest
+            else:
+                self.centroids = np.vstack([self.centroids, x])
+                self.counts = np.append(self.counts, 1.0)
+                self.labels[payload] = self.next_label
+                self.next_label += 1
+
+    def _trim(self, corpus: list[str], keep: set) -> list[str]:
+        """Drop the oldest payloads beyond max_corpus, except those in `keep`."""
+        overflow = len(corpus) - self.max_corpus
+        if overflow <= 0:
+            return corpus
+        trimmed = []
+        for payload in corpus:
+            if overflow > 0 and payload not in keep:
+                overflow -= 1
+                continue
+            trimmed.append(payload)
+        return trimmed
+
+    def transform(self, payloads: list[str]) -> np.ndarray:
+        """Payload vectors in the fitted TF-IDF + SVD space (call after assign)."""
+        with self._lock:
+            return self._transform(payloads)
+
+    def assign(self, payloads: list[str]) -> list[int]:
+        """
+        Cluster labels of `payloads`, updating the model with the new ones.
+
+        Returns:
+            One label per payload, stable across calls until the next refit
+        """
+        if not payloads:
+            return []
+        snapshot = None
+        with self._lock:
+            new = [payload for payload in dict.fromkeys(payloads) if payload not in self.labels]
+            keep = set(payloads)
+            refit = self.extractor is None or self.pending + len(new) >= max(1, self.refit_ratio * self.fitted_size)
+            if refit:
+                self._refit(self._trim(list(self.labels) + new, keep))
+            elif new:
+                self.pending += len(new)
+                self._assign_new(new)
+                for payload in set(self.labels) - set(self._trim(list(self.labels), keep)):
+                    del self.labels[payload]
+            if refit or new:
+                self._generation += 1
+                self._unsaved += len(new)
+                if refit or self._unsaved >= self.save_every:
+                    snapshot = self._snapshot()
+            labels = [self.labels[payload] for payload in payloads]
+        self._write(snapshot)
+        return labels
+
+    # -------------------------------------------------------------------------
+    # Persistence
+    # -------------------------------------------------------------------------
+
+    def _snapshot(self) -> Optional[tuple[int, dict]]:
+        """Copy of the state to pickle (caller holds _lock)."""
+        self._unsaved = 0
+        if not self.state_path or self.extractor is None:
+            return None
+        # The extractor is replaced, never mutated, by a refit
+        return self._generation, {
+            "version": STATE_VERSION,
+            "extractor": self.extractor,
+            "centroids": self.centroids.copy(),
+            "counts": self.counts.copy(),
+            "labels": dict(self.labels),
+            "next_label": self.next_label,
+            "fitted_size": self.fitted_size,
+            "pending": self.pending,
+        }
+
+    def _write(self, snapshot: Optional[tuple[int, dict]]):
+        """Pickle a snapshot unless a newer one was already written."""
+        if snapshot is None:
+            return
+        generation, state = snapshot
+        with self._save_lock:
+            if generation <= self._saved_generation:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+                tmp_path = f"{self.state_path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, self.state_path)
+                self._saved_generation = generation
+            except OSError as e:
+                print(f"[Clustering] could not save {self.key}: {e}")
+
+    def save(self):
+        """Pickle the current state (also the assignments since the last save)."""
+        with self._lock:
+            snapshot = self._snapshot()
+        self._write(snapshot)
+
+    def load(self) -> bool:
+        """Restore pickled state; returns False when there is none usable."""
+        if not self.state_path or not os.path.exists(self.state_path):
+            return False
+        try:
+            with open(self.state_path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            print(f"[Clustering] could not load {self.key}: {e}")
+            return False
+        if state.get("version") != STATE_VERSION:
+            return False
+        with self._lock:
+            self.extractor = state["extractor"]
+            self.centroids = state["centroids"]
+            self.counts = state["counts"]
+            self.labels = state["labels"]
+            self.next_label = state["next_label"]
+            self.fitted_size = state["fitted_size"]
+            self.pending = state["pending"]
+        return True
+
+
+_clusterers: dict[str, OnlineClusterer] = {}
+_clusterers_lock = threading.Lock()
+
+
+def get_online_clusterer(waf: str, attack_type: str) -> OnlineClusterer:
+    """Get the clusterer of a (WAF, attack type), restoring its saved state on first use."""
+    key = f"{(waf or 'unknown').lower()}:{(attack_type or 'unknown').lower()}"
+    with _clusterers_lock:
+        clusterer = _clusterers.get(key)
+        if clusterer is None:
+            clusterer = OnlineClusterer(key)
+            clusterer.load()
+            _clusterers[key] = clusterer
+        return clusterer
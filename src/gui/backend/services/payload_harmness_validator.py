@@ -4,8 +4,46 @@ import requests
 import unicodedata
 import html
 import re
+import os
 from sqlglot import parse_one
-from dataclasses import dataclass
+from copy import deepcopy
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Iterator
+
+from services import cache_store, xss_harm_analyzer
+
+# Flexible imports for different execution contexts
+XSS_REMOTE_VALIDATOR = None
+XSS_REMOTE_VALIDATOR_URL = None
+XSS_REMOTE_VALIDATOR_TIMEOUT = None
+HARM_CACHE_ENABLED = None
+
+try:
+    from config.settings import (
+        XSS_REMOTE_VALIDATOR,
+        XSS_REMOTE_VALIDATOR_URL,
+        XSS_REMOTE_VALIDATOR_TIMEOUT,
+        HARM_CACHE_ENABLED
+    )
+except ImportError:
+    pass
+
+# Default values if imports failed
+if XSS_REMOTE_VALIDATOR is None:
+    XSS_REMOTE_VALIDATOR = os.getenv("XSS_REMOTE_VALIDATOR", "false").lower() == "true"
+if XSS_REMOTE_VALIDATOR_URL is None:
+    XSS_REMOTE_VALIDATOR_URL = os.getenv("XSS_REMOTE_VALIDATOR_URL", "http://api.akng.io.vn:89/validate_payload")
+if XSS_REMOTE_VALIDATOR_TIMEOUT is None:
+    XSS_REMOTE_VALIDATOR_TIMEOUT = float(os.getenv("XSS_REMOTE_VALIDATOR_TIMEOUT", "10"))
+if HARM_CACHE_ENABLED is None:
+    HARM_CACHE_ENABLED = os.getenv("HARM_CACHE_ENABLED", "true").lower() == "true"
+
+# Part of every harm cache key: bump whenever decoding or evaluation changes
+# the results, so stale cached verdicts are never reused
+VALIDATOR_VERSION = "3"
 
 PAYLOAD_PLACEHOLDER = "###payload###"
 SQL_INJECTTION_CONTEXTS = {
@@ -104,10 +142,25 @@ HOMOGLYPH_MAP = {
     '５': '5', '６': '6', '７': '7', '８': '8', '９': '9',#
     '⁰': '0', '¹': '1', '²': '2', '³': '3',#
 }
+HOMOGLYPH_TABLE = str.maketrans(HOMOGLYPH_MAP)
+# ASCII characters the map still rewrites ('0' -> 'O')
+_HOMOGLYPH_ASCII = frozenset(c for c in HOMOGLYPH_MAP if c.isascii())
+
 def _normalize_homoglyphs(s: str) -> str:
     if s is None:
         return None
-    return ''.join(HOMOGLYPH_MAP.get(c, c) for c in s)
+    return s.translate(HOMOGLYPH_TABLE)
+
+_CUSTOM2_PATTERNS = [
+    (re.compile(r'(\d)O(\d)'), r'\g<1>0\g<2>'),
+    (re.compile(r'(\d\d)O'), r'\g<1>0'),
+    (re.compile(r'(\d)OO'), r'\g<1>00'),
+]
+
+def _custom2_decode(payload: str) -> str:
+    for pattern, replacement in _CUSTOM2_PATTERNS:
+        payload = pattern.sub(replacement, payload)
+    return payload
 
 DECODERS = {
     "URL": lambda payload: urllib.parse.unquote(payload),
@@ -121,20 +174,34 @@ DECODERS = {
         .replace("%6O", "%60")
         .replace("\\uOO", "\\u00")
         .replace("\\OO", "\\00"),
-    "CUSTOM2": lambda payload: re.sub(r'(\d)OO', r'\g<1>00',
-        re.sub(r'(\d\d)O', r'\g<1>0', 
-            re.sub(r'(\d)O(\d)', r'\g<1>0\g<2>', payload)
-        )
-    )
+    "CUSTOM2": _custom2_decode,
 }
 
+# Cheap "could this decoder change the payload?" checks; a decoder whose
+# check fails is a no-op and is skipped
+DECODER_PREFILTERS = {
+    "URL": lambda payload: "%" in payload,
+    "HTML": lambda payload: "&" in payload,
+    "UNICODE": lambda payload: not payload.isascii(),
+    "HOMOGLYPH": lambda payload: not payload.isascii() or any(c in payload for c in _HOMOGLYPH_ASCII),
+    "CUSTOM": lambda payload: "O" in payload,
+    "CUSTOM2": lambda payload: "O" in payload,
+}
+
+# Decoding rounds before giving up on reaching a fixed point
+MAX_DECODE_ROUNDS = 32
+
 def _fully_decode_payload(payload):
     flag = True
     decode_stack = []
-    while flag:
+    rounds = 0
+    while flag and rounds < MAX_DECODE_ROUNDS:
+        rounds += 1
         new_p_0 = payload
         for decoder in DECODERS:
             old_p_0 = new_p_0
+            if not DECODER_PREFILTERS[decoder](old_p_0):
+                continue
             new_p_1 = DECODERS[decoder](old_p_0)
             if new_p_1 != old_p_0:
                 decode_stack.append((decoder, old_p_0, new_p_1))
@@ -154,22 +221,59 @@ def _try_parse_sql_ast(sql):
         return None
 
 
-def _compare_trees(tree1, tree2):
-    tree1_nodes = []
-    tree2_nodes = []
-    for node in tree1.walk():
-        tree1_nodes.append(node)
-    for node in tree2.walk():
-        tree2_nodes.append(node)
-    if len(tree1_nodes) != len(tree2_nodes):
+def _tree_fingerprint(tree) -> tuple:
+    """Structure of an AST: node types in walk order."""
+    return tuple(type(node) for node in tree.walk())
+
+
+@lru_cache(maxsize=None)
+def _safe_fingerprint(safe_sql):
+    """Fingerprint of a safe template query, parsed once per process."""
+    safe_tree = _try_parse_sql_ast(safe_sql)
+    return None if safe_tree is None else _tree_fingerprint(safe_tree)
+
+
+def _matches_fingerprint(tree, fingerprint) -> bool:
+    """Walk `tree` against a fingerprint, stopping at the first differing node."""
+    if fingerprint is None:
         return False
-    for node1, node2 in zip(tree1_nodes, tree2_nodes):
-        if type(node1) != type(node2):
+    size = len(fingerprint)
+    count = 0
+    for node in tree.walk():
+        if count >= size or type(node) is not fingerprint[count]:
             return False
-    return True
+        count += 1
+    return count == size
+
+
+def _compare_trees(tree1, tree2):
+    return _matches_fingerprint(tree1, _tree_fingerprint(tree2))
 
 
-def evaluate_sql_payload(payload, auto_decode=True) -> EvaluateSQLResult:
+def _harm_cache():
+    return cache_store.get_cache("harm") if HARM_CACHE_ENABLED else None
+
+def _harm_cache_key(family, payload, auto_decode):
+    return cache_store.make_key(family, payload, auto_decode, VALIDATOR_VERSION)
+
+def harm_cache_stats() -> dict:
+    """Hit/miss counters of the harmfulness result cache."""
+    cache = _harm_cache()
+    return cache.stats() if cache is not None else {"namespace": "harm", "enabled": False}
+
+def evaluate_sql_payload(payload, auto_decode=True, use_cache=True) -> EvaluateSQLResult:
+    cache = _harm_cache() if use_cache else None
+    if cache is None:
+        return _evaluate_sql_payload(payload, auto_decode)
+    key = _harm_cache_key("sql", payload, auto_decode)
+    cached = cache.get(key)
+    if cached is not None:
+        return EvaluateSQLResult(**deepcopy(cached))
+    result = _evaluate_sql_payload(payload, auto_decode)
+    cache.set(key, asdict(result))
+    return result
+
+def _evaluate_sql_payload(payload, auto_decode=True) -> EvaluateSQLResult:
     if auto_decode:
         payload, decode_stack = _fully_decode_payload(payload)
     result = EvaluateSQLResult(payload, safe_queries=[], harm_queries=[], error_queries=[])
@@ -178,28 +282,118 @@ def evaluate_sql_payload(payload, auto_decode=True) -> EvaluateSQLResult:
             test_sql = template.replace(PAYLOAD_PLACEHOLDER, payload)
             safe_sql = template.replace(PAYLOAD_PLACEHOLDER, safe_payload)
             test_tree = _try_parse_sql_ast(test_sql)
-            safe_tree = _try_parse_sql_ast(safe_sql)
             # Payload phá vỡ cú pháp SQL
             if test_tree is None:
                 result.error_queries.append(test_sql)
             else:
                 # AST mới KHÁC cấu trúc với AST an toàn
-                if not _compare_trees(test_tree, safe_tree):
+                if not _matches_fingerprint(test_tree, _safe_fingerprint(safe_sql)):
                     result.harm_queries.append(test_sql)
                 # AST mới cùng cấu trúc với AST an toàn
                 else:
                     result.safe_queries.append(test_sql)
     return result
 
-def evaluate_xss_payload(payload, auto_decode=True) -> EvaluateXSSResult:
-    if auto_decode:
-        payload, decode_stack = _fully_decode_payload(payload)
+def _init_sql_worker():
+    """Process pool initializer: parse every safe template once per worker."""
+    for templates in SQL_INJECTTION_CONTEXTS.values():
+        for template, safe_payload in templates:
+            _safe_fingerprint(template.replace(PAYLOAD_PLACEHOLDER, safe_payload))
+
+def iter_evaluate_sql_payloads(payloads, workers=None, chunksize=None, auto_decode=True, use_cache=True) -> Iterator[EvaluateSQLResult]:
+    """
+    Evaluate many SQL payloads on a process pool, yielding results in input
+    order as soon as they are ready (e.g. to append JSONL while running).
+
+    Cached payloads are answered in this process; only misses, deduplicated,
+    go to the pool, and their results are cached here.
+
+    Args:
+        payloads: SQL payloads
+        workers: Worker processes (default os.cpu_count()); 1 runs in-process
+        chunksize: Payloads sent to a worker at a time (default: ~4 chunks per worker)
+        auto_decode: Passed to evaluate_sql_payload
+        use_cache: Read and fill the harm cache
+    """
+    payloads = list(payloads)
+    cache = _harm_cache() if use_cache else None
+    keys = [_harm_cache_key("sql", payload, auto_decode) for payload in payloads]
+    known = {}
+    if cache is not None:
+        for key in dict.fromkeys(keys):
+            cached = cache.get(key)
+            if cached is not None:
+                known[key] = cached
+    # First occurrence of each uncached payload, in input order
+    misses = {}
+    for key, payload in zip(keys, payloads):
+        if key not in known and key not in misses:
+            misses[key] = payload
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(misses) or 1))
+    if workers == 1:
+        executor = None
+        computed = map(_evaluate_sql_payload, misses.values(), repeat(auto_decode))
+    else:
+        chunksize = chunksize or max(1, len(misses) // (workers * 4))
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_sql_worker)
+        computed = executor.map(_evaluate_sql_payload, misses.values(), repeat(auto_decode), chunksize=chunksize)
     try:
-        res = requests.post("http://api.akng.io.vn:89/validate_payload", data=payload)
+        for key in keys:
+            if key not in known:
+                # Misses come back in first-occurrence order, so the next one is this key's
+                result = next(computed)
+                known[key] = asdict(result)
+                if cache is not None:
+                    cache.set(key, known[key])
+            yield EvaluateSQLResult(**deepcopy(known[key]))
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def evaluate_sql_payloads(payloads, workers=None, chunksize=None, auto_decode=True, use_cache=True) -> list[EvaluateSQLResult]:
+    """Evaluate many SQL payloads on a process pool; results in input order."""
+    return list(iter_evaluate_sql_payloads(payloads, workers, chunksize, auto_decode, use_cache))
+
+def _evaluate_xss_payload_remote(payload) -> EvaluateXSSResult:
+    try:
+        res = requests.post(XSS_REMOTE_VALIDATOR_URL, data=payload, timeout=XSS_REMOTE_VALIDATOR_TIMEOUT)
         return EvaluateXSSResult(
             payload=payload,
             is_safe=res.json()["data"]["is_safe"],
             harms=res.json()["data"]["harms"],
         )
     except Exception as e:
-        return None
\ No newline at end of file
+        return None
+
+def evaluate_xss_payload(payload, auto_decode=True, remote=None, use_cache=True) -> EvaluateXSSResult:
+    """
+    Evaluate whether an XSS payload contains executable HTML.
+
+    Uses the offline analyzer (services.xss_harm_analyzer) unless `remote`
+    (default XSS_REMOTE_VALIDATOR) selects the browser-based remote
+    validator, which returns None when unreachable (not cached).
+    """
+    remote = XSS_REMOTE_VALIDATOR if remote is None else remote
+    cache = _harm_cache() if use_cache else None
+    if cache is not None:
+        key = _harm_cache_key("xss-remote" if remote else "xss", payload, auto_decode)
+        cached = cache.get(key)
+        if cached is not None:
+            return EvaluateXSSResult(**deepcopy(cached))
+    result = _evaluate_xss_payload(payload, auto_decode, remote)
+    if cache is not None and result is not None:
+        cache.set(key, asdict(result))
+    return result
+
+def _evaluate_xss_payload(payload, auto_decode, remote) -> EvaluateXSSResult:
+    if auto_decode:
+        payload, decode_stack = _fully_decode_payload(payload)
+    if remote:
+        return _evaluate_xss_payload_remote(payload)
+    harms = xss_harm_analyzer.analyze_xss(payload)
+    return EvaluateXSSResult(
+        payload=payload,
+        is_safe=xss_harm_analyzer.is_harmless(harms),
+        harms=harms,
+    )
\ No newline at end of file
@@ -0,0 +1,324 @@
+"""
+Concurrent time-based blind SQLi verification.
+
+Sleep-based payloads take seconds each, so verifying them one by one with
+ExploitVerifier.verify_sqli_blind takes minutes per batch. This scheduler
+runs them on a pool of worker slots and judges each response against a
+latency threshold learned from the target instead of a fixed 5 s.
+
+Isolation: PHP locks the session file for the whole request, so two sleeps
+sent with the same PHPSESSID run one after the other and the second one
+looks twice as slow. Every worker slot therefore has its own DVWAClient and
+DVWA login, and runs one probe at a time. Idle slots are kept per target and
+reused by later batches, so their logins are not repeated on every call.
+A caller that must probe through its own session (session=...) gets that
+session as the only slot, so its probes run one after the other.
+
+Threshold: baseline requests (id=1) are sampled through the same slots and
+a response counts as delayed when it takes longer than
+    median + max(K * 1.4826 * MAD, MIN_DELAY)
+(SQLI_TIMING_K, SQLI_TIMING_MIN_DELAY), which tolerates network jitter.
+
+Usage:
+    results = verify_time_based(payloads, base_url="http://modsec.llmshield.click")
+"""
+
+import os
+import queue
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+
+from services_external.dvwa_client import DVWAClient, DVWASessionHandle
+from services.exploit_verifier import (
+    DVWA_BASE_URL,
+    DVWA_SECURITY_LEVEL,
+    DVWA_STREAM_BLOCK_DETECTION,
+    SQLI_BLIND_BASELINE_TTL,
+    ExploitResult,
+    ExploitStatus,
+    ExploitVerifier,
+    SqliBlindBaseline,
+)
+
+SQLI_TIMING_WORKERS = None
+SQLI_TIMING_SAMPLES = None
+SQLI_TIMING_K = None
+SQLI_TIMING_MIN_DELAY = None
+
+try:
+    from ..config.settings import (
+        SQLI_TIMING_WORKERS,
+        SQLI_TIMING_SAMPLES,
+        SQLI_TIMING_K,
+        SQLI_TIMING_MIN_DELAY,
+    )
+except ImportError:
+    try:
+        from config.settings import (
+            SQLI_TIMING_WORKERS,
+            SQLI_TIMING_SAMPLES,
+            SQLI_TIMING_K,
+            SQLI_TIMING_MIN_DELAY,
+        )
+    except ImportError:
+        pass
+
+# Default values if imports failed
+if SQLI_TIMING_WORKERS is None:
+    SQLI_TIMING_WORKERS = int(os.getenv("SQLI_TIMING_WORKERS", "4"))
+if SQLI_TIMING_SAMPLES is None:
+    SQLI_TIMING_SAMPLES = int(os.getenv("SQLI_TIMING_SAMPLES", "8"))
+if SQLI_TIMING_K is None:
+    SQLI_TIMING_K = float(os.getenv("SQLI_TIMING_K", "6"))
+if SQLI_TIMING_MIN_DELAY is None:
+    SQLI_TIMING_MIN_DELAY = float(os.getenv("SQLI_TIMING_MIN_DELAY", "2"))
+
+# Scales the MAD into a standard deviation estimate for normal data
+MAD_SCALE = 1.4826
+
+
+@dataclass
+class LatencyProfile:
+    """Baseline latency distribution of a target."""
+    samples: list[float]
+    median: float
+    mad: float
+    measured_at: float
+
+    @classmethod
+    def from_samples(cls, samples: list[float]) -> "LatencyProfile":
+        median = statistics.median(samples)
+        mad = statistics.median(abs(sample - median) for sample in samples)
+        return cls(samples=samples, median=median, mad=mad, measured_at=time.monotonic())
+
+    def threshold(self, k: float = SQLI_TIMING_K, min_delay: float = SQLI_TIMING_MIN_DELAY) -> float:
+        """Elapsed seconds above which a response counts as delayed."""
+        return self.median + max(k * MAD_SCALE * self.mad, min_delay)
+
+
+_profiles: dict[tuple, LatencyProfile] = {}
+_profiles_lock = threading.Lock()
+
+
+def _sqli_blind_url(base_url: str) -> str:
+    return f"{base_url}/vulnerabilities/sqli_blind/"
+
+
+# Idle worker slots per (base_url, security level)
+_idle_clients: dict[tuple, list[DVWAClient]] = {}
+_idle_clients_lock = threading.Lock()
+
+
+def acquire_worker_clients(base_url: str, workers: int, security_level: str = None) -> list[DVWAClient]:
+    """
+    Check out one logged-in DVWAClient per worker slot.
+
+    Each slot has its own PHPSESSID so concurrent sleeps never wait on one
+    another's PHP session lock. Idle slots of the target are reused; only
+    the missing ones log in. Give them back with release_worker_clients.
+    """
+    key = (base_url, security_level or DVWA_SECURITY_LEVEL)
+    with _idle_clients_lock:
+        idle = _idle_clients.setdefault(key, [])
+        clients = [idle.pop() for _ in range(min(workers, len(idle)))]
+    try:
+        while len(clients) < workers:
+            client = DVWAClient(base_url, security_level=security_level, pool_size=1)
+            client.login()
+            clients.append(client)
+    except Exception:
+        release_worker_clients(base_url, clients, security_level)
+        raise
+    return clients
+
+
+def release_worker_clients(base_url: str, clients: list[DVWAClient], security_level: str = None):
+    """Return checked-out worker slots to the idle pool of their target."""
+    key = (base_url, security_level or DVWA_SECURITY_LEVEL)
+    with _idle_clients_lock:
+        _idle_clients.setdefault(key, []).extend(clients)
+
+
+def close_worker_clients():
+    """Close every idle worker slot (e.g. at the end of an experiment run)."""
+    with _idle_clients_lock:
+        for clients in _idle_clients.values():
+            for client in clients:
+                client.close()
+        _idle_clients.clear()
+
+
+def measure_latency_profile(
+    clients: list[DVWAClient],
+    base_url: str,
+    samples: int = SQLI_TIMING_SAMPLES,
+    baseline_payload: str = "1",
+) -> LatencyProfile:
+    """
+    Sample the baseline latency of a target through the worker slots.
+
+    Samples are taken concurrently, under the same load the probes will see.
+    """
+    url = _sqli_blind_url(base_url)
+    slots = queue.Queue()
+    for client in clients:
+        slots.put(client)
+
+    def sample(_):
+        client = slots.get()
+        try:
+            response = client.get(url, params={"id": baseline_payload, "Submit": "Submit"}, timeout=15)
+            return response.elapsed.total_seconds()
+        finally:
+            slots.put(client)
+
+    with ThreadPoolExecutor(max_workers=len(clients)) as executor:
+        measured = list(executor.map(sample, range(max(3, samples))))
+    return LatencyProfile.from_samples(measured)
+
+
+def get_latency_profile(
+    base_url: str,
+    clients: list[DVWAClient],
+    security_level: str = None,
+    refresh: bool = False,
+) -> LatencyProfile:
+    """
+    Get the latency profile of a target, measuring it when missing or older
+    than SQLI_BLIND_BASELINE_TTL.
+    """
+    key = (base_url, security_level or DVWA_SECURITY_LEVEL)
+    with _profiles_lock:
+        profile = _profiles.get(key)
+    if profile is not None and not refresh and time.monotonic() - profile.measured_at <= SQLI_BLIND_BASELINE_TTL:
+        return profile
+
+    profile = measure_latency_profile(clients, base_url)
+    with _profiles_lock:
+        _profiles[key] = profile
+    return profile
+
+
+def verify_time_based(
+    payloads: list[str],
+    base_url: str = None,
+    workers: Optional[int] = None,
+    security_level: str = None,
+    profile: Optional[LatencyProfile] = None,
+    timeout: Optional[float] = None,
+    confirm: bool = True,
+    baseline: Optional[SqliBlindBaseline] = None,
+    session: Optional[DVWASessionHandle] = None,
+) -> list[ExploitResult]:
+    """
+    Verify blind SQLi payloads concurrently with a learned timing threshold.
+
+    Boolean-based evidence is still checked on every response, as in
+    ExploitVerifier.verify_sqli_blind.
+
+    Args:
+        payloads: SQL injection payloads
+        base_url: DVWA base URL (default from settings)
+        workers: Concurrent worker slots, one DVWA session each (default SQLI_TIMING_WORKERS)
+        security_level: DVWA security level (default from settings)
+        profile: Latency profile to use instead of the cached/measured one
+        timeout: Per-probe timeout; a timeout counts as time-based evidence
+            (default: twice the threshold, at least 15 s)
+        confirm: Re-send delayed payloads once and keep the verdict only if
+            the delay repeats
+        baseline: Reference answer to a valid ID, reported in the details
+        session: Probe through this DVWA session instead of pooled worker
+            slots; PHP serializes requests of one session, so workers is 1
+
+    Returns:
+        ExploitResult list in input order
+    """
+    if not payloads:
+        return []
+
+    base_url = (base_url or DVWA_BASE_URL).rstrip("/")
+    url = _sqli_blind_url(base_url)
+    if session is not None:
+        security_level = security_level or session.security_level
+        workers = 1
+        clients = [session]
+    else:
+        workers = max(1, min(int(workers or SQLI_TIMING_WORKERS), len(payloads)))
+        clients = acquire_worker_clients(base_url, workers, security_level)
+    try:
+        profile = profile or get_latency_profile(base_url, clients, security_level)
+        threshold = profile.threshold()
+        timeout = timeout or max(15.0, threshold * 2)
+        print(f"[SQLi-Timing] {base_url}: median {profile.median:.3f}s, MAD {profile.mad:.3f}s, "
+              f"threshold {threshold:.2f}s, {workers} workers")
+
+        slots = queue.Queue()
+        for client in clients:
+            slots.put(client)
+
+        def probe(payload: str, client: DVWAClient) -> ExploitResult:
+            verifier = ExploitVerifier(client.session_id, base_url, security_level, client=client)
+            try:
+                response = client.get(
+                    url,
+                    params={"id": payload, "Submit": "Submit"},
+                    timeout=timeout,
+                    stream=DVWA_STREAM_BLOCK_DETECTION,
+                )
+                # elapsed stops at the response headers, so body size does not skew it
+                result = verifier.evaluate_sqli_blind(
+                    payload,
+                    response,
+                    response.elapsed.total_seconds(),
+                    baseline=baseline,
+                    time_threshold=threshold,
+                )
+            except requests.Timeout:
+                result = ExploitResult(
+                    status=ExploitStatus.EXPLOITED,
+                    status_code=0,
+                    payload=payload,
+                    attack_type="sqli_blind",
+                    evidence=f"Request timed out after {timeout:.1f}s - possible time-based SQLi",
+                    evidence_type="time_based",
+                )
+            except Exception as e:
+                result = ExploitResult(
+                    status=ExploitStatus.ERROR,
+                    status_code=0,
+                    payload=payload,
+                    attack_type="sqli_blind",
+                    verification_details={"error": str(e)},
+                )
+            result.verification_details.update({
+                "latency_median": profile.median,
+                "latency_mad": profile.mad,
+                "time_threshold": threshold,
+            })
+            return result
+
+        def run(payload: str) -> ExploitResult:
+            client = slots.get()
+            try:
+                result = probe(payload, client)
+                if confirm and result.evidence_type == "time_based":
+                    second = probe(payload, client)
+                    if second.evidence_type != "time_based":
+                        # Delay did not repeat: jitter, not injection
+                        second.verification_details["unconfirmed_delay"] = result.evidence
+                        result = second
+                return result
+            finally:
+                slots.put(client)
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sqli-timing") as executor:
+            return list(executor.map(run, payloads))
+    finally:
+        if session is None:
+            release_worker_clients(base_url, clients, security_level)
@@ -0,0 +1,142 @@
+"""
+Offline XSS harmfulness analyzer.
+
+Parses a (decoded) payload as HTML with the standard library tokenizer and
+reports the constructs a browser would execute:
+    - <script> elements
+    - event-handler attributes (onerror=, onload=, SVG onbegin=, ...)
+    - javascript:/vbscript:/data:text/html URLs in URL-bearing attributes,
+      including SVG <animate>/<set> values and xlink:href
+    - iframe srcdoc documents that are harmful themselves
+    - <meta http-equiv=refresh> redirects
+
+The result has the same shape as the remote /validate_payload service's
+"harms", so EvaluateXSSResult is unchanged:
+    {"sent_requests": [], "unexpected_nodes": [{"tag_name", "html", "reason"}], "redirect_url": None}
+
+Nothing is rendered, so sent_requests is always empty; passive resource
+loads (<img src=x>) are not counted as harm.
+
+Usage:
+    harms = analyze_xss("<svg/onload=alert(1)>")
+    is_safe = is_harmless(harms)
+"""
+
+import html
+import re
+from html.parser import HTMLParser
+
+# Attributes whose value the browser navigates to or loads as a document
+URL_ATTRIBUTES = frozenset({
+    "href", "src", "action", "formaction", "data", "xlink:href",
+    "background", "poster", "lowsrc", "dynsrc", "codebase", "ping",
+})
+
+# SVG animation attributes that assign a URL to another attribute
+ANIMATION_TAGS = frozenset({"animate", "set"})
+ANIMATION_VALUE_ATTRIBUTES = frozenset({"values", "to", "from", "by"})
+
+VOID_TAGS = frozenset({
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+    "meta", "param", "source", "track", "wbr",
+})
+
+# Browsers drop ASCII control characters and whitespace inside a URL scheme
+_URL_IGNORED_CHARS = re.compile(r"[\x00-\x20]+")
+_SCRIPT_URL = re.compile(r"(?:javascript|vbscript|livescript):|data:text/html", re.IGNORECASE)
+_REFRESH_URL = re.compile(r"url\s*=\s*['\"]?([^'\"]*)", re.IGNORECASE)
+
+# srcdoc documents are analyzed recursively up to this depth
+MAX_SRCDOC_DEPTH = 3
+
+
+def _is_script_url(value: str) -> bool:
+    return bool(_SCRIPT_URL.match(_URL_IGNORED_CHARS.sub("", value)))
+
+
+def _serialize(tag: str, attrs: list) -> str:
+    """Render a start tag the way a browser serializes the element."""
+    rendered = "".join(
+        f' {name}="{html.escape(value or "", quote=True)}"' if value else f" {name}"
+        for name, value in attrs
+    )
+    if tag in VOID_TAGS:
+        return f"<{tag}{rendered}>"
+    return f"<{tag}{rendered}></{tag}>"
+
+
+class _XSSHarmParser(HTMLParser):
+    """Collects executable constructs while tokenizing a payload."""
+
+    def __init__(self, depth: int = 0):
+        # Attribute values arrive unescaped (&#106;avascript: -> javascript:)
+        super().__init__(convert_charrefs=True)
+        self.depth = depth
+        self.unexpected_nodes = []
+        self.redirect_url = None
+
+    def _flag(self, tag: str, attrs: list, reason: str):
+        self.unexpected_nodes.append({"tag_name": tag, "html": _serialize(tag, attrs), "reason": reason})
+
+    def _attribute_reason(self, tag: str, name: str, value: str):
+        if name.startswith("on") and len(name) > 2 and value.strip():
+            return f"event handler {name}"
+        if name in URL_ATTRIBUTES and _is_script_url(value):
+            return f"script URL in {name}"
+        if tag in ANIMATION_TAGS and name in ANIMATION_VALUE_ATTRIBUTES and _is_script_url(value):
+            return f"script URL in {tag} {name}"
+        if name == "srcdoc" and self.depth < MAX_SRCDOC_DEPTH and not is_harmless(analyze_xss(value, self.depth + 1)):
+            return "harmful srcdoc"
+        return None
+
+    def handle_starttag(self, tag: str, attrs: list):
+        if tag == "script":
+            self._flag(tag, attrs, "script element")
+            return
+        for name, value in attrs:
+            reason = self._attribute_reason(tag, name, value or "")
+            if reason:
+                self._flag(tag, attrs, reason)
+                return
+        if tag == "meta":
+            attributes = {name: value or "" for name, value in attrs}
+            if attributes.get("http-equiv", "").lower() == "refresh":
+                match = _REFRESH_URL.search(attributes.get("content", ""))
+                if match and match.group(1).strip():
+                    self.redirect_url = match.group(1).strip()
+                    if _is_script_url(self.redirect_url):
+                        self._flag(tag, attrs, "script URL in refresh")
+
+    def handle_startendtag(self, tag: str, attrs: list):
+        self.handle_starttag(tag, attrs)
+
+
+def analyze_xss(payload: str, depth: int = 0) -> dict:
+    """
+    Find executable HTML constructs in a payload.
+
+    Args:
+        payload: Payload, already decoded (see payload_harmness_validator._fully_decode_payload)
+        depth: srcdoc nesting level, internal
+
+    Returns:
+        {"sent_requests": [], "unexpected_nodes": [...], "redirect_url": str|None}
+    """
+    harms = {"sent_requests": [], "unexpected_nodes": [], "redirect_url": None}
+    # Without "<" the tokenizer emits no tag at all
+    if not payload or "<" not in payload:
+        return harms
+    parser = _XSSHarmParser(depth)
+    try:
+        parser.feed(payload)
+        parser.close()
+    except Exception as e:
+        print(f"[XSS-Analyzer] parse error: {e}")
+    harms["unexpected_nodes"] = parser.unexpected_nodes
+    harms["redirect_url"] = parser.redirect_url
+    return harms
+
+
+def is_harmless(harms: dict) -> bool:
+    """True when analyze_xss found nothing executable and no redirect."""
+    return not (harms["sent_requests"] or harms["unexpected_nodes"] or harms["redirect_url"])
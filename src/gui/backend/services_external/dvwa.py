@@ -13,8 +13,6 @@ Attack Result States:
 """
 
 import os
-import re
-import requests
 from typing import Optional
 from dataclasses import dataclass, field
 from enum import Enum
@@ -24,13 +22,15 @@ DVWA_BASE_URL = None
 DVWA_USERNAME = None
 DVWA_PASSWORD = None
 DVWA_SECURITY_LEVEL = None
+DVWA_STREAM_BLOCK_DETECTION = None
 
 try:
     from ..config.settings import (
         DVWA_BASE_URL,
         DVWA_USERNAME,
         DVWA_PASSWORD,
-        DVWA_SECURITY_LEVEL
+        DVWA_SECURITY_LEVEL,
+        DVWA_STREAM_BLOCK_DETECTION
     )
 except ImportError:
     try:
@@ -38,7 +38,8 @@ except ImportError:
             DVWA_BASE_URL,
             DVWA_USERNAME,
             DVWA_PASSWORD,
-            DVWA_SECURITY_LEVEL
+            DVWA_SECURITY_LEVEL,
+            DVWA_STREAM_BLOCK_DETECTION
         )
     except ImportError:
         pass
@@ -52,6 +53,11 @@ if DVWA_PASSWORD is None:
     DVWA_PASSWORD = os.getenv("DVWA_PASSWORD", "password")
 if DVWA_SECURITY_LEVEL is None:
     DVWA_SECURITY_LEVEL = os.getenv("DVWA_SECURITY_LEVEL", "low")
+if DVWA_STREAM_BLOCK_DETECTION is None:
+    DVWA_STREAM_BLOCK_DETECTION = os.getenv("DVWA_STREAM_BLOCK_DETECTION", "true").lower() == "true"
+
+from services_external.dvwa_client import DVWASessionHandle, get_client
+from services import block_detection
 
 # Import exploit verifier (flexible for different execution contexts)
 VERIFIER_AVAILABLE = False
@@ -72,9 +78,16 @@ class AttackStatus(Enum):
 
 @dataclass
 class AttackResult:
-    """Basic attack result (backward compatible)."""
+    """
+    Basic attack result (backward compatible).
+
+    exploited/evidence are only set by attack(..., verify=True), from the
+    same response that decided blocked.
+    """
     status_code: int
     blocked: bool|None
+    exploited: bool|None = None
+    evidence: Optional[str] = None
 
 
 @dataclass
@@ -86,7 +99,7 @@ class VerifiedAttackResult:
         status_code: HTTP response status code
         status: Attack status (BLOCKED, PASSED_NO_EFFECT, EXPLOITED, ERROR)
         blocked: True if WAF blocked the request
-        bypassed: True if request bypassed WAF (regardless of exploit success)
+        is_bypassed: True if request bypassed WAF (regardless of exploit success)
         exploited: True if payload successfully exploited DVWA
         evidence: Evidence of exploitation (if exploited)
         payload: The payload that was tested
@@ -95,7 +108,7 @@ class VerifiedAttackResult:
     status_code: int
     status: AttackStatus
     blocked: bool
-    bypassed: bool
+    is_bypassed: bool
     exploited: bool
     evidence: Optional[str] = None
     payload: str = ""
@@ -115,178 +128,188 @@ class VerifiedAttackResult:
         }
 
 
-def loginDVWA(base_url=None):
+def loginDVWA(base_url=None, force=False):
     """
     Login to DVWA and return session ID
 
+    The session is cached on the pooled client of the target, so repeated
+    calls reuse it instead of logging in again, and expired sessions are
+    renewed transparently on the next request.
+
+    Args:
+        base_url: DVWA base URL (default from settings)
+        force: Always perform a fresh login
+
     Returns:
         str: PHPSESSID for authenticated requests
     """
-    _base = (base_url or DVWA_BASE_URL).rstrip("/")
-    # Get PHPSESSID from login page
-    response = requests.get(f"{_base}/login.php")
-    cookies = response.cookies
-    php_session_id = cookies.get("PHPSESSID")
+    client = get_client(base_url)
+    if force:
+        return client.login()
+    return client.ensure_session()
 
-    # Try to extract user_token (CSRF token) if exists
-    token_match = re.search(
-        r'name=["\']user_token["\'] value=["\']([a-f0-9]+)["\']',
-        response.text
-    )
 
-    # Prepare login data
-    login_data = {
-        "username": DVWA_USERNAME,
-        "password": DVWA_PASSWORD,
-        "Login": "Login",
-    }
-
-    # Add user_token only if found
-    if token_match:
-        login_data["user_token"] = token_match.group(1)
-
-    # Perform login
-    response = requests.post(
-        f"{_base}/login.php",
-        data=login_data,
-        cookies={"PHPSESSID": php_session_id}
-    )
-
-    return php_session_id
+def _get_attack_client(session_id, base_url=None) -> DVWASessionHandle:
+    """Get the pooled client for a target, bound to the given session."""
+    return get_client(base_url).bind(session_id, DVWA_SECURITY_LEVEL)
 
 
 def _check_blocked(response):
     """
     Check if request was blocked by WAF
 
+    Uses the shared block-signature registry (services.block_detection):
+    status line and headers first, then one combined scan of the body,
+    with the DVWA matcher (vendor block pages only).
+
     Args:
         response: requests.Response object
 
     Returns:
         bool: True if blocked, False if bypassed
     """
-    return "ModSecurity" in response.text or response.status_code == 403
+    return block_detection.is_blocked(response, block_detection.get_dvwa_matcher())
+
 
+@dataclass
+class AttackRequest:
+    """HTTP request that delivers a payload to a DVWA module."""
+    method: str
+    path: str
+    data: Optional[dict] = None
+
+
+def build_attack_request(type: str, payload: str) -> AttackRequest:
+    """
+    Build the DVWA request for an attack type.
+
+    Shared by the blocking attack functions and the asyncio client
+    (services_external.dvwa_async) so both send identical requests.
+    """
+    if type == "xss_dom":
+        return AttackRequest("GET", f"vulnerabilities/xss_d/?default={payload}")
+    if type == "xss_reflected":
+        return AttackRequest("GET", f"vulnerabilities/xss_r/?name={payload}")
+    if type == "xss_stored":
+        return AttackRequest("POST", "vulnerabilities/xss_s/", {
+            "txtName": payload[:10],  # Name field has length limit
+            "mtxMessage": payload,     # Message field for payload
+            "btnSign": "Sign Guestbook"
+        })
+    if type == "sql_injection":
+        return AttackRequest("GET", f"vulnerabilities/sqli/?id={payload}&Submit=Submit")
+    if type == "sql_injection_blind":
+        return AttackRequest("GET", f"vulnerabilities/sqli_blind/?id={payload}&Submit=Submit")
+    raise ValueError(f"Invalid attack type: {type}")
+
+
+def _send_attack(type: str, payload: str, session_id: str, base_url: str = None, verify: bool = False) -> AttackResult:
+    client = _get_attack_client(session_id, base_url)
+    request = build_attack_request(type, payload)
+    url = client.url(request.path)
+    if request.method == "POST":
+        response = client.post(url, data=request.data, timeout=10, stream=DVWA_STREAM_BLOCK_DETECTION)
+    else:
+        response = client.get(url, timeout=10, stream=DVWA_STREAM_BLOCK_DETECTION)
+
+    # A streamed response holds its pooled connection until closed
+    try:
+        if not verify:
+            return AttackResult(
+                status_code=response.status_code,
+                blocked=_check_blocked(response)
+            )
+
+        # Exploit evidence comes from the same response (stored XSS adds one read-back GET)
+        verifier = ExploitVerifier(session_id, client.base_url, client=client)
+        result = verifier.evaluate(payload, type, response)
+        if result.status == ExploitStatus.ERROR:
+            # The streamed body was already read by the verifier, so it cannot be re-checked
+            print(f"Error verifying attack {type}: {result.verification_details.get('error')}")
+            return AttackResult(status_code=response.status_code, blocked=None)
+        return AttackResult(
+            status_code=response.status_code,
+            blocked=result.is_blocked,
+            exploited=result.is_exploited,
+            evidence=result.evidence,
+        )
+    finally:
+        response.close()
 
-def attack_xss_dom(payload, session_id, base_url=None) -> AttackResult:
+
+def attack_xss_dom(payload, session_id, base_url=None, verify=False) -> AttackResult:
     """
     Execute XSS DOM-Based attack
 
     Args:
         payload (str): XSS payload
         session_id (str): PHPSESSID from loginDVWA()
+        verify (bool): Also check the response for exploit evidence
 
     Returns:
         dict: {status_code, blocked}
     """
-    _base = (base_url or DVWA_BASE_URL).rstrip("/")
-    url = f"{_base}/vulnerabilities/xss_d/?default={payload}"
-    response = requests.get(
-        url,
-        cookies={"PHPSESSID": session_id, "security": DVWA_SECURITY_LEVEL}
-    )
-    return AttackResult(
-        status_code=response.status_code,
-        blocked=_check_blocked(response)
-    )
+    return _send_attack("xss_dom", payload, session_id, base_url, verify)
 
 
-def attack_xss_reflected(payload, session_id, base_url=None) -> AttackResult:
+def attack_xss_reflected(payload, session_id, base_url=None, verify=False) -> AttackResult:
     """
     Execute XSS Reflected attack
 
     Args:
         payload (str): XSS payload
         session_id (str): PHPSESSID from loginDVWA()
+        verify (bool): Also check the response for exploit evidence
 
     Returns:
         dict: {status_code, blocked}
     """
-    _base = (base_url or DVWA_BASE_URL).rstrip("/")
-    url = f"{_base}/vulnerabilities/xss_r/?name={payload}"
-    response = requests.get(
-        url,
-        cookies={"PHPSESSID": session_id, "security": DVWA_SECURITY_LEVEL}
-    )
-    return AttackResult(
-        status_code=response.status_code,
-        blocked=_check_blocked(response)
-    )
+    return _send_attack("xss_reflected", payload, session_id, base_url, verify)
 
 
-def attack_xss_stored(payload, session_id, base_url=None) -> AttackResult:
+def attack_xss_stored(payload, session_id, base_url=None, verify=False) -> AttackResult:
     """
     Execute XSS Stored attack
 
     Args:
         payload (str): XSS payload
         session_id (str): PHPSESSID from loginDVWA()
+        verify (bool): Also check the response for exploit evidence
 
     Returns:
         dict: {status_code, blocked}
     """
-    _base = (base_url or DVWA_BASE_URL).rstrip("/")
-    url = f"{_base}/vulnerabilities/xss_s/"
-    data = {
-        "txtName": payload,
-        "mtxMessage": "test",
-        "btnSign": "Sign Guestbook"
-    }
-    response = requests.post(
-        url,
-        data=data,
-        cookies={"PHPSESSID": session_id, "security": DVWA_SECURITY_LEVEL}
-    )
-    return AttackResult(
-        status_code=response.status_code,
-        blocked=_check_blocked(response)
-    )
+    return _send_attack("xss_stored", payload, session_id, base_url, verify)
 
 
-def attack_sql_injection(payload, session_id, base_url=None) -> AttackResult:
+def attack_sql_injection(payload, session_id, base_url=None, verify=False) -> AttackResult:
     """
     Execute SQL Injection attack
 
     Args:
         payload (str): SQL injection payload
         session_id (str): PHPSESSID from loginDVWA()
+        verify (bool): Also check the response for exploit evidence
 
     Returns:
         dict: {status_code, blocked}
     """
-    _base = (base_url or DVWA_BASE_URL).rstrip("/")
-    url = f"{_base}/vulnerabilities/sqli/?id={payload}&Submit=Submit"
-    response = requests.get(
-        url,
-        cookies={"PHPSESSID": session_id, "security": DVWA_SECURITY_LEVEL}
-    )
-    return AttackResult(
-        status_code=response.status_code,
-        blocked=_check_blocked(response)
-    )
+    return _send_attack("sql_injection", payload, session_id, base_url, verify)
 
 
-def attack_sql_injection_blind(payload, session_id, base_url=None) -> AttackResult:
+def attack_sql_injection_blind(payload, session_id, base_url=None, verify=False) -> AttackResult:
     """
     Execute Blind SQL Injection attack
 
     Args:
         payload (str): SQL injection payload
         session_id (str): PHPSESSID from loginDVWA()
+        verify (bool): Also check the response for exploit evidence
 
     Returns:
         dict: {status_code, blocked}
     """
-    _base = (base_url or DVWA_BASE_URL).rstrip("/")
-    url = f"{_base}/vulnerabilities/sqli_blind/?id={payload}&Submit=Submit"
-    response = requests.get(
-        url,
-        cookies={"PHPSESSID": session_id, "security": DVWA_SECURITY_LEVEL}
-    )
-    return AttackResult(
-        status_code=response.status_code,
-        blocked=_check_blocked(response)
-    )
+    return _send_attack("sql_injection_blind", payload, session_id, base_url, verify)
 
 
 # =============================================================================
@@ -319,7 +342,7 @@ def _convert_exploit_result(result, payload: str, attack_type: str) -> VerifiedA
         status_code=result.status_code,
         status=status_map.get(result.status, AttackStatus.ERROR),
         blocked=result.is_blocked,
-        is_bypassed=result.is_bypassed_waf,
+        is_bypassed=result.bypassed_waf,
         exploited=result.is_exploited,
         evidence=result.evidence,
         payload=payload,
@@ -633,11 +656,24 @@ VALID_ATTACK_TYPES = [
     "sql_injection_blind"
 ]
 
-def attack(type : str, payload : str, session_id : str, base_url : str = None) -> AttackResult:
+def attack(type : str, payload : str, session_id : str, base_url : str = None, verify : bool = False) -> AttackResult:
+    """
+    Send a payload to DVWA.
+
+    Args:
+        type: Attack type (one of VALID_ATTACK_TYPES)
+        payload: Attack payload
+        session_id: PHPSESSID from loginDVWA()
+        base_url: DVWA base URL (default from settings)
+        verify: Also check for exploit evidence, from the same response
+
+    Returns:
+        AttackResult; exploited/evidence are set when verify=True
+    """
     func = DVWA_ATTACK_FUNC.get(type)
     if func:
         try:
-            return func(payload, session_id, base_url=base_url)
+            return func(payload, session_id, base_url=base_url, verify=verify)
         except Exception as e:
             print(f"Error executing attack {type}: {str(e)}")
             return AttackResult(status_code=0, blocked=None)
@@ -0,0 +1,356 @@
+"""
+Asyncio DVWA client.
+
+Async counterpart of services_external.dvwa for experiment runs that keep
+hundreds of probes in flight (several WAF targets x every attack type) on a
+single event loop instead of one thread per request. Requests are built by
+dvwa.build_attack_request, so both APIs send the same bytes and return the
+same AttackResult.
+
+Requires aiohttp (see requirements.txt).
+
+Usage:
+    results = await async_attack_many([
+        {"attack_type": "xss_reflected", "payload": "<svg onload=alert(1)>", "base_url": modsec_url},
+        {"attack_type": "sql_injection", "payload": "1' OR '1'='1", "base_url": naxsi_url},
+    ], concurrency=200)
+
+    # From blocking code
+    results = attack_many(items, concurrency=200)
+"""
+
+import asyncio
+import weakref
+from typing import Iterable, Optional, Union
+
+from requests.utils import requote_uri
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError:
+    aiohttp = None
+    URL = None
+
+from services_external.dvwa import (
+    DVWA_BASE_URL,
+    DVWA_SECURITY_LEVEL,
+    DVWA_ATTACK_FUNC,
+    AttackResult,
+    build_attack_request,
+)
+from services import block_detection
+from services_external.dvwa_client import DVWA_POOL_SIZE, DVWASessionError, build_login_data
+from config.settings import DEFAULT_ATTACK_CONCURRENCY
+
+AttackItem = Union[dict, tuple]
+
+
+def _require_aiohttp():
+    if aiohttp is None:
+        raise ImportError("aiohttp is required for the async DVWA client: pip install aiohttp")
+
+
+class AsyncDVWAClient:
+    """
+    Connection-pooled aiohttp client bound to a single DVWA target.
+
+    Like DVWAClient, the pooled session keeps no cookies: each request
+    carries its own PHPSESSID and security cookies.
+
+    Must be created and used inside one running event loop.
+    """
+
+    def __init__(self, base_url: str = None, security_level: str = None, pool_size: int = None):
+        """
+        Initialize client.
+
+        Args:
+            base_url: DVWA base URL (default from settings)
+            security_level: DVWA security level (default from settings)
+            pool_size: Max pooled connections to the target (default DVWA_POOL_SIZE)
+        """
+        _require_aiohttp()
+        self.base_url = (base_url or DVWA_BASE_URL).rstrip("/")
+        self.security_level = security_level or DVWA_SECURITY_LEVEL
+        self.pool_size = pool_size or DVWA_POOL_SIZE
+        self.session_id = None
+        self._expired_sessions = set()
+        self._login_lock = asyncio.Lock()
+
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.pool_size),
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def url(self, path: str):
+        """
+        Build an absolute, already-encoded URL for a DVWA path.
+
+        Payloads are quoted exactly like requests does, and yarl is told not
+        to re-encode them, so the target sees the same URL as the sync client.
+        """
+        return URL(requote_uri(f"{self.base_url}/{path.lstrip('/')}"), encoded=True)
+
+    def current_session(self, session_id: Optional[str] = None) -> Optional[str]:
+        """The given session, or the client's own when none is given or it was replaced by a re-login."""
+        if not session_id or session_id in self._expired_sessions:
+            return self.session_id
+        return session_id
+
+    def cookies(self, session_id: Optional[str] = None) -> dict:
+        """PHPSESSID and security cookies of one request."""
+        cookies = {"security": self.security_level}
+        session_id = self.current_session(session_id)
+        if session_id:
+            cookies["PHPSESSID"] = session_id
+        return cookies
+
+    async def login(self, username: str = None, password: str = None) -> str:
+        """
+        Login to DVWA and make the resulting session the client's own.
+
+        Returns:
+            str: PHPSESSID for authenticated requests
+        """
+        # Get PHPSESSID from login page
+        async with self.session.get(self.url("login.php")) as response:
+            text = await response.text(errors="replace")
+            cookie = response.cookies.get("PHPSESSID")
+        php_session_id = cookie.value if cookie else None
+
+        async with self.session.post(
+            self.url("login.php"),
+            data=build_login_data(text, username, password),
+            cookies={"PHPSESSID": php_session_id} if php_session_id else None,
+            allow_redirects=False,
+        ) as response:
+            await response.read()
+            cookie = response.cookies.get("PHPSESSID")
+
+        # DVWA may rotate the session on login, prefer the latest cookie
+        if cookie:
+            php_session_id = cookie.value
+        self.session_id = php_session_id
+        return php_session_id
+
+    async def ensure_login(self) -> str:
+        """Login once; concurrent callers wait for the same login."""
+        if self.session_id:
+            return self.session_id
+        async with self._login_lock:
+            if not self.session_id:
+                await self.login()
+        return self.session_id
+
+    async def relogin(self, expired_session_id: str = None) -> str:
+        """Replace an expired session; concurrent callers share one login."""
+        async with self._login_lock:
+            if expired_session_id:
+                self._expired_sessions.add(expired_session_id)
+            if self.session_id and self.session_id != expired_session_id:
+                return self.session_id
+            print(f"[DVWA-Signin] session expired, re-login {self.base_url}...")
+            return await self.login()
+
+    async def attack(self, type: str, payload: str, session_id: Optional[str] = None) -> AttackResult:
+        """
+        Send one payload and classify the response.
+
+        Args:
+            session_id: PHPSESSID to send (default: the client's own session)
+
+        Re-authenticates once if DVWA redirects to login.php.
+        """
+        request = build_attack_request(type, payload)
+        session_id = self.current_session(session_id)
+        for attempt in range(2):
+            # Redirects are followed, as by DVWAClient, so both clients classify the same final response
+            async with self.session.request(
+                request.method,
+                self.url(request.path),
+                data=request.data,
+                cookies=self.cookies(session_id),
+            ) as response:
+                if not _is_login_redirect(response):
+                    return AttackResult(
+                        status_code=response.status,
+                        blocked=await _check_blocked(response)
+                    )
+            if attempt == 0:
+                session_id = await self.relogin(session_id)
+        raise DVWASessionError(f"DVWA at {self.base_url} keeps redirecting to login.php")
+
+    async def close(self):
+        await self.session.close()
+
+
+def _is_login_redirect(response) -> bool:
+    """Async counterpart of dvwa_client.is_login_redirect."""
+    if 300 <= response.status < 400:
+        return "login.php" in response.headers.get("Location", "")
+    return bool(response.history) and response.url.path.endswith("login.php")
+
+
+async def _check_blocked(response) -> bool:
+    """Async counterpart of dvwa._check_blocked: status/headers first, then a chunked body scan."""
+    matcher = block_detection.get_dvwa_matcher()
+    if matcher.match_status_and_headers(response.status, response.headers) is not None:
+        return True
+    scanner = matcher.scanner()
+    async for chunk in response.content.iter_chunked(block_detection.CHUNK_SIZE):
+        if scanner.feed(chunk) is not None:
+            return True
+    return False
+
+
+# One client per (event loop, target): aiohttp sessions cannot cross loops
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, AsyncDVWAClient]]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client(base_url: str = None, pool_size: int = None) -> AsyncDVWAClient:
+    """
+    Get the AsyncDVWAClient of a target for the running event loop.
+
+    Args:
+        base_url: DVWA base URL (default from settings)
+        pool_size: Pool size used when the client is created
+
+    Returns:
+        AsyncDVWAClient shared by every coroutine on this loop targeting the same base URL
+    """
+    loop = asyncio.get_running_loop()
+    key = (base_url or DVWA_BASE_URL).rstrip("/")
+    clients = _clients.setdefault(loop, {})
+    client = clients.get(key)
+    if client is None or client.session.closed:
+        client = AsyncDVWAClient(key, pool_size=pool_size)
+        clients[key] = client
+    return client
+
+
+async def close_async_clients():
+    """Close every client of the running event loop."""
+    clients = _clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+
+
+async def async_login(base_url: str = None) -> str:
+    """
+    Login to DVWA and return session ID
+
+    Returns:
+        str: PHPSESSID for authenticated requests
+    """
+    return await get_async_client(base_url).login()
+
+
+async def async_attack(type: str, payload: str, session_id: str = None, base_url: str = None) -> AttackResult:
+    """
+    Async counterpart of dvwa.attack.
+
+    Args:
+        type: Attack type (one of dvwa.VALID_ATTACK_TYPES)
+        payload: Attack payload
+        session_id: PHPSESSID (logs in on first use when omitted)
+        base_url: DVWA base URL (default from settings)
+
+    Returns:
+        AttackResult; status_code 0 and blocked None on request errors
+    """
+    if type not in DVWA_ATTACK_FUNC:
+        raise ValueError(f"Invalid attack type: {type}")
+    client = get_async_client(base_url)
+    try:
+        if not session_id:
+            await client.ensure_login()
+        return await client.attack(type, payload, session_id)
+    except Exception as e:
+        print(f"Error executing attack {type}: {str(e)}")
+        return AttackResult(status_code=0, blocked=None)
+
+
+def _unpack_item(item: AttackItem) -> tuple:
+    if isinstance(item, dict):
+        return (
+            item.get("attack_type"),
+            item.get("payload"),
+            item.get("session_id"),
+            item.get("base_url"),
+        )
+    type, payload, *rest = item
+    session_id = rest[0] if len(rest) > 0 else None
+    base_url = rest[1] if len(rest) > 1 else None
+    return type, payload, session_id, base_url
+
+
+async def async_attack_many(
+    items: Iterable[AttackItem],
+    concurrency: Optional[int] = None,
+    session_id: Optional[str] = None,
+    base_url: Optional[str] = None,
+) -> list[AttackResult]:
+    """
+    Run many attacks on one event loop with bounded concurrency.
+
+    Args:
+        items: {"attack_type", "payload", "session_id"?, "base_url"?} dicts or
+            (attack_type, payload[, session_id[, base_url]]) tuples; items may
+            target different DVWA instances
+        concurrency: Max in-flight requests overall (default DEFAULT_ATTACK_CONCURRENCY)
+        session_id: PHPSESSID for items without their own
+        base_url: Target for items without their own
+
+    Returns:
+        AttackResult list in input order
+
+    Raises:
+        ValueError: An item has an unknown attack type (checked before any
+            request is sent)
+    """
+    items = [_unpack_item(item) for item in items]
+    invalid = [i for i, item in enumerate(items) if item[0] not in DVWA_ATTACK_FUNC]
+    if invalid:
+        raise ValueError(
+            f"Invalid attack type at item(s) {invalid[:10]}: {sorted({str(items[i][0]) for i in invalid})}"
+        )
+    semaphore = asyncio.Semaphore(max(1, int(concurrency or DEFAULT_ATTACK_CONCURRENCY)))
+
+    async def run(item):
+        type, payload, item_session_id, item_base_url = item
+        async with semaphore:
+            return await async_attack(
+                type,
+                payload,
+                session_id=item_session_id or session_id,
+                base_url=item_base_url or base_url,
+            )
+
+    return await asyncio.gather(*(run(item) for item in items))
+
+
+def attack_many(
+    items: Iterable[AttackItem],
+    concurrency: Optional[int] = None,
+    session_id: Optional[str] = None,
+    base_url: Optional[str] = None,
+) -> list[AttackResult]:
+    """
+    Blocking wrapper around async_attack_many for callers without an event loop.
+
+    Clients are closed before returning.
+    """
+    async def run():
+        try:
+            return await async_attack_many(items, concurrency, session_id, base_url)
+        finally:
+            await close_async_clients()
+
+    return asyncio.run(run())
@@ -0,0 +1,363 @@
+"""
+Pooled HTTP client for DVWA targets.
+
+One DVWAClient is kept per DVWA base URL. Each client wraps a
+requests.Session with a bounded keep-alive connection pool, so thousands of
+payloads sent to the same target reuse a handful of TCP/TLS connections
+instead of opening a new one per request.
+
+The client also manages the DVWA login of its target: the session is created
+once and reused by every caller, and a request redirected to login.php
+(expired session) triggers one transparent re-login and a retry. Concurrent
+workers hitting an expired session share a single re-login.
+
+The pooled session never stores cookies. PHPSESSID and security are sent
+with each request, so callers using different DVWA sessions on the same
+target (bind()) share the connection pool without overwriting each other's
+cookies.
+
+Usage:
+    client = get_client("http://modsec.llmshield.click")
+    session_id = client.ensure_session()
+    response = client.get(client.url("vulnerabilities/sqli/?id=1&Submit=Submit"))
+
+    # Requests on a session obtained elsewhere
+    handle = client.bind(session_id, "low")
+    response = handle.get(handle.url("vulnerabilities/sqli/?id=1&Submit=Submit"))
+"""
+
+import os
+import re
+import threading
+from http.cookiejar import DefaultCookiePolicy
+from typing import Optional
+
+import requests
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+
+# Flexible imports for different execution contexts
+DVWA_BASE_URL = None
+DVWA_USERNAME = None
+DVWA_PASSWORD = None
+DVWA_SECURITY_LEVEL = None
+DVWA_POOL_SIZE = None
+
+try:
+    from ..config.settings import (
+        DVWA_BASE_URL,
+        DVWA_USERNAME,
+        DVWA_PASSWORD,
+        DVWA_SECURITY_LEVEL,
+        DVWA_POOL_SIZE,
+    )
+except ImportError:
+    try:
+        from config.settings import (
+            DVWA_BASE_URL,
+            DVWA_USERNAME,
+            DVWA_PASSWORD,
+            DVWA_SECURITY_LEVEL,
+            DVWA_POOL_SIZE,
+        )
+    except ImportError:
+        pass
+
+# Default values if imports failed
+if DVWA_BASE_URL is None:
+    DVWA_BASE_URL = os.getenv("DVWA_BASE_URL", "http://localhost")
+if DVWA_USERNAME is None:
+    DVWA_USERNAME = os.getenv("DVWA_USERNAME", "admin")
+if DVWA_PASSWORD is None:
+    DVWA_PASSWORD = os.getenv("DVWA_PASSWORD", "password")
+if DVWA_SECURITY_LEVEL is None:
+    DVWA_SECURITY_LEVEL = os.getenv("DVWA_SECURITY_LEVEL", "low")
+if DVWA_POOL_SIZE is None:
+    DVWA_POOL_SIZE = int(os.getenv("DVWA_POOL_SIZE", "20"))
+
+
+class DVWASessionError(Exception):
+    """Raised when DVWA still redirects to login.php after re-authentication."""
+
+
+class _RejectAllCookies(DefaultCookiePolicy):
+    """Keeps Set-Cookie responses out of the shared session jar."""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+def build_login_data(login_page: str, username: str = None, password: str = None) -> dict:
+    """
+    Form data of a DVWA login, with the CSRF user_token of the login page.
+
+    Shared by DVWAClient and the asyncio client (services_external.dvwa_async)
+    so both log in the same way.
+
+    Args:
+        login_page: HTML of login.php
+        username: DVWA user (default from settings)
+        password: DVWA password (default from settings)
+    """
+    login_data = {
+        "username": username or DVWA_USERNAME,
+        "password": password or DVWA_PASSWORD,
+        "Login": "Login",
+    }
+
+    # Add user_token (CSRF token) only if found
+    token_match = re.search(
+        r'name=["\']user_token["\'] value=["\']([a-f0-9]+)["\']',
+        login_page
+    )
+    if token_match:
+        login_data["user_token"] = token_match.group(1)
+    return login_data
+
+
+def is_login_redirect(response: requests.Response) -> bool:
+    """True if DVWA sent the request to its login page (session missing or expired)."""
+    if response.is_redirect:
+        return "login.php" in response.headers.get("Location", "")
+    return bool(response.history) and urlparse(response.url).path.endswith("login.php")
+
+
+class DVWAClient:
+    """
+    Keep-alive, connection-pooled client bound to a single DVWA target.
+
+    Requests carry the client's own session (see login) unless they name
+    another one; the underlying requests.Session keeps no cookies.
+    """
+
+    def __init__(self, base_url: str = None, security_level: str = None, pool_size: int = None):
+        """
+        Initialize client.
+
+        Args:
+            base_url: DVWA base URL (default from settings)
+            security_level: DVWA security level (default from settings)
+            pool_size: Max pooled connections to the target (default DVWA_POOL_SIZE)
+        """
+        self.base_url = (base_url or DVWA_BASE_URL).rstrip("/")
+        self.security_level = security_level or DVWA_SECURITY_LEVEL
+        self.pool_size = pool_size or DVWA_POOL_SIZE
+        self.session_id = None
+        # Sessions replaced by a re-login; callers still holding one get the current session
+        self._expired_sessions = set()
+
+        self.session = requests.Session()
+        # pool_block=True: extra workers wait for a free connection instead of
+        # opening throwaway connections beyond the pool size
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=self.pool_size,
+            pool_block=True,
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.cookies.set_policy(_RejectAllCookies())
+        self._login_lock = threading.Lock()
+
+    def url(self, path: str) -> str:
+        """Build an absolute URL for a DVWA path."""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def current_session(self, session_id: Optional[str] = None) -> Optional[str]:
+        """
+        Session a request should use: the given one, or the client's own when
+        none is given or the given one has since been replaced by a re-login.
+        """
+        if not session_id or session_id in self._expired_sessions:
+            return self.session_id
+        return session_id
+
+    def cookies(self, session_id: Optional[str] = None, security_level: str = None) -> dict:
+        """PHPSESSID and security cookies of one request."""
+        cookies = {"security": security_level or self.security_level}
+        session_id = self.current_session(session_id)
+        if session_id:
+            cookies["PHPSESSID"] = session_id
+        return cookies
+
+    def bind(self, session_id: Optional[str], security_level: str = None) -> "DVWASessionHandle":
+        """Requests on this client's pool that carry the given session's cookies."""
+        return DVWASessionHandle(self, session_id, security_level or self.security_level)
+
+    def login(self, username: str = None, password: str = None) -> str:
+        """
+        Login to DVWA and make the resulting session the client's own.
+
+        Serialized with ensure_session and relogin, so a forced login never
+        races a re-login of the same client.
+
+        Returns:
+            str: PHPSESSID for authenticated requests
+        """
+        with self._login_lock:
+            return self._login(username, password)
+
+    def _login(self, username: str = None, password: str = None) -> str:
+        """Perform the login; caller holds _login_lock."""
+        # Get PHPSESSID from login page
+        response = self.session.get(self.url("login.php"))
+        php_session_id = response.cookies.get("PHPSESSID")
+
+        # Perform login
+        response = self.session.post(
+            self.url("login.php"),
+            data=build_login_data(response.text, username, password),
+            cookies={"PHPSESSID": php_session_id} if php_session_id else None,
+            allow_redirects=False,
+        )
+        response.close()
+
+        # DVWA may rotate the session on login, prefer the latest cookie
+        php_session_id = response.cookies.get("PHPSESSID") or php_session_id
+        self.session_id = php_session_id
+        return php_session_id
+
+    def ensure_session(self) -> str:
+        """
+        Return the cached session of this target, logging in on first use.
+
+        Returns:
+            str: PHPSESSID for authenticated requests
+        """
+        if self.session_id:
+            return self.session_id
+        with self._login_lock:
+            if not self.session_id:
+                self._login()
+        return self.session_id
+
+    def relogin(self, expired_session_id: str = None) -> str:
+        """
+        Replace an expired session (single-flight).
+
+        Workers that saw the same expired session wait for one login and
+        then reuse its result instead of logging in again.
+
+        Returns:
+            str: The new PHPSESSID
+        """
+        with self._login_lock:
+            if expired_session_id:
+                self._expired_sessions.add(expired_session_id)
+            if self.session_id and self.session_id != expired_session_id:
+                # Another worker already re-authenticated (or a bound session expired)
+                return self.session_id
+            print(f"[DVWA-Signin] session expired, re-login {self.base_url}...")
+            return self._login()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        session_id: Optional[str] = None,
+        security_level: str = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request, re-authenticating once if DVWA redirects to login.php.
+
+        Args:
+            session_id: PHPSESSID to send (default: the client's own session)
+            security_level: DVWA security level to send (default: the client's)
+
+        An expired session shows up either as the redirect itself
+        (allow_redirects=False) or as a followed redirect ending on login.php.
+
+        Raises:
+            DVWASessionError: DVWA still redirects to login.php after re-login
+        """
+        session_id = self.current_session(session_id)
+        response = self.session.request(method, url, cookies=self.cookies(session_id, security_level), **kwargs)
+        if not is_login_redirect(response):
+            return response
+
+        response.close()
+        session_id = self.relogin(session_id)
+        response = self.session.request(method, url, cookies=self.cookies(session_id, security_level), **kwargs)
+        if is_login_redirect(response):
+            response.close()
+            raise DVWASessionError(f"DVWA at {self.base_url} keeps redirecting to login.php")
+        return response
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+
+class DVWASessionHandle:
+    """
+    One DVWA session's view of a pooled DVWAClient.
+
+    Same request methods as the client; every request carries this
+    handle's cookies. After a re-login replaced the session, the client's
+    new session is used instead.
+    """
+
+    def __init__(self, client: DVWAClient, session_id: Optional[str], security_level: str):
+        self.client = client
+        self.base_url = client.base_url
+        self.security_level = security_level
+        self._session_id = session_id
+
+    @property
+    def session_id(self) -> Optional[str]:
+        return self.client.current_session(self._session_id)
+
+    def url(self, path: str) -> str:
+        return self.client.url(path)
+
+    def bind(self, session_id: Optional[str], security_level: str = None) -> "DVWASessionHandle":
+        return self.client.bind(session_id, security_level or self.security_level)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        return self.client.request(method, url, self._session_id, self.security_level, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+_clients: dict[str, DVWAClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(base_url: str = None, pool_size: int = None) -> DVWAClient:
+    """
+    Get the shared DVWAClient for a target, creating it on first use.
+
+    Args:
+        base_url: DVWA base URL (default from settings)
+        pool_size: Pool size used when the client is created
+
+    Returns:
+        DVWAClient shared by every caller targeting the same base URL
+    """
+    key = (base_url or DVWA_BASE_URL).rstrip("/")
+    client = _clients.get(key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = DVWAClient(key, pool_size=pool_size)
+                _clients[key] = client
+    return client
+
+
+def close_clients():
+    """Close every pooled client (e.g. at the end of an experiment run)."""
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
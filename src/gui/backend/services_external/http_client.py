@@ -0,0 +1,292 @@
+"""
+Shared pooled HTTP client for LLM and LLMShield APIs.
+
+One requests.Session (keep-alive connection pool per host) is shared by all
+callers. Every request gets a (connect, read) timeout. Connection errors,
+timeouts, 429 and 5xx responses are retried with exponential backoff and
+full jitter (read timeouts only for idempotent methods, since the upstream
+may still be processing a timed-out POST), waiting at least as long as a Retry-After header asks. A
+circuit breaker per host fails fast once an upstream keeps failing, instead
+of tying up workers on a dead endpoint:
+    - closed:    requests flow; consecutive failed calls are counted
+    - open:      after breaker_threshold failed calls, requests raise
+                 CircuitOpenError for breaker_reset seconds
+    - half-open: after that, one trial request decides between closed and open
+
+Usage:
+    client = get_http_client()
+    response = client.post(url, json=body, timeout=(10, 300))
+"""
+
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Flexible imports for different execution contexts
+HTTP_POOL_SIZE = None
+HTTP_CONNECT_TIMEOUT = None
+HTTP_READ_TIMEOUT = None
+HTTP_MAX_RETRIES = None
+HTTP_BACKOFF_BASE = None
+HTTP_BACKOFF_MAX = None
+HTTP_BREAKER_THRESHOLD = None
+HTTP_BREAKER_RESET = None
+
+try:
+    from ..config.settings import (
+        HTTP_POOL_SIZE,
+        HTTP_CONNECT_TIMEOUT,
+        HTTP_READ_TIMEOUT,
+        HTTP_MAX_RETRIES,
+        HTTP_BACKOFF_BASE,
+        HTTP_BACKOFF_MAX,
+        HTTP_BREAKER_THRESHOLD,
+        HTTP_BREAKER_RESET,
+    )
+except ImportError:
+    try:
+        from config.settings import (
+            HTTP_POOL_SIZE,
+            HTTP_CONNECT_TIMEOUT,
+            HTTP_READ_TIMEOUT,
+            HTTP_MAX_RETRIES,
+            HTTP_BACKOFF_BASE,
+            HTTP_BACKOFF_MAX,
+            HTTP_BREAKER_THRESHOLD,
+            HTTP_BREAKER_RESET,
+        )
+    except ImportError:
+        pass
+
+# Default values if imports failed
+if HTTP_POOL_SIZE is None:
+    HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "20"))
+if HTTP_CONNECT_TIMEOUT is None:
+    HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+if HTTP_READ_TIMEOUT is None:
+    HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "180"))
+if HTTP_MAX_RETRIES is None:
+    HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+if HTTP_BACKOFF_BASE is None:
+    HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "1"))
+if HTTP_BACKOFF_MAX is None:
+    HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))
+if HTTP_BREAKER_THRESHOLD is None:
+    HTTP_BREAKER_THRESHOLD = int(os.getenv("HTTP_BREAKER_THRESHOLD", "5"))
+if HTTP_BREAKER_RESET is None:
+    HTTP_BREAKER_RESET = float(os.getenv("HTTP_BREAKER_RESET", "30"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Methods whose read timeout is retried by default
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# Longest Retry-After honored; longer waits fail the call instead of blocking a worker
+MAX_RETRY_AFTER = 120
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without sending when the host's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker of one host."""
+
+    def __init__(self, threshold: int = HTTP_BREAKER_THRESHOLD, reset_after: float = HTTP_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def before_request(self, host: str):
+        """Raise CircuitOpenError unless a request may be sent now."""
+        if self.threshold <= 0:
+            return
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_after or self._trial_running:
+                raise CircuitOpenError(f"Circuit open for {host} after {self.failures} failed calls")
+            # Half-open: let a single trial request through
+            self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.threshold > 0 and (self.failures >= self.threshold or self.opened_at is not None):
+                self.opened_at = time.monotonic()
+
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Seconds asked for by a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class HTTPClient:
+    """Pooled session with timeouts, retries with backoff and per-host circuit breakers."""
+
+    def __init__(
+        self,
+        pool_size: int = HTTP_POOL_SIZE,
+        connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+        read_timeout: float = HTTP_READ_TIMEOUT,
+        max_retries: int = HTTP_MAX_RETRIES,
+        backoff_base: float = HTTP_BACKOFF_BASE,
+        backoff_max: float = HTTP_BACKOFF_MAX,
+        breaker_threshold: int = HTTP_BREAKER_THRESHOLD,
+        breaker_reset: float = HTTP_BREAKER_RESET,
+    ):
+        """
+        Initialize client.
+
+        Args:
+            pool_size: Max keep-alive connections per host
+            connect_timeout: Default seconds to establish a connection
+            read_timeout: Default seconds to wait for response data
+            max_retries: Retries after the first attempt (0 = no retry)
+            backoff_base: First backoff cap in seconds, doubled per retry
+            backoff_max: Max backoff cap in seconds
+            breaker_threshold: Consecutive failed calls that open a host's circuit (0 = no breaker)
+            breaker_reset: Seconds an open circuit waits before a trial request
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+
+        self.session = requests.Session()
+        # Retries are handled here (with Retry-After and the breaker), not by urllib3
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+                self._breakers[host] = breaker
+            return breaker
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeout=None,
+        retries: Optional[int] = None,
+        retry_read_timeout: Optional[bool] = None,
+        breaker_key: Optional[str] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Send a request, retrying transient failures.
+
+        Args:
+            retries: Retries after the first attempt (default max_retries)
+            retry_read_timeout: Retry after a read timeout (default: only for
+                idempotent methods; a timed-out POST may still be running upstream)
+            breaker_key: Circuit breaker the call counts toward (default: the
+                URL's host); probes of optional endpoints use their own key so
+                their failures cannot open the host's circuit
+
+        Returns the last response once retries are exhausted on 429/5xx (the
+        caller handles the status as before), and raises the last connection
+        error or timeout, or CircuitOpenError when the host's circuit is open.
+        """
+        host = urlparse(url).netloc
+        breaker = self.breaker(breaker_key or host)
+        retries = self.max_retries if retries is None else retries
+        if retry_read_timeout is None:
+            retry_read_timeout = method.upper() in IDEMPOTENT_METHODS
+        breaker.before_request(host)
+
+        for attempt in range(retries + 1):
+            response, error, retry_after = None, None, None
+            try:
+                response = self.session.request(method, url, timeout=timeout or self.timeout, **kwargs)
+            except requests.exceptions.ReadTimeout as e:
+                if not retry_read_timeout:
+                    breaker.record_failure()
+                    raise
+                error = e
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = e
+            except Exception:
+                # Not retryable (bad URL, invalid body, ...); still ends a half-open trial
+                breaker.record_failure()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                retry_after = _retry_after_seconds(response)
+
+            if attempt == retries or (retry_after is not None and retry_after > MAX_RETRY_AFTER):
+                break
+            delay = self._backoff(attempt, retry_after)
+            reason = f"status {response.status_code}" if response is not None else type(error).__name__
+            print(f"[HTTP] {method} {host}: {reason}, retry {attempt + 1}/{retries} in {delay:.1f}s")
+            if response is not None:
+                # Hand the connection back to the pool before waiting
+                response.close()
+            time.sleep(delay)
+
+        # Rate limiting means the upstream is alive; only outages count toward the breaker
+        if response is not None and response.status_code == 429:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+        if response is not None:
+            return response
+        raise error
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """Get the process-wide HTTP client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HTTPClient()
+        return _client
@@ -3,22 +3,80 @@ LLM API client service for OpenAI and Claude (Anthropic) interactions
 """
 
 import json
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
+from copy import deepcopy
 from dataclasses import asdict
 from classes import PayloadResult
 try:
     from ..config.settings import OPENAI_API_KEY, OPENAI_MODEL, CLAUDE_API_KEY, CLAUDE_MODEL
+    from ..config.settings import LLM_CACHE_ENABLED, LLM_CACHE_BACKEND, LLM_CACHE_TTL, LLM_CACHE_MAX_ITEMS
+    from ..config.settings import LLMSHIELD_BATCH_SIZE, LLMSHIELD_CONCURRENCY
+    from ..services import cache_store
+    from .http_client import get_http_client
 except ImportError:
     from config.settings import OPENAI_API_KEY, OPENAI_MODEL, CLAUDE_API_KEY, CLAUDE_MODEL
+    from config.settings import LLM_CACHE_ENABLED, LLM_CACHE_BACKEND, LLM_CACHE_TTL, LLM_CACHE_MAX_ITEMS
+    from config.settings import LLMSHIELD_BATCH_SIZE, LLMSHIELD_CONCURRENCY
+    from services import cache_store
+    from services_external.http_client import get_http_client
 
-def claude_completion(messages=[], model=None, response_format=None):
+
+def _llm_cache() -> cache_store.TieredCache:
+    if LLM_CACHE_BACKEND == "memory":
+        return cache_store.get_cache("llm", path="", memory_items=LLM_CACHE_MAX_ITEMS, ttl=LLM_CACHE_TTL)
+    return cache_store.get_cache("llm", ttl=LLM_CACHE_TTL, max_items=LLM_CACHE_MAX_ITEMS)
+
+
+def llm_cache_stats() -> dict:
+    """Hit/miss counters of the LLM response cache."""
+    return _llm_cache().stats()
+
+
+def _cached_completion(provider, model, messages, response_format, use_cache, request):
+    """
+    Return a cached response of an identical earlier request, or call request().
+
+    Only responses with non-empty content are stored, so API errors are retried.
+    Callers get their own copy and may modify it.
+    """
+    if not (use_cache and LLM_CACHE_ENABLED):
+        return request()
+    cache = _llm_cache()
+    key = cache_store.make_key(
+        provider, model,
+        json.dumps(messages, sort_keys=True, ensure_ascii=False),
+        json.dumps(response_format, sort_keys=True, ensure_ascii=False),
+    )
+    cached = cache.get(key)
+    if cached is not None:
+        return deepcopy(cached)
+
+    result = request()
+    try:
+        content = result["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        content = None
+    if content and "error" not in result:
+        cache.set(key, deepcopy(result))
+    return result
+
+
+def claude_completion(messages=[], model=None, response_format=None, use_cache=True):
     """
     Call Claude (Anthropic) API with the same interface as chatgpt_completion.
     Converts OpenAI-style messages to Anthropic format and returns OpenAI-compatible response.
+    Identical requests are answered from the LLM cache unless use_cache=False.
     """
     if model is None:
         model = CLAUDE_MODEL
+    return _cached_completion(
+        "claude", model, messages, response_format, use_cache,
+        lambda: _claude_request(messages, model, response_format),
+    )
 
+
+def _claude_request(messages, model, response_format):
     url = "https://api.anthropic.com/v1/messages"
     headers = {
         "Content-Type": "application/json",
@@ -55,7 +113,7 @@ def claude_completion(messages=[], model=None, response_format=None):
         else:
             body["system"] = json_instruction
 
-    response = requests.post(url, headers=headers, json=body)
+    response = get_http_client().post(url, headers=headers, json=body)
     result = response.json()
 
     # Convert Anthropic response to OpenAI-compatible format
@@ -84,10 +142,17 @@ def claude_completion(messages=[], model=None, response_format=None):
 
 LLMSHIELD_ENDPOINT = "https://overrigged-savingly-nelle.ngrok-free.dev"
 
-def chatgpt_completion(messages=[], model=None, response_format=None):
+def chatgpt_completion(messages=[], model=None, response_format=None, use_cache=True):
+    """Call OpenAI chat completions; identical requests are answered from the LLM cache unless use_cache=False."""
     if model is None:
         model = OPENAI_MODEL
+    return _cached_completion(
+        "openai", model, messages, response_format, use_cache,
+        lambda: _chatgpt_request(messages, model, response_format),
+    )
+
 
+def _chatgpt_request(messages, model, response_format):
     url = "https://api.openai.com/v1/chat/completions"
     headers = {
         "Content-Type": "application/json",
@@ -98,7 +163,7 @@ def chatgpt_completion(messages=[], model=None, response_format=None):
         "messages": messages,
         "response_format": response_format
     }
-    response = requests.post(url, headers=headers, json=body)
+    response = get_http_client().post(url, headers=headers, json=body)
     return response.json()
 
 
@@ -110,7 +175,7 @@ def llmshield_build_prompt(waf_name: str, attack_type: str, technique: str, prob
         "probe_history": [asdict(p) for p in probe_history] if probe_history is not None else None
     }
     url = LLMSHIELD_ENDPOINT + "?action=" + "build_prompt"
-    response = requests.post(url, json=data)
+    response = get_http_client().post(url, json=data)
     return response.text
 
 
@@ -122,7 +187,7 @@ def llmshield_generate_response(prompt: str, max_new_tokens: int = 128, temperat
         "prompt": prompt,
     }
     url = LLMSHIELD_ENDPOINT + "?action=" + "generate"
-    response = requests.post(url, json=data)
+    response = get_http_client().post(url, json=data)
     return response.text
 
 def llmshield_generate_payloads(waf_name: str, attack_type: str, techniques: str = None, probe_history: list[dict]|None = None, max_new_tokens: int = 128, temperature: float = 0.7, adapter_name: str = "phase1") -> str|None:
@@ -136,9 +201,103 @@ def llmshield_generate_payloads(waf_name: str, attack_type: str, techniques: str
         "probe_history": probe_history,
     }
     url = LLMSHIELD_ENDPOINT + "?action=" + "generate_payload"
-    while True:
-        try:
-            response = requests.post(url, json=data)
-            return response.text
-        except Exception as e:
-            continue
+    # The shared client retries transient failures with backoff; give up after that
+    try:
+        response = get_http_client().post(url, json=data)
+    except Exception as e:
+        print(f"[LLMShield] generate_payload failed: {e}")
+        return None
+    if not response.ok:
+        print(f"[LLMShield] generate_payload failed: HTTP {response.status_code}")
+        return None
+    return response.text
+
+
+# Seconds batching stays off after a failed generate_payload_batch request
+BATCH_DISABLED_TTL = 600
+
+# monotonic time until which batching is off (0 = try it)
+_llmshield_batch_disabled_until = 0.0
+
+
+def _llmshield_batch_enabled() -> bool:
+    return LLMSHIELD_BATCH_SIZE > 1 and time.monotonic() >= _llmshield_batch_disabled_until
+
+
+def _llmshield_batch_request(data: dict, items: list[dict]) -> list[str|None]|None:
+    """
+    One generate_payload_batch request; None when it failed.
+
+    The batch action is optional on the server, so the request is sent once
+    (no retries) and counted on its own circuit breaker, never on the one the
+    single generate_payload requests share. Any failure (exception, non-2xx,
+    or a reply that is not one text per item) turns batching off for
+    BATCH_DISABLED_TTL seconds; callers then use single requests.
+    """
+    global _llmshield_batch_disabled_until
+    url = LLMSHIELD_ENDPOINT + "?action=" + "generate_payload_batch"
+    try:
+        response = get_http_client().post(
+            url, json={**data, "items": items}, retries=0, breaker_key="llmshield:generate_payload_batch"
+        )
+        if not response.ok:
+            raise ValueError(f"HTTP {response.status_code}")
+        result = response.json()
+        payloads = result.get("payloads") if isinstance(result, dict) else result
+        if not isinstance(payloads, list) or len(payloads) != len(items):
+            raise ValueError("reply is not one payload per item")
+    except Exception as e:
+        print(f"[LLMShield] generate_payload_batch failed ({e}), using single requests for {BATCH_DISABLED_TTL}s")
+        _llmshield_batch_disabled_until = time.monotonic() + BATCH_DISABLED_TTL
+        return None
+    return [p if isinstance(p, str) else None for p in payloads]
+
+
+def llmshield_generate_payloads_batch(waf_name: str, attack_type: str, items: list[dict], max_new_tokens: int = 128, temperature: float = 0.7, adapter_name: str = "phase1") -> list[str|None]:
+    """
+    Generate one payload per item with as few LLMShield round trips as possible.
+
+    Items are {"techniques": ..., "probe_history": ...} (both optional), as the
+    arguments of llmshield_generate_payloads. Items are sent in batches of
+    LLMSHIELD_BATCH_SIZE, LLMSHIELD_CONCURRENCY batches at a time; items a
+    batch could not produce (or all items, when batching is off: the default
+    LLMSHIELD_BATCH_SIZE of 1, or a batch request failed recently) fall back to
+    concurrent single requests.
+
+    Returns:
+        One payload text per item, in item order; None where generation failed
+    """
+    data = {
+        "waf_name": waf_name,
+        "attack_type": attack_type,
+        "max_new_tokens": max_new_tokens,
+        "temperature": temperature,
+        "adapter_name": adapter_name,
+    }
+    requests_items = [{"technique": item.get("techniques"), "probe_history": item.get("probe_history")} for item in items]
+    results = [None] * len(items)
+
+    with ThreadPoolExecutor(max_workers=max(1, LLMSHIELD_CONCURRENCY)) as executor:
+        if len(items) > 1 and _llmshield_batch_enabled():
+            chunks = [range(i, min(i + LLMSHIELD_BATCH_SIZE, len(items))) for i in range(0, len(items), LLMSHIELD_BATCH_SIZE)]
+            batches = executor.map(lambda chunk: _llmshield_batch_request(data, [requests_items[i] for i in chunk]), chunks)
+            for chunk, payloads in zip(chunks, batches):
+                for i, payload in zip(chunk, payloads or []):
+                    results[i] = payload
+
+        missing = [i for i, payload in enumerate(results) if payload is None]
+        singles = executor.map(
+            lambda i: llmshield_generate_payloads(
+                waf_name=waf_name,
+                attack_type=attack_type,
+                techniques=items[i].get("techniques"),
+                probe_history=items[i].get("probe_history"),
+                max_new_tokens=max_new_tokens,
+                temperature=temperature,
+                adapter_name=adapter_name,
+            ),
+            missing,
+        )
+        for i, payload in zip(missing, singles):
+            results[i] = payload
+    return results
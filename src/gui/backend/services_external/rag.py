@@ -46,7 +46,10 @@ from __future__ import annotations
 import os
 from typing import Any, Optional
 
-import requests
+try:
+    from .http_client import get_http_client
+except ImportError:
+    from services_external.http_client import get_http_client
 
 
 LLMSHIELD_ENDPOINT = os.getenv(
@@ -106,7 +109,7 @@ def rag_retrieve(
         print(f"[LLM4WAF -> LLMShield RAG] url={url}")
         print(f"[LLM4WAF -> LLMShield RAG] attack_type={resolved_attack_type!r}, waf_name={waf_name!r}")
 
-        response = requests.post(url, json=data, timeout=90)
+        response = get_http_client().post(url, json=data, timeout=(10, 90))
         response.raise_for_status()
 
         try:
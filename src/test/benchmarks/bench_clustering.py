@@ -0,0 +1,121 @@
+"""
+Benchmark: payload clustering time and peak memory, exact HAC vs HAC_MINIBATCH.
+
+Builds synthetic payload sets of 1k / 10k / 100k by mutating recorded
+bypass payloads, then runs services.clustering.clustering with each method
+in a fresh subprocess so peak RSS is measured per run. Exact HAC is skipped
+above --hac-limit payloads (its dense n x n distance work does not fit).
+Where both ran, the adjusted Rand index shows how close the labels are.
+
+Usage:
+    python src/test/benchmarks/bench_clustering.py [--sizes 1000 10000 100000]
+"""
+
+import argparse
+import glob
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../gui/backend")))
+
+TEST_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def load_seed_payloads() -> list[str]:
+    payloads = set()
+    for path in glob.glob(os.path.join(TEST_DIR, "**", "*.txt"), recursive=True):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and isinstance(record.get("payload"), str):
+                    payloads.add(record["payload"])
+    return sorted(payloads)
+
+
+def mutate(payload: str, rng: random.Random) -> str:
+    chars = list(payload)
+    for _ in range(rng.randint(1, 4)):
+        i = rng.randrange(len(chars) + 1)
+        op = rng.random()
+        if op < 0.4 and chars:
+            j = min(i, len(chars) - 1)
+            chars[j] = chars[j].swapcase()
+        elif op < 0.7:
+            chars.insert(i, rng.choice([" ", "/**/", "%20", "+", str(rng.randint(0, 9))]))
+        elif chars:
+            del chars[min(i, len(chars) - 1)]
+    return "".join(chars)
+
+
+def build_payloads(n: int) -> list[str]:
+    rng = random.Random(n)
+    seeds = load_seed_payloads()
+    return [mutate(rng.choice(seeds), rng) for _ in range(n)]
+
+
+def run_single(method: str, n: int, labels_path: str):
+    """Child process: cluster n payloads and print time and peak RSS as JSON."""
+    from services.clustering import clustering
+    payloads = build_payloads(n)
+    start = time.perf_counter()
+    labels = clustering(payloads, reduce_dim_to=100, method=method, cluster_kwargs={"distance_threshold": 1.5})
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    if labels_path:
+        with open(labels_path, "w") as f:
+            json.dump([int(label) for label in labels], f)
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_mb, "clusters": len(set(labels))}))
+
+
+def measure(method: str, n: int, labels_path: str = "") -> dict:
+    output = subprocess.run(
+        [sys.executable, __file__, "--single", method, str(n), labels_path],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--hac-limit", type=int, default=20000)
+    parser.add_argument("--single", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        method, n, labels_path = args.single
+        return run_single(method, int(n), labels_path)
+
+    from sklearn.metrics import adjusted_rand_score
+    import tempfile
+
+    print(f"{'payloads':>9} {'method':<14} {'time (s)':>9} {'peak RSS (MB)':>14} {'clusters':>9} {'ARI vs HAC':>11}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            hac_labels = None
+            for method in ("HAC", "HAC_MINIBATCH"):
+                if method == "HAC" and n > args.hac_limit:
+                    print(f"{n:>9} {method:<14} {'skipped (dense O(n^2))':>36}")
+                    continue
+                labels_path = os.path.join(tmp, f"{method}.json")
+                stats = measure(method, n, labels_path)
+                with open(labels_path) as f:
+                    labels = json.load(f)
+                ari = ""
+                if method == "HAC":
+                    hac_labels = labels
+                elif hac_labels is not None:
+                    ari = f"{adjusted_rand_score(hac_labels, labels):.3f}"
+                print(f"{n:>9} {method:<14} {stats['seconds']:>9.2f} {stats['peak_mb']:>14.0f} {stats['clusters']:>9} {ari:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+Micro-benchmark: ExploitVerifier response matching, legacy vs precompiled.
+
+Runs the XSS reflection and SQLi data-leak checks over DVWA-like page bodies
+(no network), checks that both implementations give the same verdicts (and,
+for SQLi, the same evidence), and prints the time per call.
+
+Usage:
+    python src/test/benchmarks/bench_exploit_verifier.py [--repeat 200]
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../gui/backend")))
+
+from services.exploit_verifier import ExploitVerifier
+
+
+# -----------------------------------------------------------------------------
+# Legacy implementation (before precompiled matching), kept for comparison
+# -----------------------------------------------------------------------------
+
+def legacy_check_xss_reflected(payload: str, response_text: str) -> tuple[bool, str]:
+    payload_lower = unquote(payload).lower()
+    response_lower = response_text.lower()
+
+    if payload_lower in response_lower:
+        idx = response_lower.find(payload_lower)
+        evidence = response_text[max(0, idx-20):idx+len(payload)+20]
+        return True, f"Exact reflection: ...{evidence}..."
+
+    for pattern in ExploitVerifier.XSS_DANGEROUS_PATTERNS:
+        if re.search(pattern, payload, re.IGNORECASE):
+            if re.search(pattern, response_text, re.IGNORECASE):
+                match = re.search(pattern, response_text, re.IGNORECASE)
+                return True, f"Dangerous pattern reflected: {match.group()}"
+
+    script_patterns = [
+        r"<script[^>]*>[^<]*</script>",
+        r"<script[^>]*>",
+    ]
+    for pattern in script_patterns:
+        if re.search(pattern, payload, re.IGNORECASE):
+            if re.search(pattern, response_text, re.IGNORECASE):
+                match = re.search(pattern, response_text, re.IGNORECASE)
+                return True, f"Script tag reflected: {match.group()}"
+
+    event_pattern = r'on\w+\s*=\s*["\']?[^"\'>\s]+'
+    payload_events = re.findall(event_pattern, payload, re.IGNORECASE)
+    for event in payload_events:
+        if event.lower() in response_lower:
+            return True, f"Event handler reflected: {event}"
+
+    return False, ""
+
+
+def legacy_check_sqli_data_leak(response_text: str) -> tuple[bool, str]:
+    for pattern in ExploitVerifier.SQLI_INDICATORS:
+        match = re.search(pattern, response_text, re.IGNORECASE | re.DOTALL)
+        if match:
+            return True, f"Data leak detected: {match.group()[:100]}..."
+    return False, ""
+
+
+# -----------------------------------------------------------------------------
+# DVWA-like page bodies
+# -----------------------------------------------------------------------------
+
+MENU = "".join(
+    f'<li class=""><a href="../../vulnerabilities/{name}/">{title}</a></li>\n'
+    for name, title in [
+        ("brute", "Brute Force"), ("exec", "Command Injection"), ("csrf", "CSRF"),
+        ("fi", "File Inclusion"), ("upload", "File Upload"), ("captcha", "Insecure CAPTCHA"),
+        ("sqli", "SQL Injection"), ("sqli_blind", "SQL Injection (Blind)"),
+        ("weak_id", "Weak Session IDs"), ("xss_d", "XSS (DOM)"), ("xss_r", "XSS (Reflected)"),
+        ("xss_s", "XSS (Stored)"), ("csp", "CSP Bypass"), ("javascript", "JavaScript"),
+    ]
+)
+
+PAGE = """<!DOCTYPE html>
+<html lang="en-GB">
+<head>
+<meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
+<title>Vulnerability: {title} :: Damn Vulnerable Web Application (DVWA)</title>
+<link rel="stylesheet" type="text/css" href="../../dvwa/css/main.css" />
+<link rel="icon" type="\\image/ico" href="../../favicon.ico" />
+<script type="text/javascript" src="../../dvwa/js/dvwaPage.js"></script>
+</head>
+<body class="home">
+<div id="container">
+<div id="header"><img src="../../dvwa/images/logo.png" alt="Damn Vulnerable Web Application" /></div>
+<div id="main_menu"><div id="main_menu_padded">
+<ul class="menuBlocks"><li class=""><a href="../../.">Home</a></li>
+<li class=""><a href="../../instructions.php">Instructions</a></li>
+<li class=""><a href="../../setup.php">Setup / Reset DB</a></li></ul>
+<ul class="menuBlocks">{menu}</ul>
+</div></div>
+<div id="main_body">
+<div class="body_padded">
+<h1>Vulnerability: {title}</h1>
+<div class="vulnerable_code_area">
+<form name="XSS" action="#" method="GET">
+<p>What's your name?<input type="text" name="name"><input type="submit" value="Submit"></p>
+</form>
+{content}
+</div>
+<h2>More Information</h2>
+<ul>
+<li><a href="https://owasp.org/www-community/attacks/xss/" target="_blank">https://owasp.org/www-community/attacks/xss/</a></li>
+<li><a href="https://en.wikipedia.org/wiki/Cross-site_scripting" target="_blank">https://en.wikipedia.org/wiki/Cross-site_scripting</a></li>
+</ul>
+</div>
+<br /><br />
+</div>
+<div class="clear"></div>
+<div id="system_info"><input type="button" value="View Help" class="popup_button" /> <input type="button" value="View Source" class="popup_button" />
+<div align="left"><em>Username:</em> admin<br /><em>Security Level:</em> low<br /><em>Locale:</em> en<br /><em>SQLi DB:</em> mysql</div></div>
+<div id="footer"><p>Damn Vulnerable Web Application (DVWA)</p>
+<script src='../../dvwa/js/add_event_listeners.js'></script></div>
+</div>
+</body>
+</html>
+"""
+
+XSS_PAYLOADS = [
+    "<script>alert(1)</script>",
+    "<img src=x onerror=alert(document.cookie)>",
+    "<svg/onload=alert`1`>",
+    "<body onload=alert(1)>",
+    "<a href=javascript:alert(1)>x</a>",
+    "<iframe src=javascript:alert(1)>",
+    "%3Cscript%3Ealert(1)%3C%2Fscript%3E",
+    "<details open ontoggle=alert(1)>",
+    "hello world",
+    "<b>bold</b>",
+]
+
+SQLI_PAYLOADS = [
+    "1' OR '1'='1",
+    "1' UNION SELECT user, password FROM users#",
+    "1' AND SLEEP(5)#",
+    "1",
+    "abc",
+]
+
+
+def build_xss_cases():
+    cases = []
+    for payload in XSS_PAYLOADS:
+        # Reflected as-is, HTML-encoded, and not reflected at all
+        reflected = f"<pre>Hello {unquote(payload)}</pre>"
+        encoded = "<pre>Hello " + unquote(payload).replace("<", "&lt;").replace(">", "&gt;") + "</pre>"
+        for content in (reflected, encoded, ""):
+            cases.append((payload, PAGE.format(title="Reflected Cross Site Scripting (XSS)", menu=MENU, content=content)))
+    return cases
+
+
+def build_sqli_cases():
+    records = "".join(
+        f"<pre>ID: {payload}<br />First name: {first}<br />Surname: {last}</pre>"
+        for payload in ["1' OR '1'='1"]
+        for first, last in [("admin", "admin"), ("Gordon", "Brown"), ("Hack", "Me"), ("Pablo", "Picasso"), ("Bob", "Smith")]
+    )
+    contents = [
+        records,
+        "<pre>ID: 1<br />First name: admin<br />Surname: admin</pre>",
+        "<pre>You have an error in your SQL syntax; check the manual for the right syntax to use</pre>",
+        # Lower-priority indicators ahead of higher-priority ones in the body
+        "<pre>Warning: mysql_fetch_array() expects parameter 1</pre><pre>ID: 1<br />First name: admin<br />Surname: admin</pre>",
+        "<pre>gordonb Gordon</pre><pre>You have an error in your SQL syntax</pre><pre>admin admin</pre>",
+        "",
+    ]
+    return [PAGE.format(title="SQL Injection", menu=MENU, content=content) for content in contents]
+
+
+def bench(label, func, cases, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            func(*case)
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / (repeat * len(cases)) * 1e6
+    print(f"  {label:<12} {per_call:8.1f} us/call")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    verifier = ExploitVerifier("benchmark", base_url="http://localhost")
+    xss_cases = build_xss_cases()
+    sqli_cases = [(body,) for body in build_sqli_cases()]
+
+    # Verdicts must not change
+    for payload, body in xss_cases:
+        assert legacy_check_xss_reflected(payload, body)[0] == verifier._check_xss_reflected(payload, body)[0], payload
+    for (body,) in sqli_cases:
+        assert legacy_check_sqli_data_leak(body) == verifier._check_sqli_data_leak(body)
+    print(f"Verdicts (and SQLi evidence) identical on {len(xss_cases)} XSS and {len(sqli_cases)} SQLi cases "
+          f"(page size ~{len(xss_cases[0][1]) // 1024} KB)")
+
+    print("XSS reflection check:")
+    legacy = bench("legacy", legacy_check_xss_reflected, xss_cases, args.repeat)
+    current = bench("precompiled", verifier._check_xss_reflected, xss_cases, args.repeat)
+    print(f"  speedup      {legacy / current:8.2f}x")
+
+    print("SQLi data-leak check:")
+    legacy = bench("legacy", legacy_check_sqli_data_leak, sqli_cases, args.repeat)
+    current = bench("precompiled", verifier._check_sqli_data_leak, sqli_cases, args.repeat)
+    print(f"  speedup      {legacy / current:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
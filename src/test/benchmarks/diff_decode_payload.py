@@ -0,0 +1,156 @@
+"""
+Differential test + benchmark: _fully_decode_payload, legacy vs prefiltered.
+
+Decodes recorded experiment payloads and generated multi-layer encodings
+with both implementations, asserts that the decoded payload and the whole
+decode stack are identical, and prints the time per payload.
+
+Usage:
+    python src/test/benchmarks/diff_decode_payload.py [--repeat 5]
+"""
+
+import argparse
+import glob
+import html
+import json
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+import urllib.parse
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../gui/backend")))
+
+from services import payload_harmness_validator as pv
+
+TEST_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+# -----------------------------------------------------------------------------
+# Legacy implementation (before translate table and prefilters), kept for comparison
+# -----------------------------------------------------------------------------
+
+def legacy_normalize_homoglyphs(s: str) -> str:
+    if s is None:
+        return None
+    return ''.join(pv.HOMOGLYPH_MAP.get(c, c) for c in s)
+
+LEGACY_DECODERS = {
+    "URL": lambda payload: urllib.parse.unquote(payload),
+    "HTML": lambda payload: html.unescape(payload),
+    "UNICODE": lambda payload: None if payload is None else unicodedata.normalize("NFKC", payload),
+    "HOMOGLYPH": lambda payload: legacy_normalize_homoglyphs(payload),
+    "CUSTOM": lambda payload: payload
+        .replace("%2O", "%20")
+        .replace("%O9", "%09")
+        .replace("%OA", "%0A")
+        .replace("%6O", "%60")
+        .replace("\\uOO", "\\u00")
+        .replace("\\OO", "\\00"),
+    "CUSTOM2": lambda payload: re.sub(r'(\d)OO', r'\g<1>00',
+        re.sub(r'(\d\d)O', r'\g<1>0',
+            re.sub(r'(\d)O(\d)', r'\g<1>0\g<2>', payload)
+        )
+    )
+}
+
+def legacy_fully_decode_payload(payload):
+    flag = True
+    decode_stack = []
+    while flag:
+        new_p_0 = payload
+        for decoder in LEGACY_DECODERS:
+            old_p_0 = new_p_0
+            new_p_1 = LEGACY_DECODERS[decoder](old_p_0)
+            if new_p_1 != old_p_0:
+                decode_stack.append((decoder, old_p_0, new_p_1))
+                new_p_0 = new_p_1
+        if new_p_0 == payload:
+            flag = False
+        else:
+            payload = new_p_0
+    return payload, decode_stack
+
+
+# -----------------------------------------------------------------------------
+# Payloads
+# -----------------------------------------------------------------------------
+
+def load_recorded_payloads() -> list[str]:
+    payloads = set()
+    for path in glob.glob(os.path.join(TEST_DIR, "**", "*.txt"), recursive=True):
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict) and isinstance(record.get("payload"), str):
+                    payloads.add(record["payload"])
+    return sorted(payloads)
+
+
+ENCODERS = [
+    lambda p: urllib.parse.quote(p, safe=""),
+    lambda p: html.escape(p),
+    lambda p: "".join(f"&#{ord(c)};" if c in "<>()'\"" else c for c in p),
+    lambda p: p.translate(str.maketrans({"a": "а", "e": "е", "o": "о", "c": "с"})),
+    lambda p: p.upper(),
+    lambda p: p.replace(" ", "%2O").replace("0", "O"),
+    lambda p: "".join(chr(ord(c) + 0xFEE0) if "!" <= c <= "~" and random.random() < 0.3 else c for c in p),
+]
+
+SEEDS = [
+    "<script>alert(1)</script>",
+    "<img src=x onerror=alert(document.cookie)>",
+    "1' OR '1'='1' -- ",
+    "1' UNION SELECT user, password FROM users#",
+    "1 AND SLEEP(5)",
+    "javascript:alert(100)",
+    "1000 OR 10=10",
+]
+
+
+def generate_payloads(count: int) -> list[str]:
+    random.seed(42)
+    payloads = []
+    for _ in range(count):
+        payload = random.choice(SEEDS)
+        for _ in range(random.randint(1, 4)):
+            payload = random.choice(ENCODERS)(payload)
+        payloads.append(payload)
+    return payloads
+
+
+def bench(label, func, payloads, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            func(payload)
+    per_call = (time.perf_counter() - start) / (repeat * len(payloads)) * 1e6
+    print(f"  {label:<12} {per_call:8.1f} us/payload")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--generated", type=int, default=5000)
+    args = parser.parse_args()
+
+    payloads = load_recorded_payloads() + generate_payloads(args.generated)
+
+    # Decoded payload and decode stack must not change
+    for payload in payloads:
+        assert legacy_fully_decode_payload(payload) == pv._fully_decode_payload(payload), payload
+    print(f"Decode results identical on {len(payloads)} payloads")
+
+    legacy = bench("legacy", legacy_fully_decode_payload, payloads, args.repeat)
+    current = bench("prefiltered", pv._fully_decode_payload, payloads, args.repeat)
+    print(f"  speedup      {legacy / current:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
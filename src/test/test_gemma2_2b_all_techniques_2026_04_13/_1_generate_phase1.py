@@ -24,9 +24,8 @@ WAF_DVWA_URLS = {
 
 from dataclasses import asdict
 import json
-import tqdm
 import requests
-from services.generator import generate_payload_phase1
+from services.generator import generate_payloads_phase1
 
 BACKEND = "http://127.0.0.1:5000"
 
@@ -64,12 +63,12 @@ for waf_name, url in WAF_DVWA_URLS.items():
             print(f"Skipping {waf_name} - {attack_type}...")
             continue
         print(f"Generating payloads for {waf_name} - {attack_type}...")
-        payloads = []
-        for i in tqdm.tqdm(range(num_payloads), desc=f"{waf_name}({waf_index+1}/{len(WAF_DVWA_URLS)}) | {attack_type}({attack_type_index+1}/{len(VALID_ATTACK_TYPES)})"):
-            payload_result = generate_payload_phase1(waf_name, attack_type)
-            payloads.append(payload_result)
-            
-            with open(os.path.join(log_dir, f"{waf_name}_{attack_type}_phase1_payloads.txt"), "a", encoding="utf-8") as f:
+        # Batched LLMShield requests instead of one round trip per payload
+        payloads = generate_payloads_phase1(waf_name, attack_type, num_of_payloads=num_payloads)
+        if len(payloads) < num_payloads:
+            print(f"Only {len(payloads)}/{num_payloads} payloads generated for {waf_name} - {attack_type}")
+        with open(os.path.join(log_dir, f"{waf_name}_{attack_type}_phase1_payloads.txt"), "a", encoding="utf-8") as f:
+            for payload_result in payloads:
                 f.write(json.dumps(asdict(payload_result)) + "\n")
         
         payload_results = api_test_attack(url, [p.__dict__ for p in payloads])
@@ -31,7 +31,7 @@ import json
 import tqdm
 import random
 
-from services.generator import generate_payload_phase3
+from services.generator import generate_payloads_phase3
 from services_external import dvwa
 
 payload_log_dir = r""
@@ -60,14 +60,21 @@ for waf_name, url in WAF_DVWA_URLS.items():
         num_bypassed = len(bypassed_payloads)
         num_blocked = len(blocked_payloads)
         
-        for i in tqdm.tqdm(range(num_payloads), desc=f"{waf_name}({waf_index+1}/{len(WAF_DVWA_URLS)}) | {attack_type}({attack_type_index+1}/{len(VALID_ATTACK_TYPES)})"):
+        probe_histories = []
+        for i in range(num_payloads):
             # Chọn ngẫu nhiên 50% của bypassed và 50% của blocked
             probe_history = []
             sample_bypassed = random.sample(bypassed_payloads, k=max(1, num_bypassed // 2)) if num_bypassed > 0 else []
             sample_blocked = random.sample(blocked_payloads, k=max(1, num_blocked // 2)) if num_blocked > 0 else []
             probe_history.extend(sample_bypassed)
             probe_history.extend(sample_blocked)
-            payload_result = generate_payload_phase3(waf_name, attack_type, probe_history)
+            probe_histories.append(probe_history)
+        # Batched LLMShield requests, one probe history per payload
+        payload_results = generate_payloads_phase3(waf_name, attack_type, probe_histories=probe_histories)
+        if len(payload_results) < num_payloads:
+            print(f"Only {len(payload_results)}/{num_payloads} payloads generated for {waf_name} - {attack_type}")
+
+        for payload_result in tqdm.tqdm(payload_results, desc=f"{waf_name}({waf_index+1}/{len(WAF_DVWA_URLS)}) | {attack_type}({attack_type_index+1}/{len(VALID_ATTACK_TYPES)})"):
             attack_result = dvwa.attack(
                 attack_type,
                 payload_result.payload,
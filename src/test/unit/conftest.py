@@ -0,0 +1,13 @@
+"""
+Offline behavioral tests for the GUI backend services.
+
+Usage:
+    python -m pytest -q src/test/unit
+"""
+
+import os
+import sys
+
+# Same import roots as the backend: services/config from gui/backend, defense/gui from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../../gui/backend")))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
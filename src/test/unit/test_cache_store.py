@@ -0,0 +1,104 @@
+import pytest
+
+from services import cache_store
+from services.cache_store import SQLiteStore, TieredCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_store.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache.sqlite3")
+
+
+def test_ttl_hides_and_purges_expired_rows(clock, path):
+    store = SQLiteStore(path, "harm", ttl=60)
+    store.set("old", '"a"')
+    clock.now += 30
+    store.set("new", '"b"')
+    assert store.get("old") == ('"a"', clock.now - 30)
+
+    clock.now += 31
+    assert store.get("old") is None
+    assert store.get("new") is not None
+    assert store.evict() == 1
+    assert len(store) == 1
+
+
+def test_max_items_evicts_oldest_first(clock, path):
+    store = SQLiteStore(path, "harm", max_items=3)
+    for i in range(5):
+        store.set(f"k{i}", str(i))
+        clock.now += 1
+    # Rewriting a key makes it the newest
+    store.set("k0", "0")
+
+    assert store.evict() == 2
+    assert [key for key in ("k0", "k1", "k2", "k3", "k4") if store.get(key)] == ["k0", "k3", "k4"]
+
+
+def test_eviction_runs_every_evict_every_writes(monkeypatch, clock, path):
+    monkeypatch.setattr(cache_store, "EVICT_EVERY", 4)
+    store = SQLiteStore(path, "harm", max_items=2)
+    for i in range(3):
+        store.set(f"k{i}", str(i))
+        clock.now += 1
+    assert len(store) == 3
+
+    store.set("k3", "3")
+    assert len(store) == 2
+
+
+def test_reopening_applies_limits_to_existing_rows(clock, path):
+    store = SQLiteStore(path, "harm")
+    for i in range(4):
+        store.set(f"k{i}", str(i))
+        clock.now += 1
+    store.close()
+
+    clock.now += 100
+    assert len(SQLiteStore(path, "harm", ttl=102)) == 2
+    assert len(SQLiteStore(path, "harm", max_items=1)) == 1
+
+
+def test_invalid_table_name(path):
+    with pytest.raises(ValueError):
+        SQLiteStore(path, "harm; DROP TABLE x")
+
+
+def test_tiered_cache_disk_hit_keeps_expiry(clock, path):
+    cache = TieredCache("harm", path=path, ttl=60)
+    cache.set("key", {"is_harmful": True})
+    clock.now += 50
+    cache.memory.clear()
+
+    assert cache.get("key") == {"is_harmful": True}
+    assert cache.stats()["disk_hits"] == 1
+    # Promoted to memory with the disk timestamp, so it still expires at 60 s
+    clock.now += 11
+    assert cache.get("key") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_memory_only_cache_is_lru():
+    cache = TieredCache("harm", path="", memory_items=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+from sklearn.cluster import AgglomerativeClustering
+from sklearn.metrics import adjusted_rand_score
+
+from services.clustering import _weighted_ward_labels
+
+
+def ward_labels(X, distance_threshold):
+    return AgglomerativeClustering(
+        n_clusters=None, distance_threshold=distance_threshold, metric="euclidean", linkage="ward"
+    ).fit_predict(X)
+
+
+def blobs(seed, n=120, dims=5, centers=6):
+    rng = np.random.default_rng(seed)
+    means = rng.normal(scale=4, size=(centers, dims))
+    return means[rng.integers(centers, size=n)] + rng.normal(size=(n, dims))
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("distance_threshold", [1.0, 3.0, 8.0, 20.0])
+def test_unit_weights_match_agglomerative_clustering(seed, distance_threshold):
+    X = blobs(seed)
+    labels = _weighted_ward_labels(X, np.ones(len(X)), distance_threshold)
+    expected = ward_labels(X, distance_threshold)
+
+    assert len(set(labels)) == len(set(expected))
+    assert adjusted_rand_score(expected, labels) == 1.0
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_weights_match_repeated_points(seed):
+    # A center of weight k merges like k coincident points
+    rng = np.random.default_rng(seed)
+    centers = blobs(seed, n=30)
+    sizes = rng.integers(1, 5, size=len(centers))
+    X = np.repeat(centers, sizes, axis=0)
+
+    labels = _weighted_ward_labels(centers, sizes, 6.0)
+    expected = ward_labels(X, 6.0)
+
+    assert adjusted_rand_score(expected, np.repeat(labels, sizes)) == 1.0
+
+
+def test_fewer_than_two_centers():
+    assert list(_weighted_ward_labels(np.ones((1, 3)), [4], 1.0)) == [0]
+    assert len(_weighted_ward_labels(np.empty((0, 3)), [], 1.0)) == 0
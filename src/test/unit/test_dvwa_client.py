@@ -0,0 +1,58 @@
+import threading
+import time
+
+from services_external.dvwa_client import DVWAClient
+
+
+def make_client(monkeypatch):
+    client = DVWAClient("http://dvwa.test")
+    client.session_id = "expired"
+    logins = []
+
+    def fake_login(username=None, password=None):
+        # Slow enough that every waiting worker queues on the lock
+        time.sleep(0.05)
+        logins.append(1)
+        client.session_id = f"session-{len(logins)}"
+        return client.session_id
+
+    monkeypatch.setattr(client, "_login", fake_login)
+    return client, logins
+
+
+def test_relogin_is_single_flight(monkeypatch):
+    client, logins = make_client(monkeypatch)
+    start = threading.Barrier(8)
+    results = []
+
+    def worker():
+        start.wait()
+        results.append(client.relogin("expired"))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(logins) == 1
+    assert results == ["session-1"] * 8
+
+
+def test_relogin_maps_expired_session_to_current(monkeypatch):
+    client, logins = make_client(monkeypatch)
+    client.relogin("expired")
+
+    assert client.current_session("expired") == "session-1"
+    assert client.cookies("expired")["PHPSESSID"] == "session-1"
+    # Sessions that were never replaced are sent as given
+    assert client.current_session("other") == "other"
+
+
+def test_relogin_of_bound_session_keeps_own_session(monkeypatch):
+    client, logins = make_client(monkeypatch)
+    client.session_id = "own"
+
+    assert client.relogin("bound") == "own"
+    assert logins == []
+    assert client.current_session("bound") == "own"
@@ -0,0 +1,145 @@
+import io
+
+import pytest
+import requests
+
+from services_external import http_client
+from services_external.http_client import CircuitBreaker, CircuitOpenError, HTTPClient
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_client.time, "monotonic", clock)
+    return clock
+
+
+def make_response(status_code: int, headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = b""
+    response.raw = io.BytesIO(b"")
+    return response
+
+
+def make_client(monkeypatch, replies, **kwargs):
+    """HTTPClient whose requests answer with replies in turn (a Response, or an exception to raise)."""
+    client = HTTPClient(**{"max_retries": 3, "breaker_threshold": 2, "breaker_reset": 30, **kwargs})
+    sent, sleeps = [], []
+
+    def fake_request(method, url, **kw):
+        sent.append(url)
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    monkeypatch.setattr(client.session, "request", fake_request)
+    monkeypatch.setattr(http_client.time, "sleep", sleeps.append)
+    return client, sent, sleeps
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_reset(clock):
+    breaker = CircuitBreaker(threshold=3, reset_after=30)
+    for _ in range(2):
+        breaker.record_failure()
+    breaker.before_request("api")  # still closed
+
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("api")
+
+    clock.now += 31
+    breaker.before_request("api")  # the half-open trial
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("api")  # only one trial at a time
+
+    breaker.record_success()
+    breaker.before_request("api")
+    assert breaker.failures == 0 and breaker.opened_at is None
+
+
+def test_failed_trial_reopens_breaker(clock):
+    breaker = CircuitBreaker(threshold=1, reset_after=30)
+    breaker.record_failure()
+    clock.now += 31
+    breaker.before_request("api")
+
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request("api")
+    clock.now += 31
+    breaker.before_request("api")
+
+
+def test_zero_threshold_never_opens(clock):
+    breaker = CircuitBreaker(threshold=0)
+    for _ in range(10):
+        breaker.record_failure()
+    breaker.before_request("api")
+
+
+def test_open_breaker_fails_without_sending(monkeypatch, clock):
+    client, sent, _ = make_client(monkeypatch, [], max_retries=0)
+    for _ in range(2):
+        client.breaker("llm.test").record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        client.get("http://llm.test/v1")
+    assert sent == []
+
+
+def test_breaker_key_keeps_failures_off_the_host_breaker(monkeypatch, clock):
+    replies = [make_response(503), make_response(503), make_response(200)]
+    client, sent, _ = make_client(monkeypatch, replies, max_retries=0)
+    for _ in range(2):
+        client.post("http://llm.test/?action=batch", retries=0, breaker_key="llm.test#batch")
+
+    with pytest.raises(CircuitOpenError):
+        client.post("http://llm.test/?action=batch", breaker_key="llm.test#batch")
+    assert client.get("http://llm.test/v1").status_code == 200
+
+
+def test_retry_waits_for_retry_after(monkeypatch, clock):
+    replies = [make_response(503, {"Retry-After": "7"}), make_response(200)]
+    client, sent, sleeps = make_client(monkeypatch, replies)
+
+    assert client.get("http://llm.test/v1").status_code == 200
+    assert len(sent) == 2
+    assert sleeps[0] >= 7
+
+
+def test_retry_after_above_cap_returns_without_waiting(monkeypatch, clock):
+    too_long = str(http_client.MAX_RETRY_AFTER + 1)
+    replies = [make_response(429, {"Retry-After": too_long})]
+    client, sent, sleeps = make_client(monkeypatch, replies)
+
+    response = client.get("http://llm.test/v1")
+    assert response.status_code == 429
+    assert len(sent) == 1 and sleeps == []
+    # Rate limiting is not an outage
+    assert client.breaker("llm.test").failures == 0
+
+
+def test_retry_after_http_date():
+    response = make_response(503, {"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"})
+    assert http_client._retry_after_seconds(response) == 0.0
+    assert http_client._retry_after_seconds(make_response(503, {"Retry-After": "soon"})) is None
+
+
+def test_post_read_timeout_is_not_retried(monkeypatch, clock):
+    client, sent, sleeps = make_client(monkeypatch, [requests.exceptions.ReadTimeout()])
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.post("http://llm.test/v1", json={})
+    assert len(sent) == 1 and sleeps == []
+    assert client.breaker("llm.test").failures == 1
@@ -0,0 +1,55 @@
+from urllib.parse import quote
+
+from services.near_dedup import collapse_near_duplicates
+
+LONG = "1' UNION SELECT user, password FROM users WHERE user_id = 1 AND first_name LIKE '%admin%'-- -"
+
+
+def groups_of(payloads, **kwargs):
+    return [group.members for group in collapse_near_duplicates(payloads, **kwargs)]
+
+
+def test_case_and_encoding_variants_collapse():
+    payloads = ["<script>alert(1)</script>", "<SCRIPT>alert(1)</SCRIPT>", quote("<script>alert(1)</script>")]
+    groups = collapse_near_duplicates(payloads)
+
+    assert len(groups) == 1
+    assert groups[0].representative == payloads[0]
+    assert groups[0].members == payloads
+    assert groups[0].count == 3
+
+
+def test_near_duplicates_group_and_distinct_payloads_stay_apart():
+    payloads = [
+        LONG,
+        "<img src=x onerror=alert(document.cookie)>",
+        LONG.replace("admin", "admim"),
+        "1' AND SLEEP(5)#",
+        LONG + " ",
+    ]
+    assert groups_of(payloads) == [
+        [payloads[0], payloads[2], payloads[4]],
+        [payloads[1]],
+        [payloads[3]],
+    ]
+
+
+def test_threshold_controls_merging():
+    payloads = [LONG, LONG.replace("users", "accounts")]
+    assert len(groups_of(payloads, threshold=0.5)) == 1
+    assert len(groups_of(payloads, threshold=0.99)) == 2
+
+
+def test_every_payload_kept_once_in_first_occurrence_order():
+    payloads = [f"<svg onload=alert({i})>" for i in range(20)] + ["1' OR '1'='1"] * 3 + [LONG, LONG.upper()]
+    groups = collapse_near_duplicates(payloads)
+
+    members = [payload for group in groups for payload in group.members]
+    assert sorted(members) == sorted(payloads)
+    firsts = [payloads.index(group.representative) for group in groups]
+    assert firsts == sorted(firsts)
+
+
+def test_trivial_inputs():
+    assert collapse_near_duplicates([]) == []
+    assert groups_of(["x", "X"]) == [["x", "X"]]
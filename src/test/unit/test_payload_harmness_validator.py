@@ -0,0 +1,46 @@
+from dataclasses import asdict
+
+import pytest
+
+from services import payload_harmness_validator as validator
+from services.cache_store import TieredCache
+
+PAYLOADS = [
+    "1",
+    "1' OR '1'='1",
+    "1' UNION SELECT user, password FROM users#",
+    "abc",
+    "1' OR '1'='1",  # duplicate: evaluated once, answered twice
+    "1%27%20AND%20SLEEP(5)%23",
+    "') OR 1=1-- -",
+    "1",
+    "1 AND 1=1",
+    "admin'--",
+]
+
+
+def expected():
+    return [asdict(validator.evaluate_sql_payload(payload, use_cache=False)) for payload in PAYLOADS]
+
+
+@pytest.mark.parametrize("workers, chunksize", [(1, None), (2, 1), (3, 2)])
+def test_process_pool_keeps_input_order(workers, chunksize):
+    results = validator.evaluate_sql_payloads(PAYLOADS, workers=workers, chunksize=chunksize, use_cache=False)
+    assert [asdict(result) for result in results] == expected()
+
+
+def test_cached_and_computed_results_interleave_in_order(monkeypatch):
+    cache = TieredCache("harm", path="", memory_items=100)
+    monkeypatch.setattr(validator, "_harm_cache", lambda: cache)
+    # Cache every other payload first
+    validator.evaluate_sql_payloads(PAYLOADS[::2], workers=1)
+
+    results = validator.evaluate_sql_payloads(PAYLOADS, workers=2, chunksize=1)
+    assert [asdict(result) for result in results] == expected()
+    assert cache.stats()["memory_hits"] > 0
+
+
+def test_iter_can_stop_early():
+    results = validator.iter_evaluate_sql_payloads(PAYLOADS, workers=2, chunksize=1, use_cache=False)
+    assert next(results).payload == validator.evaluate_sql_payload(PAYLOADS[0], use_cache=False).payload
+    results.close()